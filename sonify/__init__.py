@@ -0,0 +1,37 @@
+"""
+sonify — rendering engines behind sonify_dashboard.py
+=====================================================
+The dashboard script owns the charts and buttons; the modules here hold the
+pieces of the audio pipeline that are useful on their own.
+
+  data        synthetic demo series
+  ingest      chunked / memory-mapped CSV, Parquet and .npy order and
+              session logs → series (python -m)
+  render      build_audio and its stems — the headless synthesis core
+  dsp         timbres, filters and tap sets shared by every renderer
+  stream      block-based renderer with flat memory for long series
+  live        incremental renderer for series that grow one bucket at a time
+  notes       batched overlap-add note engine for Per-Day mode
+  pyramid     min / max / mean levels and LTTB so charts and audio read
+              only the buckets they can show
+  multitrack  N metric tracks (pitch, notes, density, ticks) on one stereo bus
+  anomaly     rolling z-score / MAD spike and dip detection, earcon bank
+  cache       LRU stem cache so dashboard toggles remix instead of re-render
+  playback    callback-driven output stream with an audio-clock position
+  reverb      partitioned FFT convolution reverb and room presets
+  wavetable   band-limited float32 oscillator tables, registered by name
+  encode      streaming WAV / FLAC / Ogg / Opus encoders into files,
+              BytesIO or sockets (python -m)
+  timescale   pitch-preserving 0.5×–2× speed variants of a finished render
+  parallel    thread-pool rendering of independent stems and chorus
+              voices, bit-identical (python -m)
+  profile     opt-in per-stage timing / allocation traces of a render
+  lag         FFT cross-correlation lag detection with surrogate p-values
+  batch       manifest-driven batch renderer on a process pool (python -m)
+  importcheck import-time budget check for the headless core (python -m)
+  presets     trend_v1 / compare_v1 / anomaly clip presets of the web app
+  service     asyncio HTTP service for the /api/sonify endpoints (python -m)
+  loadtest    latency percentiles for the service (python -m)
+  bench       renderer benchmark sweep with JSON baselines and compare
+              (python -m)
+"""
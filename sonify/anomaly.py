@@ -0,0 +1,184 @@
+"""
+Anomaly detection and the earcons that mark it.
+
+    anoms = detect(sessions, method='mad', window=14)
+    anoms.index, anoms.score, anoms.kind        # buckets, scores, spike / dip
+    anoms.threshold                             # |score| that flagged them
+    audio = build_audio(sessions, revenue, anomalies=collapse(anoms))
+
+Each bucket is scored against the `window` buckets before it (the first
+buckets use what history they have, from `min_periods` on):
+
+  zscore  (x - mean) / std of the window — rolling sums from two cumsums,
+          O(n) whatever the window
+  mad     0.6745 (x - median) / MAD of the window — robust to the spikes
+          it is looking for; medians come from a sliding-window view,
+          processed MAX_ELEMS values at a time
+
+Both are one vectorised pass: 500,000 points take ~0.1 s (zscore) or ~1 s
+(mad).
+|score| >= threshold flags a 'spike' (above) or a 'dip' (below).
+
+The earcon bank holds one short wave per EARCONS name, precomputed per
+sample rate and padded into a single (n_earcons, length) array.  A spike
+sounds a chime, a dip a thud (EARCON_FOR); 'tick' is for plain markers.
+earcon_track() places every event's earcon with one dsp.scatter_add over
+the whole event list — no per-event loop.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from sonify import dsp
+from sonify.profile import stage
+
+Anomalies = namedtuple('Anomalies', 'index score kind threshold',
+                       defaults=(None,))
+
+METHODS     = ('zscore', 'mad')
+THRESHOLDS  = {'zscore': 3.0, 'mad': 3.5}     # Iglewicz–Hoaglin for MAD
+MAX_ELEMS   = 1 << 22       # window values held at once by the MAD detector
+
+EARCON_FOR  = {'spike': 'chime', 'dip': 'thud'}
+EARCON_GAIN = 0.30          # at threshold; twice the threshold is 2× louder
+
+
+# ── Detectors ───────────────────────────────────────────────────────────
+def rolling_zscore(values, window=14, min_periods=None):
+    """Score of each point against the mean / std of the `window` points
+    before it; NaN until min_periods points of history exist."""
+    x   = np.asarray(values, dtype=float)
+    x   = x - x.mean()                 # keeps the cumsums well conditioned
+    n   = len(x)
+    i   = np.arange(n)
+    cnt = np.minimum(i, window)
+    c1  = np.concatenate([[0.0], np.cumsum(x)])
+    c2  = np.concatenate([[0.0], np.cumsum(x * x)])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (c1[i] - c1[i - cnt]) / cnt
+        var  = (c2[i] - c2[i - cnt]) / cnt - mean ** 2
+        sd   = np.sqrt(np.maximum(var, 0.0))
+        z    = np.where(sd > 1e-12 * (np.abs(mean) + 1), (x - mean) / sd, 0.0)
+    z[cnt < _min_periods(window, min_periods)] = np.nan
+    return z
+
+
+def rolling_mad(values, window=14, min_periods=None):
+    """Modified z-score 0.6745 (x - median) / MAD over the `window` points
+    before each point; NaN until min_periods points of history exist."""
+    x  = np.asarray(values, dtype=float)
+    n  = len(x)
+    mp = _min_periods(window, min_periods)
+    med = np.full(n, np.nan)
+    mad = np.full(n, np.nan)
+
+    # Buckets with a partial window: at most `window` of them.
+    for i in range(mp, min(window, n)):
+        med[i] = np.median(x[:i])
+        mad[i] = np.median(np.abs(x[:i] - med[i]))
+
+    if n > window:
+        view = np.lib.stride_tricks.sliding_window_view(x[:-1], window)
+        rows = max(1, MAX_ELEMS // window)
+        for r0 in range(0, len(view), rows):
+            w = view[r0:r0 + rows]
+            m = np.median(w, axis=1)
+            med[window + r0:window + r0 + len(w)] = m
+            mad[window + r0:window + r0 + len(w)] = np.median(
+                np.abs(w - m[:, None]), axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(mad > 0, 0.6745 * (x - med) / mad, 0.0)
+    z[np.isnan(med)] = np.nan
+    return z
+
+
+def _min_periods(window, min_periods):
+    return max(3, window // 2) if min_periods is None else min_periods
+
+
+def detect(values, method='mad', window=14, threshold=None, min_periods=None):
+    """Anomalies(index, score, kind, threshold) for every bucket with
+    |score| >= threshold (default THRESHOLDS[method]); kind is 'spike' or
+    'dip'."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, not {method!r}")
+    threshold = THRESHOLDS[method] if threshold is None else threshold
+    with stage('detect'):
+        score = (rolling_zscore if method == 'zscore' else rolling_mad)(
+            values, window, min_periods)
+        index = np.flatnonzero(np.abs(np.nan_to_num(score)) >= threshold)
+    s = score[index]
+    return Anomalies(index, s, np.where(s > 0, 'spike', 'dip'), threshold)
+
+
+def collapse(anoms):
+    """Keep the first bucket of each run of consecutive same-kind events —
+    one annotation / earcon per episode rather than one per bucket."""
+    idx, kind = anoms.index, anoms.kind
+    if len(idx) == 0:
+        return anoms
+    start = np.ones(len(idx), dtype=bool)
+    start[1:] = (np.diff(idx) > 1) | (kind[1:] != kind[:-1])
+    return anoms._replace(index=idx[start], score=anoms.score[start],
+                          kind=kind[start])
+
+
+# ── Earcons ─────────────────────────────────────────────────────────────
+def _decaying(partials, seconds, decay, sr, glide=0.0):
+    """Exponentially decaying partials; glide > 0 bends the pitch down."""
+    t     = np.arange(int(seconds * sr)) / sr
+    phase = 2 * np.pi * np.cumsum(np.exp(-t * glide)) / sr
+    return np.exp(-t * decay) * sum(g * np.sin(f * phase) for f, g in partials)
+
+
+def tick_wave(sr):
+    """Short 1.76 kHz blip — a neutral marker."""
+    return _decaying(((1760.0, 1.0),), 0.03, 90.0, sr)
+
+
+def thud_wave(sr):
+    """Low 110 Hz knock that drops in pitch — something fell."""
+    return _decaying(((110.0, 1.0), (220.0, 0.3)), 0.16, 24.0, sr, glide=6.0)
+
+
+def chime_wave(sr):
+    """Bell partials a fifth apart — something jumped."""
+    return _decaying(((1320.0, 1.0), (1980.0, 0.5), (2640.0, 0.25)),
+                     0.18, 14.0, sr)
+
+
+EARCONS = {'tick': tick_wave, 'thud': thud_wave, 'chime': chime_wave}
+
+
+@lru_cache(maxsize=8)
+def earcon_bank(sr):
+    """(names, waves): every EARCONS wave peak-normalised and zero-padded
+    into one read-only (n_earcons, length) array."""
+    waves = [EARCONS[name](sr) for name in EARCONS]
+    bank  = np.zeros((len(waves), max(len(w) for w in waves)))
+    for row, w in zip(bank, waves):
+        row[:len(w)] = w / (np.abs(w).max() or 1.0)
+    bank.flags.writeable = False
+    return tuple(EARCONS), bank
+
+
+def earcon_track(anoms, n_buckets, total_samples, sr, gain=EARCON_GAIN,
+                 threshold=None):
+    """Mono track with each event's earcon at the start of its bucket,
+    louder for stronger scores (up to 2× at twice the threshold).  The
+    threshold is the one detect() flagged them with, or THRESHOLDS['mad']
+    for hand-built Anomalies without one."""
+    out = np.zeros(total_samples)
+    if len(anoms.index) == 0:
+        return out
+    names, bank = earcon_bank(sr)
+    kinds, inv  = np.unique(anoms.kind, return_inverse=True)
+    code  = np.array([names.index(EARCON_FOR.get(k, k)) for k in kinds])[inv]
+    limit = threshold or anoms.threshold or THRESHOLDS['mad']
+    level = gain * np.clip(np.abs(anoms.score) / limit, 1.0, 2.0)
+    onsets = (anoms.index * (total_samples / float(n_buckets))).astype(np.int64)
+    with stage('earcons'):
+        return dsp.scatter_add(out, bank[code], onsets, level)
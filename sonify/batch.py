@@ -0,0 +1,288 @@
+"""
+Headless batch renderer.
+
+    python -m sonify.batch jobs.jsonl --out renders/ --workers 8 \\
+                           --format flac --report report.json
+
+Reads a manifest of sonification jobs, renders them on a process pool and
+writes one audio file per job plus a timing report.  Nothing here imports
+matplotlib or sounddevice, or queries an audio device, so it runs on servers
+and in CI.
+
+Manifest: JSON lines (or one JSON list), one object per job:
+
+    {"id": "store-42", "sessions": [...], "revenue": [...],
+     "lag_days": "auto", "mode": "per-day", "ticks": false,
+     "duration": 30, "sample_rate": 44100,
+     "rooms": {"echo": "hall"}, "timbres": {"traffic": "sine"},
+     "stream": true, "render_rate": 24000, "threads": 2}
+
+Series are inline lists, paths to .npy files (relative to the manifest),
+{"synthetic": seed} for the demo data, or {"orders": "orders.csv",
+"sessions": "sessions.csv", "bucket": "hour"} to bucket exported logs with
+sonify.ingest (the same spec under both keys is read once per worker).
+lag_days "auto" runs sonify.lag.detect_lag.  stream=true renders through
+sonify.stream.render_blocks so memory stays flat for very long jobs;
+render_rate synthesises at a lower internal rate and resamples to
+sample_rate, and threads renders the stems of one job concurrently
+(sonify.parallel) — useful when there are fewer jobs than cores
+(build_audio only — stream jobs ignore both).
+
+Jobs are independent and each worker writes its own file, so throughput
+scales with cores until the disk saturates.  Files are written by
+sonify.encode, which converts one block at a time — no full-length integer
+copy.  --format flac / ogg / opus need the soundfile package.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import lru_cache
+
+import numpy as np
+
+from sonify.encode import FORMATS, check as check_format, iter_blocks, write
+
+
+# ── Manifest ────────────────────────────────────────────────────────────
+def load_manifest(path):
+    """List of job dicts from a JSON-lines or JSON-list file.  Relative
+    .npy paths are resolved against the manifest's directory; ids must be
+    unique, since each names its output file."""
+    with open(path) as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        jobs = json.loads(stripped)
+    else:
+        jobs = [json.loads(line) for line in text.splitlines()
+                if line.strip() and not line.lstrip().startswith('#')]
+    base = os.path.dirname(os.path.abspath(path))
+    for i, job in enumerate(jobs):
+        job.setdefault('id', f'job{i:04d}')
+        job['_base'] = base
+    _check_ids(jobs)
+    return jobs
+
+
+def _check_ids(jobs):
+    seen = set()
+    for job in jobs:
+        if job['id'] in seen:
+            raise ValueError(f"duplicate job id {job['id']!r}: jobs would "
+                             "overwrite each other's output")
+        seen.add(job['id'])
+
+
+@lru_cache(maxsize=4)
+def _ingested(orders, sessions, bucket):
+    from sonify.ingest import load_series
+    return load_series(orders, sessions, bucket)
+
+
+def _series(spec, base, which):
+    if isinstance(spec, dict) and 'synthetic' in spec:
+        from sonify.data import generate_data
+        _, sessions, revenue = generate_data(spec['synthetic'])
+        return sessions if which == 'sessions' else revenue
+    if isinstance(spec, dict) and 'orders' in spec:
+        logs = [os.path.join(base, spec[k]) if spec.get(k) else None
+                for k in ('orders', 'sessions')]
+        _, sessions, revenue = _ingested(*logs, spec.get('bucket', 'day'))
+        return sessions if which == 'sessions' else revenue
+    if isinstance(spec, str):
+        return np.load(os.path.join(base, spec))
+    return np.asarray(spec, dtype=float)
+
+
+# ── Worker ──────────────────────────────────────────────────────────────
+def _warm_up():
+    """Import the render stack before the first job, so no job's render_s
+    includes the cold scipy import (seconds on a fresh process)."""
+    import scipy.interpolate
+    import scipy.signal
+    import sonify.lag
+    import sonify.profile
+    import sonify.render
+    import sonify.stream
+
+
+def render_job(job, out_dir, fmt='wav', profile=False, trace_dir=None,
+               dither=None):
+    """Render and write one job; returns its report row.  Runs in a worker
+    process, so failures are caught and reported rather than raised.
+    profile adds per-stage timings to the row; trace_dir also writes a
+    Chrome trace per job; dither goes to the 16-bit encoders."""
+    from sonify.profile import Profiler, stage
+    from sonify.render import AUDIO_DURATION, DEFAULT_SAMPLE_RATE, build_audio
+
+    t0  = time.perf_counter()
+    row = {'id': job['id'], 'pid': os.getpid(), 'status': 'ok'}
+    try:
+        base     = job.get('_base', '.')
+        sessions = _series(job['sessions'], base, 'sessions')
+        revenue  = _series(job['revenue'], base, 'revenue')
+        sr       = int(job.get('sample_rate') or DEFAULT_SAMPLE_RATE)
+        duration = float(job.get('duration') or AUDIO_DURATION)
+        mode     = job.get('mode', 'continuous')
+        ticks    = job.get('ticks', True)
+
+        lag = job.get('lag_days', 1)
+        if lag == 'auto':
+            from sonify.lag import detect_lag
+            lag = detect_lag(sessions, revenue,
+                             max_lag=max(3, len(sessions) // 10)).lag
+        row['lag_days'] = int(lag)
+
+        opts = dict(lag_days=int(lag), mode=mode, ticks=ticks,
+                    rooms=job.get('rooms'), timbres=job.get('timbres'))
+        path = os.path.join(out_dir, f"{job['id']}.{fmt}")
+
+        prof = Profiler() if profile or trace_dir else None
+        with prof if prof is not None else nullcontext():
+            t1 = time.perf_counter()
+            if job.get('stream'):
+                # Rendering and writing interleave; time them together.
+                from sonify.stream import render_blocks
+                blocks = render_blocks(sessions, revenue, sr, duration, **opts)
+                frames = write(fmt, path, blocks, sr, dither=dither)
+                t2 = t3 = time.perf_counter()
+            else:
+                audio  = build_audio(sessions, revenue, sample_rate=sr,
+                                     duration=duration,
+                                     render_rate=job.get('render_rate'),
+                                     threads=job.get('threads'), **opts)
+                t2     = time.perf_counter()
+                with stage('write'):
+                    frames = write(fmt, path, iter_blocks(audio), sr,
+                                   frames=len(audio), dither=dither)
+                t3     = time.perf_counter()
+
+        row.update(path=path, samples=frames, bytes=os.path.getsize(path),
+                   prep_s=t1 - t0, render_s=t2 - t1, write_s=t3 - t2)
+        if prof is not None:
+            row['stages'] = prof.summary()
+            if trace_dir:
+                prof.write_chrome(os.path.join(trace_dir,
+                                               f"{job['id']}.trace.json"))
+    except Exception as e:
+        row.update(status='error', error=f"{type(e).__name__}: {e}")
+    row['total_s'] = time.perf_counter() - t0
+    return row
+
+
+# ── Driver ──────────────────────────────────────────────────────────────
+def run(jobs, out_dir, workers=None, fmt='wav', progress=None, profile=False,
+        trace_dir=None, dither=None):
+    """Render every job on a pool of `workers` processes (default: all
+    cores; 1 runs in-process).  Returns the report dict, whose rows follow
+    the order of `jobs`.  Imports are warmed up before timing starts."""
+    check_format(fmt)          # fail once up front, not once per job
+    _check_ids(jobs)
+    os.makedirs(out_dir, exist_ok=True)
+    if trace_dir:
+        os.makedirs(trace_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    t0, rows = time.perf_counter(), []
+    if workers == 1:
+        _warm_up()
+        for job in jobs:
+            rows.append(render_job(job, out_dir, fmt, profile, trace_dir,
+                                   dither))
+            if progress:
+                progress(rows[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_warm_up) as pool:
+            futures = [pool.submit(render_job, job, out_dir, fmt, profile,
+                                   trace_dir, dither) for job in jobs]
+            for fut in as_completed(futures):
+                rows.append(fut.result())
+                if progress:
+                    progress(rows[-1])
+    wall = time.perf_counter() - t0
+
+    order = {job['id']: i for i, job in enumerate(jobs)}
+    rows.sort(key=lambda r: order[r['id']])
+    busy  = sum(r['total_s'] for r in rows)
+    return {
+        'jobs':    rows,
+        'summary': {
+            'jobs':     len(rows),
+            'failed':   sum(r['status'] != 'ok' for r in rows),
+            'workers':  workers,
+            'format':   fmt,
+            'wall_s':   wall,
+            'busy_s':   busy,
+            # Mean jobs in flight; equals the speedup over a serial run
+            # while workers don't contend for cores.
+            'concurrency': busy / wall if wall > 0 else float('nan'),
+            'jobs_per_s': len(rows) / wall if wall > 0 else float('nan'),
+            'bytes':    sum(r.get('bytes', 0) for r in rows),
+        },
+    }
+
+
+def _print_row(row):
+    if row['status'] == 'ok':
+        print(f"   {row['id']:<24} {row['render_s']:7.2f}s render  "
+              f"{row['write_s']:6.2f}s write  {row['bytes'] / 1e6:7.1f} MB  "
+              f"[pid {row['pid']}]")
+        if 'stages' in row:
+            print("      " + "  ·  ".join(
+                f"{path} {s['total_s'] * 1e3:.0f}ms"
+                for path, s in row['stages'].items() if '/' not in path))
+    else:
+        print(f"   {row['id']:<24} FAILED  {row['error']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.batch',
+                                 description=__doc__.split('\n\n')[0].strip())
+    ap.add_argument('manifest', help="JSON-lines or JSON-list job manifest")
+    ap.add_argument('--out', default='renders', help="output directory")
+    ap.add_argument('--workers', type=int, default=None,
+                    help="worker processes (default: all cores)")
+    ap.add_argument('--format', choices=FORMATS, default='wav',
+                    help="flac / ogg / opus need the soundfile package")
+    ap.add_argument('--dither', choices=['tpdf'],
+                    help="TPDF dither before 16-bit rounding (wav, flac)")
+    ap.add_argument('--report', help="write the JSON timing report here")
+    ap.add_argument('--profile', action='store_true',
+                    help="add per-stage timings to each job's report row")
+    ap.add_argument('--trace-dir',
+                    help="also write a Chrome trace per job into this directory")
+    args = ap.parse_args(argv)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"Rendering {len(jobs)} job(s) → {args.out}/  "
+          f"[{args.workers or os.cpu_count()} workers, {args.format}]")
+    try:
+        report = run(jobs, args.out, args.workers, args.format, _print_row,
+                     args.profile, args.trace_dir, args.dither)
+    except RuntimeError as e:          # format not encodable here
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    s = report['summary']
+    print(f"\n{s['jobs']} job(s), {s['failed']} failed, in {s['wall_s']:.2f}s  "
+          f"({s['jobs_per_s']:.2f} jobs/s, {s['busy_s']:.2f}s of work, "
+          f"concurrency {s['concurrency']:.2f})")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+    return 1 if s['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
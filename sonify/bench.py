@@ -0,0 +1,286 @@
+"""
+Benchmark suite for the renderer.
+
+    python -m sonify.bench run --out baseline.json          # full sweep
+    python -m sonify.bench run --quick --out new.json       # CI-sized sweep
+    python -m sonify.bench compare baseline.json new.json --threshold 0.15
+
+Cases
+  build_audio  mode × ticks × series length × sample rate × duration
+  ticks        the day-tick track alone (_day_tick_track)
+  rebuild      the dashboard toggle path: a warm StemCache, then ticks off,
+               per-day, and back — what a click costs
+  multitrack   render_multitrack with 1 / 4 / 16 tracks (alternating pitch
+               and density tracks) — should grow linearly
+
+Every case runs in a fresh process (spawned, one task per child), so peak
+RSS is the case's own and no import or cache warm-up leaks between cases.
+Wall time is the best of --repeat runs; peak memory comes from one extra
+run under tracemalloc (NumPy reports its buffers to it) plus the child's
+ru_maxrss.  Results are JSON: a meta block describing the machine and one
+entry per case id, so baselines from the same machine can be compared.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+LENGTHS   = (30, 365, 2000, 10_000, 100_000)
+RATES     = (44100, 48000)
+DURATIONS = (18.0, 60.0)
+MODES     = ('continuous', 'per-day')
+TRACKS    = (1, 4, 16)
+
+QUICK = dict(lengths=(30, 365, 2000), rates=(44100, 48000), durations=(18.0,))
+
+TIME_THRESHOLD = 0.15       # flag a case whose best time grew more than this
+MEM_THRESHOLD  = 0.25
+MIN_DELTA_S    = 0.005      # ...and by at least this much (timer noise)
+MIN_DELTA_MB   = 1.0
+
+
+# ── Cases ───────────────────────────────────────────────────────────────
+def case_id(kind, **p):
+    return kind + ''.join(f"/{k}={v}" for k, v in p.items())
+
+
+def cases(lengths=LENGTHS, rates=RATES, durations=DURATIONS, modes=MODES):
+    """(id, kind, params) for every case in the sweep."""
+    out = []
+    for n, sr, dur in itertools.product(lengths, rates, durations):
+        for mode, ticks in itertools.product(modes, (True, False)):
+            p = dict(mode=mode, ticks=ticks, n=n, sr=sr, dur=dur)
+            out.append((case_id('build_audio', **p), 'build_audio', p))
+        p = dict(n=n, sr=sr, dur=dur)
+        out.append((case_id('ticks', **p), 'ticks', p))
+    for n in lengths:
+        p = dict(n=n, sr=rates[-1], dur=durations[0])
+        out.append((case_id('rebuild', **p), 'rebuild', p))
+        for k in TRACKS:
+            p = dict(n=n, tracks=k, sr=rates[-1], dur=durations[0])
+            out.append((case_id('multitrack', **p), 'multitrack', p))
+    return out
+
+
+def _workload(kind, p):
+    """Zero-argument callable running one case (inputs built up front)."""
+    from sonify import render
+    from sonify.cache import StemCache
+    from sonify.data import demo_series
+
+    sess, rev = demo_series(p['n'])
+    sr, dur   = p['sr'], p['dur']
+    if kind == 'build_audio':
+        return lambda: render.build_audio(sess, rev, mode=p['mode'],
+                                          ticks=p['ticks'], sample_rate=sr,
+                                          duration=dur)
+    if kind == 'ticks':
+        total = int(dur * sr)
+        return lambda: render._day_tick_track(total, p['n'], sr)
+    if kind == 'rebuild':
+        cache = StemCache()
+        render.build_audio(sess, rev, sample_rate=sr, duration=dur, cache=cache)
+
+        def toggles():
+            for mode, ticks in (('continuous', False), ('per-day', True),
+                                ('continuous', True)):
+                render.build_audio(sess, rev, mode=mode, ticks=ticks,
+                                   sample_rate=sr, duration=dur, cache=cache)
+            return cache
+        return toggles
+    if kind == 'multitrack':
+        from sonify.multitrack import render_multitrack
+        tracks = [{'metric': ('sessions', 'revenue')[i % 2],
+                   'mapping': ('pitch', 'density')[i % 2],
+                   'pan': i / max(p['tracks'] - 1, 1) * 2 - 1}
+                  for i in range(p['tracks'])]
+        metrics = {'sessions': sess, 'revenue': rev}
+        return lambda: render_multitrack(metrics, tracks, sr, dur)
+    raise ValueError(f"unknown case kind {kind!r}")
+
+
+def _rss_mb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def run_case(kind, p, repeat=3):
+    """Measure one case in the current process; returns its result dict."""
+    import tracemalloc
+
+    fn   = _workload(kind, p)
+    base = _rss_mb()
+    fn()                                    # warm-up (filter design, tables)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'kind': kind, 'params': p, 'best_s': min(times),
+            'mean_s': float(np.mean(times)), 'repeat': repeat,
+            'peak_mb': peak / 2 ** 20, 'rss_mb': _rss_mb() - base}
+
+
+def machine():
+    import subprocess
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True,
+                             cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        rev = ''
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'machine': platform.machine(),
+            'cpus': os.cpu_count(), 'git': rev,
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def run(selected, repeat=3, isolate=True, progress=None):
+    """Run (id, kind, params) cases; returns the baseline dict.  A case
+    that raises or kills its process is recorded with an 'error'."""
+    import multiprocessing
+    ctx, pool, results = multiprocessing.get_context('spawn'), None, {}
+    try:
+        for cid, kind, p in selected:
+            try:
+                if isolate:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(1, mp_context=ctx,
+                                                   max_tasks_per_child=1)
+                    res = pool.submit(run_case, kind, p, repeat).result()
+                else:
+                    res = run_case(kind, p, repeat)
+            except Exception as e:
+                res = {'kind': kind, 'params': p,
+                       'error': f"{type(e).__name__}: {e}"}
+                if isolate:
+                    pool.shutdown()
+                    pool = None         # a dead worker breaks the pool
+            results[cid] = res
+            if progress:
+                progress(cid, res)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {'meta': machine(), 'results': results}
+
+
+# ── Comparison ──────────────────────────────────────────────────────────
+def compare(base, new, threshold=TIME_THRESHOLD, mem_threshold=MEM_THRESHOLD):
+    """Rows for every case in both runs; row['regressed'] is True when time
+    or tracemalloc peak grew past its threshold (and past the noise floor)."""
+    rows = []
+    for cid in sorted(set(base['results']) & set(new['results'])):
+        b, n = base['results'][cid], new['results'][cid]
+        if 'error' in b or 'error' in n:
+            rows.append({'id': cid, 'error': n.get('error') or b.get('error'),
+                         'regressed': 'error' in n})
+            continue
+        t_ratio = n['best_s'] / b['best_s'] if b['best_s'] > 0 else float('inf')
+        m_ratio = n['peak_mb'] / b['peak_mb'] if b['peak_mb'] > 0 else 1.0
+        slow = (t_ratio > 1 + threshold
+                and n['best_s'] - b['best_s'] > MIN_DELTA_S)
+        fat  = (m_ratio > 1 + mem_threshold
+                and n['peak_mb'] - b['peak_mb'] > MIN_DELTA_MB)
+        rows.append({'id': cid, 'base_s': b['best_s'], 'new_s': n['best_s'],
+                     'time_ratio': t_ratio, 'base_mb': b['peak_mb'],
+                     'new_mb': n['peak_mb'], 'mem_ratio': m_ratio,
+                     'regressed': slow or fat})
+    return rows
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────
+def _floats(text):
+    return tuple(float(x) for x in text.split(','))
+
+
+def _ints(text):
+    return tuple(int(x) for x in text.split(','))
+
+
+def _print_result(cid, r):
+    if 'error' in r:
+        print(f"   {cid:<64} FAILED  {r['error']}", flush=True)
+        return
+    print(f"   {cid:<64} {r['best_s'] * 1e3:9.1f} ms  "
+          f"{r['peak_mb']:8.1f} MB peak  {r['rss_mb']:8.1f} MB rss", flush=True)
+
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(prog='python -m sonify.bench',
+                                  description="Renderer benchmarks and "
+                                              "baseline comparison.")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+
+    r = sub.add_parser('run', help="run the sweep and write a JSON baseline")
+    r.add_argument('--out', default='bench.json')
+    r.add_argument('--quick', action='store_true',
+                   help="lengths 30–2000, 18 s only")
+    r.add_argument('--lengths', type=_ints)
+    r.add_argument('--rates', type=_ints)
+    r.add_argument('--durations', type=_floats)
+    r.add_argument('--modes', type=lambda s: tuple(s.split(',')))
+    r.add_argument('--only', help="substring filter on case ids")
+    r.add_argument('--repeat', type=int, default=3)
+    r.add_argument('--no-isolate', action='store_true',
+                   help="run every case in this process (faster, RSS shared)")
+
+    c = sub.add_parser('compare', help="flag regressions against a baseline")
+    c.add_argument('base')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=TIME_THRESHOLD,
+                   help="allowed fractional slowdown (default %(default)s)")
+    c.add_argument('--mem-threshold', type=float, default=MEM_THRESHOLD)
+    args = ap.parse_args(argv)
+
+    if args.cmd == 'run':
+        grid = dict(QUICK) if args.quick else {}
+        for k in ('lengths', 'rates', 'durations', 'modes'):
+            if getattr(args, k):
+                grid[k] = getattr(args, k)
+        selected = [c for c in cases(**grid)
+                    if not args.only or args.only in c[0]]
+        print(f"Running {len(selected)} case(s), best of {args.repeat}")
+        report = run(selected, args.repeat, not args.no_isolate, _print_result)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.out}")
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if base['meta'].get('machine') != new['meta'].get('machine') or \
+            base['meta'].get('cpus') != new['meta'].get('cpus'):
+        print("   warning: baselines come from different machines")
+    rows = compare(base, new, args.threshold, args.mem_threshold)
+    for row in rows:
+        flag = "REGRESSED" if row['regressed'] else ""
+        if 'error' in row:
+            print(f"   {row['id']:<64} {row['error']}  {flag}")
+            continue
+        print(f"   {row['id']:<64} {row['base_s'] * 1e3:9.1f} → "
+              f"{row['new_s'] * 1e3:9.1f} ms ({row['time_ratio']:5.2f}×)  "
+              f"{row['base_mb']:7.1f} → {row['new_mb']:7.1f} MB  {flag}")
+    bad = [row for row in rows if row['regressed']]
+    print(f"\n{len(rows)} case(s) compared, {len(bad)} regression(s) "
+          f"(time > +{args.threshold:.0%}, memory > +{args.mem_threshold:.0%})")
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
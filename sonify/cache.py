@@ -0,0 +1,101 @@
+"""
+Stem-level render cache.
+
+build_audio() renders three independent layers — traffic, echo and ticks —
+and mixes them.  StemCache keeps rendered layers keyed by a content hash of
+exactly the inputs each layer depends on, so toggling ticks or switching
+back to a previous mode is a remix rather than a re-synthesis.
+
+Entries are evicted least-recently-used once the cached arrays exceed a
+byte budget.  Cached arrays are marked read-only; callers mix into fresh
+buffers.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_BUDGET = 256 * 1024 * 1024   # bytes
+
+
+def stem_key(name, *parts):
+    """Content hash of a stem name and the inputs it depends on.  Arrays are
+    hashed by dtype, shape and bytes; everything else by repr()."""
+    h = hashlib.blake2b(name.encode(), digest_size=16)
+    for p in parts:
+        if isinstance(p, np.ndarray):
+            a = np.ascontiguousarray(p)
+            h.update(f"|{a.dtype.str}{a.shape}|".encode())
+            h.update(a.tobytes())
+        else:
+            h.update(f"|{p!r}|".encode())
+    return f"{name}:{h.hexdigest()}"
+
+
+class StemCache:
+    """LRU cache of rendered stems bounded by total array bytes."""
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET):
+        self.max_bytes = max_bytes
+        self._items    = OrderedDict()
+        self._bytes    = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._lock     = threading.Lock()   # stems may render on a pool
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        with self._lock:
+            arr = self._items.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, key, arr):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key).nbytes
+            if arr.nbytes > self.max_bytes:
+                return arr                 # never fits — don't flush the rest
+            arr.setflags(write=False)
+            self._items[key] = arr
+            self._bytes += arr.nbytes
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= old.nbytes
+                self.evictions += 1
+            return arr
+
+    def get_or_render(self, key, render):
+        arr = self.get(key)
+        if arr is None:
+            arr = self.put(key, render())
+        return arr
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits':      self.hits,
+            'misses':    self.misses,
+            'hit_rate':  self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries':   len(self._items),
+            'bytes':     self._bytes,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,51 @@
+"""
+Demo data: a synthetic 30-day store where revenue follows traffic, and
+demo-shaped series of any length for benchmarks and tests.
+Real order / session exports load through sonify.ingest.load_series, which
+returns the same (days, sessions, revenue) arrays.
+"""
+
+import numpy as np
+
+
+def generate_data(seed=42):
+    np.random.seed(seed)
+    days = np.arange(30)
+
+    weekly  = 1 + 0.3 * np.sin(2 * np.pi * days / 7 + 1.0)
+    trend   = 1 + days * 0.015
+    noise   = np.random.lognormal(0, 0.10, 30)
+    sessions = (1400 * weekly * trend * noise).astype(int)
+
+    sessions[10:13] = (sessions[10:13] * 3.2).astype(int)
+    sessions[18:23] = (sessions[18:23] * 1.9).astype(int)
+    sessions[25]    = int(sessions[25] * 4.5)
+
+    avg_order_value = 87.0
+    conversion_rate = 0.034
+    # Revenue trails traffic: today's orders come from the last three days'
+    # sessions (clamped at day 0).
+    revenue = (
+        0.30 * sessions +
+        0.50 * sessions[np.maximum(0, days - 1)] +
+        0.20 * sessions[np.maximum(0, days - 2)]
+    ) * avg_order_value * conversion_rate
+    revenue += np.random.normal(0, revenue.std() * 0.05, 30)
+    revenue = np.clip(revenue, 0, None)
+
+    return days, sessions, revenue
+
+
+def demo_series(n, seed=0):
+    """(sessions, revenue) of any length: weekly cycle, trend, spikes, and
+    revenue trailing sessions by one bucket."""
+    rng  = np.random.default_rng(seed)
+    t    = np.arange(n)
+    sess = 1400 * (1 + 0.3 * np.sin(2 * np.pi * t / 7 + 1.0)) \
+                * (1 + 0.5 * t / n) * rng.lognormal(0, 0.10, n)
+    spikes = rng.choice(n, max(1, n // 10), replace=False)
+    sess[spikes] *= rng.uniform(1.5, 4.0, len(spikes))
+    rev = np.empty(n)
+    rev[1:] = sess[:-1] * rng.uniform(0.02, 0.05, n - 1)
+    rev[0]  = sess[0] * 0.03
+    return sess.astype(int), rev
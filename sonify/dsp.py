@@ -0,0 +1,136 @@
+"""
+Shared DSP building blocks.
+
+Everything here used to live inside build_audio(); it is hoisted so the
+full-buffer renderer and the streaming renderer synthesise exactly the same
+sound.  Functions are stateless — streaming state lives in sonify.stream.
+The tap sets below are the classic rooms; sonify.reverb turns them into
+impulse responses.
+"""
+
+import numpy as np
+
+# Reverb tap sets: (delay_ms, decay) — see sonify.reverb.PRESETS
+LEFT_TAPS  = [(18, 0.20), (37, 0.12), (58, 0.07)]
+RIGHT_TAPS = [(28, 0.45), (55, 0.32), (90, 0.20), (135, 0.12)]
+NOTE_TAPS  = [(28, 0.35), (55, 0.20)]
+
+CHORUS_DETUNE = (1.000, 1.015, 0.985)   # three chorus voices on the echo
+
+LEFT_CUTOFF  = 1000    # Hz — organ pad low-pass
+RIGHT_CUTOFF = 2500    # Hz — echo low-pass
+
+CHANNEL_TARGETS = (0.80, 0.80)   # peak level per channel after normalisation
+
+
+ORGAN_HARMONICS  = (1.00, 0.50, 0.25, 0.10)
+BRIGHT_HARMONICS = (1.00, 0.80, 0.60, 0.45, 0.30, 0.18)
+
+MAX_PITCH = 640.0   # Hz — top of log_pitch's range
+
+
+def additive(phase, harmonics):
+    """Sum of sin(k·phase) weighted by harmonics[k-1] — the exact reference
+    the wavetables in sonify.wavetable are built from."""
+    out = 0
+    for k, amp in enumerate(harmonics, start=1):
+        if amp:
+            out = out + amp * np.sin(k * phase)
+    return out
+
+
+def organ(phase):
+    """Warm organ: heavy on fundamentals, fades toward upper harmonics."""
+    return additive(phase, ORGAN_HARMONICS)
+
+
+def bright(phase):
+    """Bright string/synth: rising upper harmonics — clearly distinct from organ."""
+    return additive(phase, BRIGHT_HARMONICS)
+
+
+def lowpass_sos(cutoff_hz, sr):
+    """2nd-order Butterworth low-pass as second-order sections."""
+    from scipy.signal import butter
+    return butter(2, min(cutoff_hz / (sr / 2), 0.99), btype='low', output='sos')
+
+
+def lowpass(sig, cutoff_hz, sr):
+    from scipy.signal import sosfilt
+    return sosfilt(lowpass_sos(cutoff_hz, sr), sig)
+
+
+def tap_delays(taps, sr):
+    """Convert (delay_ms, decay) taps to (delay_samples, decay)."""
+    return [(int(sr * delay_ms / 1000), decay) for delay_ms, decay in taps]
+
+
+def minmax_norm(x, lo, hi):
+    return (x - lo) / (hi - lo + 1e-9)
+
+
+def log_pitch(x_logn):
+    """80–640 Hz (MAX_PITCH), 3 octaves, exponential in the normalised log value."""
+    return 80.0 * (2.0 ** (3.0 * x_logn))
+
+
+def pluck_envelope(n, decay, sr):
+    """Fast linear attack (6 ms) into an exponential decay."""
+    t = np.arange(n) / sr
+    env = np.exp(-t * decay)
+    atk = min(int(0.006 * sr), n)
+    env[:atk] = np.linspace(0, 1, atk)
+    return env
+
+
+def click_wave(sr):
+    """Soft woodblock click used for the per-day ticks."""
+    click_dur = int(0.018 * sr)
+    click_t   = np.arange(click_dur) / sr
+    return (np.exp(-click_t * 300.0) *
+            np.sin(2 * np.pi * 900.0 * click_t)) * 0.13
+
+
+def resample(x, sr_in, sr_out, n_out=None):
+    """Polyphase resample of x (along axis 0) from sr_in to sr_out, trimmed or
+    zero-padded to n_out samples.  The ratio is reduced by its gcd, so
+    24 kHz → 48 kHz is a plain 2× interpolator and 24 → 44.1 kHz 147/80."""
+    from math import gcd
+    from scipy.signal import resample_poly
+
+    if sr_in == sr_out:
+        y = x
+    else:
+        g = gcd(int(sr_in), int(sr_out))
+        y = resample_poly(x, int(sr_out) // g, int(sr_in) // g, axis=0)
+    if n_out is None or len(y) == n_out:
+        return y
+    if len(y) > n_out:
+        return y[:n_out]
+    pad = np.zeros((n_out - len(y),) + y.shape[1:], dtype=y.dtype)
+    return np.concatenate([y, pad])
+
+
+def scatter_add(out, wave, onsets, gains=1.0):
+    """Add `wave` × gain at every onset of mono `out` in one bincount.
+    gains is a scalar or one per onset; wave is one shared wave or one row
+    per onset (n_onsets, length).  Events past the end are truncated."""
+    onsets = np.asarray(onsets, dtype=np.int64)
+    wave   = np.asarray(wave)
+    if len(onsets) == 0 or wave.shape[-1] == 0:
+        return out
+    idx  = onsets[:, None] + np.arange(wave.shape[-1])[None, :]
+    keep = (idx >= 0) & (idx < len(out))
+    w    = (np.asarray(gains, dtype=float).reshape(-1, 1) * wave)
+    w    = np.broadcast_to(w, idx.shape)[keep]
+    idx  = idx[keep]
+    if len(idx) == 0:
+        return out
+    lo   = idx.min()               # bin only the span the events touch
+    out[lo:idx.max() + 1] += np.bincount(idx - lo, weights=w).astype(out.dtype)
+    return out
+
+
+def interp_kind(n_points):
+    """Cubic needs at least four points; shorter series fall back to linear."""
+    return 'cubic' if n_points >= 4 else 'linear'
@@ -0,0 +1,299 @@
+"""
+Streaming encoders: float blocks in, encoded bytes out.
+
+    data = encode(audio, 'flac', 48000)                    # bytes
+    write('wav', sock.makefile('wb'), iter_blocks(audio), 48000)
+    python -m sonify.encode --seconds 60                   # throughput
+
+Formats
+  wav   16-bit PCM, written here block by block
+  flac  16-bit FLAC      ┐
+  ogg   Ogg Vorbis       ├ via soundfile (libsndfile), when installed
+  opus  Ogg Opus         ┘ (libsndfile >= 1.0.29 built with Opus)
+
+Each block is converted to int16 in a pair of reusable scratch buffers, so
+no int16 copy of the whole signal is ever made, and bytes reach the
+destination as they are produced.  dither='tpdf' adds ±1 LSB triangular
+noise before rounding (otherwise samples are rounded to nearest); the
+lossy codecs take float input and ignore it.
+
+Destinations are paths or binary file objects: BytesIO, an open file, or
+a socket's makefile('wb').  A WAV header needs the length: it is exact
+when `frames` is known (encode() knows it), patched afterwards on seekable
+outputs, and otherwise left at the streaming placeholder 0xFFFFFFFF that
+players treat as "until end of stream".  libsndfile seeks while writing,
+so on non-seekable outputs the other formats are encoded in memory and
+sent in WRITE_BLOCK-sized chunks at the end.
+"""
+
+import argparse
+import io
+import struct
+import sys
+import time
+
+import numpy as np
+
+WRITE_BLOCK = 1 << 16     # frames converted and written per chunk
+FORMATS     = ('wav', 'flac', 'ogg', 'opus')
+MIME        = {'wav': 'audio/wav', 'flac': 'audio/flac', 'ogg': 'audio/ogg',
+               'opus': 'audio/ogg; codecs=opus'}
+DITHERS     = (None, 'tpdf')
+
+# soundfile (format, subtype, takes int16) per format
+_SF_FORMATS = {'flac': ('FLAC', 'PCM_16', True),
+               'ogg':  ('OGG', 'VORBIS', False),
+               'opus': ('OGG', 'OPUS', False)}
+OPUS_RATES  = (8000, 12000, 16000, 24000, 48000)
+
+
+# ── Blocks and PCM conversion ───────────────────────────────────────────
+def iter_blocks(audio, size=WRITE_BLOCK):
+    """Views of `audio` in consecutive `size`-frame blocks."""
+    for i in range(0, len(audio), size):
+        yield audio[i:i + size]
+
+
+class PCM16:
+    """Float block → int16 block, reusing its scratch buffers.  The array
+    returned is only valid until the next call."""
+
+    def __init__(self, dither=None, seed=None):
+        if dither not in DITHERS:
+            raise ValueError(f"dither must be one of {DITHERS}, not {dither!r}")
+        self.dither = dither
+        self._rng   = np.random.default_rng(seed) if dither else None
+        self._f     = np.empty(0)
+        self._n     = np.empty(0)
+        self._i     = np.empty(0, dtype='<i2')
+
+    def _scratch(self, shape):
+        if self._f.shape != shape:
+            self._f = np.empty(shape)
+            self._n = np.empty(shape) if self.dither else self._n
+            self._i = np.empty(shape, dtype='<i2')
+
+    def __call__(self, block):
+        block = np.asarray(block)
+        self._scratch(block.shape)
+        f = self._f
+        np.multiply(block, 32767.0, out=f)
+        if self.dither == 'tpdf':
+            self._rng.random(out=self._n)
+            f += self._n
+            self._rng.random(out=self._n)
+            f -= self._n
+        np.rint(f, out=f)
+        np.clip(f, -32767, 32767, out=f)
+        np.copyto(self._i, f, casting='unsafe')
+        return self._i
+
+
+# ── Writers ─────────────────────────────────────────────────────────────
+def _open(dest):
+    """(file object, close_when_done)."""
+    if isinstance(dest, (str, bytes)) or hasattr(dest, '__fspath__'):
+        return open(dest, 'wb'), True
+    return dest, False
+
+
+def _seekable(f):
+    try:
+        return f.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def _wav_header(frames, sample_rate, channels):
+    if frames is None:
+        data = riff = 0xFFFFFFFF
+    else:
+        data = frames * channels * 2
+        riff = min(36 + data, 0xFFFFFFFF)
+        data = min(data, 0xFFFFFFFF)
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', riff, b'WAVE', b'fmt ',
+                       16, 1, channels, sample_rate, sample_rate * channels * 2,
+                       channels * 2, 16, b'data', data)
+
+
+def write_wav(dest, blocks, sample_rate, channels=2, frames=None,
+              dither=None):
+    """16-bit PCM WAV from an iterable of (n, channels) — or mono (n,) —
+    float blocks.  Returns the number of frames written."""
+    f, close = _open(dest)
+    try:
+        start = f.tell() if _seekable(f) else None
+        f.write(_wav_header(frames, sample_rate, channels))
+        pcm, n = PCM16(dither), 0
+        for block in blocks:
+            f.write(pcm(block).tobytes())
+            n += len(block)
+        if n != frames and start is not None:
+            end = f.tell()
+            f.seek(start)
+            f.write(_wav_header(n, sample_rate, channels))
+            f.seek(end)
+        f.flush()
+    finally:
+        if close:
+            f.close()
+    return n
+
+
+def soundfile():
+    """The soundfile module, or a RuntimeError saying how to get it."""
+    try:
+        import soundfile
+    except ImportError:
+        raise RuntimeError("FLAC / Ogg output needs the 'soundfile' package "
+                           "(pip install soundfile); use wav")
+    return soundfile
+
+
+def check(fmt, sample_rate=None):
+    """Raise if `fmt` can't be encoded here (at sample_rate, for opus)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {FORMATS}")
+    if fmt == 'wav':
+        return
+    sf = soundfile()
+    major, subtype, _ = _SF_FORMATS[fmt]
+    if subtype not in sf.available_subtypes(major):
+        raise RuntimeError(f"this libsndfile ({sf.__libsndfile_version__}) "
+                           f"can't write {major}/{subtype}")
+    if fmt == 'opus' and sample_rate is not None and sample_rate not in OPUS_RATES:
+        raise RuntimeError(f"Opus needs a sample rate in {OPUS_RATES}, "
+                           f"not {sample_rate}")
+
+
+def available():
+    """Formats this environment can encode."""
+    out = []
+    for fmt in FORMATS:
+        try:
+            check(fmt)
+        except RuntimeError:
+            continue
+        out.append(fmt)
+    return out
+
+
+def _write_sf(fmt, dest, blocks, sample_rate, channels=2, frames=None,
+              dither=None):
+    check(fmt, sample_rate)
+    sf = soundfile()
+    major, subtype, as_int = _SF_FORMATS[fmt]
+    f, close = _open(dest)
+    direct = _seekable(f)
+    sink   = f if direct else io.BytesIO()
+    pcm, n = PCM16(dither), 0
+    try:
+        with sf.SoundFile(sink, 'w', samplerate=sample_rate, channels=channels,
+                          format=major, subtype=subtype) as out:
+            for block in blocks:
+                out.write(pcm(block) if as_int else np.asarray(block))
+                n += len(block)
+        if not direct:
+            view = sink.getbuffer()
+            for i in range(0, len(view), WRITE_BLOCK):
+                f.write(view[i:i + WRITE_BLOCK])
+            view.release()
+        f.flush()
+    finally:
+        if close:
+            f.close()
+    return n
+
+
+def write_flac(dest, blocks, sample_rate, channels=2, frames=None, dither=None):
+    """16-bit FLAC via soundfile (optional dependency)."""
+    return _write_sf('flac', dest, blocks, sample_rate, channels, frames, dither)
+
+
+def write_ogg(dest, blocks, sample_rate, channels=2, frames=None, dither=None):
+    """Ogg Vorbis via soundfile (optional dependency)."""
+    return _write_sf('ogg', dest, blocks, sample_rate, channels, frames, dither)
+
+
+def write_opus(dest, blocks, sample_rate, channels=2, frames=None, dither=None):
+    """Ogg Opus via soundfile, if its libsndfile has Opus."""
+    return _write_sf('opus', dest, blocks, sample_rate, channels, frames, dither)
+
+
+WRITERS = {'wav': write_wav, 'flac': write_flac, 'ogg': write_ogg,
+           'opus': write_opus}
+
+
+def write(fmt, dest, blocks, sample_rate, channels=2, frames=None, dither=None):
+    """Encode float blocks as `fmt` into a path or binary file object."""
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {FORMATS}")
+    return WRITERS[fmt](dest, blocks, sample_rate, channels, frames, dither)
+
+
+def encode(audio, fmt='wav', sample_rate=48000, dither=None,
+           block=WRITE_BLOCK):
+    """Encoded bytes of a float array, (n,) mono or (n, channels)."""
+    audio = np.asarray(audio)
+    buf   = io.BytesIO()
+    write(fmt, buf, iter_blocks(audio, block), sample_rate,
+          1 if audio.ndim == 1 else audio.shape[1], len(audio), dither)
+    return buf.getvalue()
+
+
+# ── Throughput ──────────────────────────────────────────────────────────
+def throughput(audio, sample_rate, formats=None, dither=None, repeat=3):
+    """{fmt: {bytes, best_s, bytes_per_s, realtime}} encoding `audio` into
+    memory; formats this environment can't encode get an 'error'."""
+    out = {}
+    for fmt in formats or FORMATS:
+        try:
+            check(fmt, sample_rate)
+        except (RuntimeError, ValueError) as e:
+            out[fmt] = {'error': str(e)}
+            continue
+        times = []
+        for _ in range(repeat):
+            t0   = time.perf_counter()
+            data = encode(audio, fmt, sample_rate, dither)
+            times.append(time.perf_counter() - t0)
+        best = min(times)
+        out[fmt] = {'bytes': len(data), 'best_s': best,
+                    'bytes_per_s': len(data) / best,
+                    'realtime': len(audio) / sample_rate / best}
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.encode',
+                                 description="Encoder throughput on the demo "
+                                             "render, into memory.")
+    ap.add_argument('--formats', type=lambda s: tuple(s.split(',')),
+                    default=FORMATS)
+    ap.add_argument('--seconds', type=float, default=18.0,
+                    help="length of the demo render (default %(default)s)")
+    ap.add_argument('--sample-rate', type=int, default=48000)
+    ap.add_argument('--dither', choices=[d for d in DITHERS if d])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+
+    from sonify.data import generate_data
+    from sonify.render import build_audio
+
+    _, sessions, revenue = generate_data()
+    audio = build_audio(sessions, revenue, sample_rate=args.sample_rate,
+                        duration=args.seconds)
+    print(f"Encoding {args.seconds:g}s stereo at {args.sample_rate} Hz, "
+          f"best of {args.repeat}")
+    for fmt, r in throughput(audio, args.sample_rate, args.formats,
+                             args.dither, args.repeat).items():
+        if 'error' in r:
+            print(f"   {fmt:<5} unavailable: {r['error']}")
+            continue
+        print(f"   {fmt:<5} {r['bytes'] / 1e6:8.2f} MB  {r['best_s'] * 1e3:8.1f} ms  "
+              f"{r['bytes_per_s'] / 1e6:8.1f} MB/s  {r['realtime']:7.0f}× realtime")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
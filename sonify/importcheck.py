@@ -0,0 +1,80 @@
+"""
+Import-time budget check.
+
+    python -m sonify.importcheck                 # default modules and budget
+    python -m sonify.importcheck --budget-ms 250 sonify.render sonify.stream
+
+Imports each module in a fresh interpreter (best of --repeat runs, so disk
+cache warm-up doesn't count), and fails if it takes longer than the budget
+or drags in a module that only the interactive dashboard should load.
+Run it in CI after touching imports; exit status is 1 on any violation.
+The budget is wall time for the whole import including numpy, which is
+most of it.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES   = ('sonify.render', 'sonify.stream', 'sonify.lag', 'sonify.batch',
+             'sonify_dashboard')
+BUDGET_MS = 250.0
+FORBIDDEN = ('matplotlib', 'sounddevice', 'scipy', 'soundfile')
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{'ms': dt * 1e3, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def measure(module, repeat=3):
+    """(best import time in ms, module names loaded) for a cold import."""
+    best, loaded = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module)],
+                             capture_output=True, text=True, check=True)
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        if res['ms'] < best:
+            best, loaded = res['ms'], res['modules']
+    return best, loaded
+
+
+def check(modules=MODULES, budget_ms=BUDGET_MS, forbidden=FORBIDDEN, repeat=3):
+    """One result dict per module: ms, within budget, forbidden imports."""
+    results = []
+    for module in modules:
+        ms, loaded = measure(module, repeat)
+        heavy = sorted({name.split('.')[0] for name in loaded}
+                       & set(forbidden))
+        results.append({'module': module, 'ms': ms,
+                        'ok': ms <= budget_ms and not heavy,
+                        'forbidden': heavy})
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.importcheck',
+                                 description="Fail if importing the core is "
+                                             "slow or loads GUI/device modules.")
+    ap.add_argument('modules', nargs='*', default=list(MODULES))
+    ap.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+
+    results = check(args.modules, args.budget_ms, repeat=args.repeat)
+    for r in results:
+        flag = "ok  " if r['ok'] else "FAIL"
+        note = f"  loads {', '.join(r['forbidden'])}" if r['forbidden'] else ""
+        print(f"   {flag} {r['module']:<20} {r['ms']:7.1f} ms{note}")
+    failed = [r for r in results if not r['ok']]
+    print(f"\n{len(results) - len(failed)}/{len(results)} within "
+          f"{args.budget_ms:.0f} ms with no GUI/device imports")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Real store data: order and session logs bucketed into the demo's series.
+
+    days, sessions, revenue = load_series('orders.csv', 'sessions.csv',
+                                          bucket='hour')
+    python -m sonify.ingest orders.csv --sessions sessions.csv --bucket hour
+    python -m sonify.ingest --demo 20000000 /tmp/orders.csv    # rows/sec
+
+Inputs, chosen by suffix
+  .csv / .csv.gz  header row + rows, read CHUNK_ROWS rows at a time
+  .parquet        row batches through pyarrow (optional dependency)
+  .npy            structured array, memory-mapped
+  directory       one <column>.npy per column, each memory-mapped
+
+The columns default to the Shopify export names, orders(created_at,
+total_price) and one row per session (created_at); a pre-aggregated
+sessions export with a count column works too (session_cols=('day',
+'sessions')).  Without a sessions log the traffic series is the order count.
+
+CSV blocks are split into columns with array operations, quoted fields
+included; only a block with a comma, newline or doubled quote inside quotes
+is handed to the csv module.
+
+Each chunk's timestamps become integer bucket numbers (seconds // bucket
+width) and are summed with np.bincount over just the span the chunk covers,
+so memory is one chunk plus one counter per bucket, whatever the row count.
+Text timestamps keep their first 19 characters — "2024-05-30 21:38:53
+-0400" buckets by the store's wall-clock day, "...Z" by the UTC day.
+Prices are summed as given; mixed-currency exports are not converted.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from sonify.profile import stage
+
+BUCKETS         = {'day': 86400, 'hour': 3600}
+CHUNK_ROWS      = 1 << 18         # rows parsed / summed per pass
+CSV_ROW_BYTES   = 64              # CSV blocks are CHUNK_ROWS × this many bytes
+ORDER_COLUMNS   = ('created_at', 'total_price')
+SESSION_COLUMNS = ('created_at', None)      # None: count rows
+
+# One file bucketed: `count` rows and `total` of the value column per bucket,
+# bucket 0 starting at `start`.  rows / seconds is the ingest rate.
+Totals = namedtuple('Totals', 'start width count total rows skipped seconds')
+
+
+# ── Readers ─────────────────────────────────────────────────────────────
+def _split_fields(buf, ncols, at):
+    """Fields `at` of every line in a block of unquoted CSV bytes, as
+    fixed-width bytes arrays — newline and comma positions found with array
+    compares, fields taken as rows of a sliding-window view, no per-row
+    Python.  None if a line's comma count doesn't match the header."""
+    b   = np.frombuffer(buf, dtype=np.uint8)
+    nl  = np.flatnonzero(b == 10)
+    sep = np.flatnonzero(b == 44)
+    n   = len(nl)
+    if len(sep) != n * (ncols - 1):
+        return None
+    bounds = np.empty((n, ncols + 1), dtype=np.int64)
+    bounds[:, 0]    = np.concatenate([[0], nl[:-1] + 1])
+    bounds[:, 1:-1] = sep.reshape(n, ncols - 1) + 1
+    bounds[:, -1]   = nl + 1
+    # Sorted positions: a line with too few or too many commas shows up as
+    # some line's commas running past its own newline.
+    if ncols > 1 and (np.any(bounds[:, 1] <= bounds[:, 0]) or
+                      np.any(bounds[:, -2] > bounds[:, -1] - 1)):
+        return None
+    lens = []
+    for i in at:
+        lo, hi = bounds[:, i], bounds[:, i + 1] - 1
+        hi = hi - ((hi > lo) & (b[np.maximum(hi - 1, 0)] == 13))     # \r\n
+        lens.append((lo, hi - lo))
+    b   = np.frombuffer(buf + bytes(max(int(w.max()) for _, w in lens) + 1),
+                        dtype=np.uint8)
+    out = []
+    for lo, w in lens:
+        width = max(1, int(w.max()))
+        cells = np.lib.stride_tricks.sliding_window_view(b, width)[lo]
+        if w.min() < width:
+            cells[np.arange(width) >= w[:, None]] = 0
+        out.append(cells.view(f'S{width}')[:, 0])
+    return out
+
+
+def _unquote(buf):
+    """buf with its quote marks dropped, when every quoted field is a plain
+    one — quotes around a whole field holding no comma, newline or doubled
+    quote, as fully quoted exports write them — else None, and the csv
+    module parses the block."""
+    if b'"' not in buf:
+        return buf
+    b = np.frombuffer(buf, dtype=np.uint8)
+    q = np.flatnonzero(b == 34)
+    if len(q) % 2:
+        return None
+    opens, closes = q[0::2], q[1::2]
+    before = np.where(opens > 0, b[np.maximum(opens - 1, 0)], 10)
+    after  = np.where(closes + 1 < len(b),
+                      b[np.minimum(closes + 1, len(b) - 1)], 10)
+    if not (np.isin(before, (10, 44)).all() and
+            np.isin(after, (10, 13, 44)).all()):
+        return None
+    # No separator between a field's quotes: same count of them before each.
+    sep = np.flatnonzero((b == 10) | (b == 44))
+    if np.any(np.searchsorted(sep, opens) != np.searchsorted(sep, closes)):
+        return None
+    return b[b != 34].tobytes()
+
+
+def _record_end(buf):
+    """Offset just past the last newline in buf that ends a record — one
+    outside quotes, so a quoted field's embedded newline never splits its
+    record across blocks.  0 if no record is complete yet."""
+    if b'"' not in buf:
+        return buf.rfind(b'\n') + 1
+    b  = np.frombuffer(buf, dtype=np.uint8)
+    nl = np.flatnonzero(b == 10)
+    closed = nl[np.cumsum(b == 34)[nl] % 2 == 0]
+    return int(closed[-1]) + 1 if len(closed) else 0
+
+
+def _csv_chunks(path, columns, chunk_rows):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+        header = [h.strip() for h in header]
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise KeyError(f"{path}: no column {missing[0]!r}; have {header}")
+        at   = [header.index(c) for c in columns]
+        rest = b''
+        while True:
+            block = f.read(chunk_rows * CSV_ROW_BYTES)
+            buf   = rest + block
+            end   = _record_end(buf) if block else len(buf)
+            if not block and buf and not buf.endswith(b'\n'):
+                buf += b'\n'
+                end  = len(buf)
+            buf, rest = buf[:end], buf[end:]
+            if buf.strip():
+                plain = _unquote(buf)
+                cols  = (None if plain is None
+                         else _split_fields(plain, len(header), at))
+                if cols is None:            # embedded separators: csv module
+                    rows = [r for r in csv.reader(io.StringIO(buf.decode()))
+                            if r]
+                    cols = [np.array([r[i] for r in rows]) for i in at]
+                yield cols
+            if not block:
+                return
+
+
+def _parquet_chunks(path, columns, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet input needs the 'pyarrow' package "
+                           "(pip install pyarrow); or export CSV / .npy")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows,
+                                                   columns=list(columns)):
+        yield [batch.column(c).to_numpy(zero_copy_only=False) for c in columns]
+
+
+def _npy_chunks(path, columns, chunk_rows):
+    if os.path.isdir(path):
+        arrays = [np.load(os.path.join(path, c + '.npy'), mmap_mode='r')
+                  for c in columns]
+    else:
+        table = np.load(path, mmap_mode='r')
+        names = table.dtype.names or ()
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise KeyError(f"{path}: no field {missing[0]!r}; have {list(names)}")
+        arrays = [table[c] for c in columns]
+    n = len(arrays[0])
+    for i in range(0, n, chunk_rows):
+        yield [np.asarray(a[i:i + chunk_rows]) for a in arrays]
+
+
+def read_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """[array per column] for each chunk of up to chunk_rows rows."""
+    path = os.fspath(path)
+    if os.path.isdir(path) or path.endswith('.npy'):
+        return _npy_chunks(path, columns, chunk_rows)
+    if path.endswith(('.parquet', '.pq')):
+        return _parquet_chunks(path, columns, chunk_rows)
+    if path.endswith(('.csv', '.csv.gz')):
+        return _csv_chunks(path, columns, chunk_rows)
+    raise ValueError(f"{path}: expected .csv, .csv.gz, .parquet, .npy "
+                     "or a directory of column .npy files")
+
+
+# ── Columns → numbers ───────────────────────────────────────────────────
+def to_seconds(col):
+    """(epoch seconds as int64, valid mask) from datetime64, epoch numbers
+    or ISO-8601 text (first 19 characters)."""
+    a = np.asarray(col)
+    if a.dtype.kind == 'O':
+        a = a.astype('U')
+    if a.dtype.kind in 'US':
+        a = a.astype('S19').astype('datetime64[s]')
+    if a.dtype.kind == 'M':
+        valid = ~np.isnat(a)
+        return a.astype('datetime64[s]').astype(np.int64), valid
+    if a.dtype.kind == 'f':
+        valid = np.isfinite(a)
+        return np.floor(np.where(valid, a, 0)).astype(np.int64), valid
+    return a.astype(np.int64), np.ones(len(a), dtype=bool)
+
+
+def _decimals(a):
+    """Plain [-]digits[.digits] bytes → float, or None if any cell is
+    anything else or has a mantissa (its digits, dot dropped) over 2**53 —
+    float() parses those.  Below that the mantissa and 10**decimals
+    (≤ 10**17) are both exact doubles, so their quotient is the correctly
+    rounded double a float() of the text gives."""
+    w = a.dtype.itemsize
+    c = a.view(np.uint8).reshape(len(a), w)
+    digit = (c >= 48) & (c <= 57)
+    dot   = c == 46
+    neg   = c[:, 0] == 45
+    if not np.all(digit | dot | (c == 0) | (neg[:, None] & (np.arange(w) == 0))):
+        return None
+    if np.any(dot.sum(axis=1) > 1) or w > 18:
+        return None
+    after = np.cumsum(dot, axis=1).astype(bool) & digit
+    mant  = np.zeros(len(a), dtype=np.int64)
+    for j in range(w):
+        mant = np.where(digit[:, j], mant * 10 + (c[:, j] - 48), mant)
+    if np.any(mant > 1 << 53):
+        return None
+    out = mant / 10.0 ** after.sum(axis=1)
+    out[neg] *= -1
+    return out
+
+
+def to_values(col):
+    """Float column; empty text fields count as 0."""
+    a = np.asarray(col)
+    if a.dtype.kind == 'S' and len(a):
+        out = _decimals(a)
+        if out is not None:
+            return out
+    if a.dtype.kind in 'OUS':
+        a = a.astype('U')
+        a = np.where(a == '', '0', a)
+    return np.asarray(a, dtype=float)
+
+
+# ── Bucketing ───────────────────────────────────────────────────────────
+class _Counter:
+    """Per-bucket count / sum over absolute bucket numbers, grown to cover
+    whatever range the chunks span."""
+
+    def __init__(self):
+        self.lo    = None
+        self.count = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0)
+
+    def _cover(self, lo, hi):
+        if self.lo is None:
+            self.lo = lo
+        before = max(0, self.lo - lo)
+        after  = max(0, hi - (self.lo + len(self.count) - 1))
+        if before or after:
+            self.count = np.concatenate([np.zeros(before, dtype=np.int64),
+                                         self.count,
+                                         np.zeros(after, dtype=np.int64)])
+            self.total = np.concatenate([np.zeros(before), self.total,
+                                         np.zeros(after)])
+            self.lo -= before
+
+    def add(self, buckets, weights=None):
+        if len(buckets) == 0:
+            return
+        lo, hi = int(buckets.min()), int(buckets.max())
+        self._cover(lo, hi)
+        i   = buckets - lo
+        at  = slice(lo - self.lo, hi - self.lo + 1)
+        self.count[at] += np.bincount(i, minlength=hi - lo + 1)
+        if weights is not None:
+            self.total[at] += np.bincount(i, weights=weights,
+                                          minlength=hi - lo + 1)
+
+
+def aggregate(path, time_col, value_col=None, bucket='day',
+              chunk_rows=CHUNK_ROWS):
+    """Totals of one log: rows per bucket, and the sum of value_col per
+    bucket (the row count again when value_col is None)."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {sorted(BUCKETS)}, "
+                         f"not {bucket!r}")
+    width   = BUCKETS[bucket]
+    columns = (time_col,) if value_col is None else (time_col, value_col)
+    counter = _Counter()
+    rows = skipped = 0
+    t0 = time.perf_counter()
+    with stage('ingest'):
+        for chunk in read_chunks(path, columns, chunk_rows):
+            secs, valid = to_seconds(chunk[0])
+            rows += len(secs)
+            if not valid.all():
+                skipped += int(len(valid) - valid.sum())
+                secs = secs[valid]
+                chunk = [c[valid] for c in chunk]
+            weights = to_values(chunk[1]) if value_col is not None else None
+            counter.add(secs // width, weights)
+    total = counter.total if value_col is not None else counter.count.astype(float)
+    start = (np.datetime64(counter.lo * width, 's') if counter.lo is not None
+             else None)
+    return Totals(start, width, counter.count, total, rows, skipped,
+                  time.perf_counter() - t0)
+
+
+def align(*totals):
+    """The Totals' `total` arrays on one common bucket range (zeros where a
+    log has no rows), and the start of that range."""
+    have = [t for t in totals if t.start is not None]
+    if not have:
+        raise ValueError("no timestamped rows to bucket")
+    width = have[0].width
+    first = [int(t.start.astype(np.int64)) // width for t in have]
+    lo    = min(first)
+    hi    = max(f + len(t.count) for f, t in zip(first, have))
+    out   = []
+    for t in totals:
+        a = np.zeros(hi - lo)
+        if t.start is not None:
+            f = int(t.start.astype(np.int64)) // width - lo
+            a[f:f + len(t.total)] = t.total
+        out.append(a)
+    return np.datetime64(lo * width, 's'), out
+
+
+def load_series(orders, sessions=None, bucket='day', order_cols=ORDER_COLUMNS,
+                session_cols=SESSION_COLUMNS, chunk_rows=CHUNK_ROWS):
+    """(days, sessions, revenue) per bucket, as generate_data returns them:
+    days is the bucket index, sessions an int array, revenue float."""
+    o = aggregate(orders, *order_cols, bucket=bucket, chunk_rows=chunk_rows)
+    if sessions is None:
+        _, (traffic, revenue) = align(o._replace(total=o.count.astype(float)), o)
+    else:
+        s = aggregate(sessions, *session_cols, bucket=bucket,
+                      chunk_rows=chunk_rows)
+        _, (traffic, revenue) = align(s, o)
+    return np.arange(len(revenue)), np.rint(traffic).astype(int), revenue
+
+
+# ── Demo logs and throughput ────────────────────────────────────────────
+def write_demo_orders(path, rows, days=30, seed=0, chunk_rows=CHUNK_ROWS):
+    """Synthetic orders CSV in the Shopify export layout, `rows` orders
+    spread over `days` days with a weekly cycle — for throughput runs."""
+    rng   = np.random.default_rng(seed)
+    start = np.datetime64('2024-05-01T00:00:00')
+    day_w = 1 + 0.3 * np.sin(2 * np.pi * np.arange(days) / 7 + 1.0)
+    day_p = day_w / day_w.sum()
+    opener = gzip.open if os.fspath(path).endswith('.gz') else open
+    with opener(path, 'wt', newline='') as f:
+        f.write('id,created_at,total_price,currency\n')
+        for i in range(0, rows, chunk_rows):
+            n    = min(chunk_rows, rows - i)
+            secs = (rng.choice(days, n, p=day_p) * 86400
+                    + rng.integers(0, 86400, n))
+            ts   = np.datetime_as_string(start + np.sort(secs).astype('m8[s]'))
+            ts   = np.char.replace(ts, 'T', ' ')
+            ids  = np.arange(i, i + n).astype(str)
+            price = np.char.mod('%.2f', rng.lognormal(4.3, 0.5, n))
+            f.writelines(f'{a},{b},{c},USD\n' for a, b, c in zip(ids, ts, price))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.ingest',
+                                 description="Bucket an orders log (and "
+                                             "optional sessions log) and "
+                                             "report rows/sec.")
+    ap.add_argument('orders')
+    ap.add_argument('--sessions')
+    ap.add_argument('--bucket', choices=sorted(BUCKETS), default='day')
+    ap.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    ap.add_argument('--demo', type=int, metavar='ROWS',
+                    help="first write ROWS synthetic orders to ORDERS (.csv)")
+    args = ap.parse_args(argv)
+
+    if args.demo:
+        t0 = time.perf_counter()
+        write_demo_orders(args.orders, args.demo)
+        print(f"Wrote {args.demo:,} demo orders to {args.orders} "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    logs = [('orders', args.orders, ORDER_COLUMNS)]
+    if args.sessions:
+        logs.append(('sessions', args.sessions, SESSION_COLUMNS))
+    totals = []
+    for name, path, cols in logs:
+        try:
+            t = aggregate(path, *cols, bucket=args.bucket,
+                          chunk_rows=args.chunk_rows)
+        except (OSError, KeyError, ValueError, RuntimeError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 2
+        totals.append(t)
+        rate = t.rows / t.seconds if t.seconds else float('inf')
+        print(f"   {name:<8} {t.rows:>12,} rows  {t.seconds:7.2f}s  "
+              f"{rate / 1e6:6.2f}M rows/s  {len(t.count):>6} {args.bucket}s"
+              + (f"  ({t.skipped:,} without a timestamp)" if t.skipped else ''))
+    start, series = align(*totals)
+    print(f"{len(series[0])} {args.bucket} buckets from {start}; "
+          f"revenue {series[0].sum():,.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Lag analysis: how many buckets revenue trails traffic.
+
+The whole cross-correlation curve comes from one FFT product instead of a
+Python loop per lag, so max_lag can cover weeks of hourly data.  All
+functions broadcast over leading axes: pass (n_pairs, n) arrays to analyse
+many metric pairs in one call.
+
+The statistic matches the original brute-force search in main(): both series
+are z-scored over their full length and
+
+    curve[lag] = mean(a[t] * b[t + lag])   over the n - lag overlapping t
+
+Significance is a vectorised surrogate test on the *maximum* of the curve
+over the searched lags, so it accounts for having picked the best lag:
+  permute  shuffles b (destroys all temporal structure)
+  phase    randomises b's Fourier phases (keeps its autocorrelation — the
+           honest null for smooth, seasonal series)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+LagEstimate = namedtuple('LagEstimate', 'lag corr p_value lags curve')
+
+MAX_SURROGATE_ELEMS = 1 << 22     # samples per surrogate batch
+
+
+def _zscore(x):
+    x  = np.asarray(x, dtype=float)
+    sd = x.std(axis=-1, keepdims=True)
+    return (x - x.mean(axis=-1, keepdims=True)) / np.where(sd > 0, sd, 1.0)
+
+
+def _lag_range(n, max_lag, min_lag):
+    if max_lag is None:
+        max_lag = max(n // 3, 1)
+    max_lag = min(max_lag, n - 1)
+    min_lag = max(min_lag, -(n - 1))
+    return np.arange(min_lag, max_lag + 1)
+
+
+def _curve(za, zb, lags):
+    """mean(za[t] * zb[t + lag]) for each lag, via one rfft product."""
+    n    = za.shape[-1]
+    nfft = 1 << (2 * n - 1).bit_length()
+    cc   = np.fft.irfft(np.conj(np.fft.rfft(za, nfft)) * np.fft.rfft(zb, nfft),
+                        nfft)
+    # cc[k] = sum za[t] zb[t+k];  negative lags wrap to the end of the buffer
+    return cc[..., lags % nfft] / (n - np.abs(lags))
+
+
+def xcorr(a, b, max_lag=None, min_lag=0):
+    """(lags, curve) of the z-scored cross-correlation of b against a."""
+    za, zb = np.broadcast_arrays(_zscore(a), _zscore(b))
+    lags   = _lag_range(za.shape[-1], max_lag, min_lag)
+    return lags, _curve(za, zb, lags)
+
+
+def _surrogates(zb, count, method, rng):
+    if method == 'permute':
+        return rng.permuted(np.broadcast_to(zb, zb.shape[:-1] + (count, zb.shape[-1])),
+                            axis=-1)
+    if method == 'phase':
+        n    = zb.shape[-1]
+        spec = np.fft.rfft(zb, axis=-1)[..., None, :]
+        ph   = rng.uniform(0, 2 * np.pi, zb.shape[:-1] + (count, spec.shape[-1]))
+        ph[..., 0] = 0.0
+        if n % 2 == 0:
+            ph[..., -1] = 0.0
+        return _zscore(np.fft.irfft(spec * np.exp(1j * ph), n, axis=-1))
+    raise ValueError(f"unknown surrogate method {method!r}")
+
+
+def detect_lag(a, b, max_lag=None, min_lag=0, n_perm=0, method='permute',
+               seed=0):
+    """
+    Best lag of b behind a, its correlation and (optionally) a p-value.
+
+    a, b    (..., n) series; leading axes are independent pairs
+    max_lag / min_lag  searched lag range in buckets (default up to n // 3)
+    n_perm  number of surrogates for the p-value (0 = skip, p_value is nan)
+    method  'permute' or 'phase' surrogates (see module docstring)
+
+    Returns LagEstimate(lag, corr, p_value, lags, curve); lag / corr /
+    p_value are scalars for 1-D input, arrays over the leading axes otherwise.
+
+    With min_lag < 0 the lag may come out negative — b *leads* a.  Such a
+    lag is reported but cannot be rendered: build_audio, render_blocks and
+    LiveRenderer only delay the echo and raise ValueError for lag_days < 0.
+    """
+    za, zb = np.broadcast_arrays(_zscore(a), _zscore(b))
+    n      = za.shape[-1]
+    lags   = _lag_range(n, max_lag, min_lag)
+    curve  = _curve(za, zb, lags)
+    best   = np.argmax(curve, axis=-1)
+    corr   = np.take_along_axis(curve, best[..., None], axis=-1)[..., 0]
+
+    p_value = np.full(corr.shape, np.nan)
+    if n_perm:
+        rng   = np.random.default_rng(seed)
+        pairs = max(int(np.prod(za.shape[:-1])), 1)
+        chunk = max(1, MAX_SURROGATE_ELEMS // (n * pairs))
+        exceed, done = np.zeros(corr.shape), 0
+        while done < n_perm:
+            k    = min(chunk, n_perm - done)
+            surr = _surrogates(zb, k, method, rng)
+            null = _curve(za[..., None, :], surr, lags).max(axis=-1)
+            exceed += (null >= corr[..., None]).sum(axis=-1)
+            done   += k
+        p_value = (exceed + 1.0) / (n_perm + 1.0)
+
+    if best.ndim == 0:
+        return LagEstimate(int(lags[best]), float(corr), float(p_value),
+                           lags, curve)
+    return LagEstimate(lags[best], corr, p_value, lags, curve)
+
+
+def rolling_lag(a, b, window, step=1, max_lag=None, min_lag=0):
+    """
+    Lag estimate per sliding window — how the lag drifts over time.
+
+    Each window is z-scored on its own and analysed in one batched FFT.
+    Returns (starts, lags, corrs) with one entry per window start.
+    Lags may be negative when min_lag < 0; see detect_lag.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    wa = sliding_window_view(a, window, axis=-1)[..., ::step, :]
+    wb = sliding_window_view(b, window, axis=-1)[..., ::step, :]
+    est    = detect_lag(wa, wb, max_lag=max_lag, min_lag=min_lag)
+    starts = np.arange(wa.shape[-2]) * step
+    return starts, est.lag, est.corr
+
+
+def describe(est):
+    """One-line summary for console output and chart titles."""
+    unit = "day" if abs(est.lag) == 1 else "days"
+    text = f"{est.lag} {unit}  (r = {est.corr:.3f}"
+    if not np.isnan(est.p_value):
+        text += f", p = {est.p_value:.3g}"
+    return text + ")"
@@ -0,0 +1,306 @@
+"""
+Incremental renderer for live-updating series.
+
+    live  = LiveRenderer(mode='continuous', sample_rate=48000)
+    block = live.append(sessions_today, revenue_today)   # new audio only
+    ...
+    live.audio                                            # everything so far
+
+build_audio() squeezes the whole series into a fixed duration and normalises
+against its global range, so one new bucket changes every sample.
+LiveRenderer instead gives every bucket a fixed `bucket_seconds` of audio
+and renders only the samples the new buckets add, carrying all DSP state
+across calls:
+
+  * oscillator phase     — per voice, continued from the last sample
+  * low-pass state       — sosfilt zi per channel
+  * reverb tails         — each channel's Convolver delay line
+  * echo delay line      — revenue echo lag_days buckets behind traffic
+
+so appending N buckets costs O(N) however long the history is.  Large
+appends are rendered in spans of about SPAN_SAMPLES, so memory stays
+bounded too (keep=False drops the history altogether).
+
+Continuous mode interpolates with a Catmull-Rom spline, which needs one
+point beyond the segment being drawn; the newest bucket's glide is rendered
+by the next append (or by flush()).  A global cubic spline, as build_audio
+uses, would change everywhere whenever a point is added.
+
+Normalisation (pitch / loudness ranges) is one of
+  'expanding'  min / max of everything seen so far (default)
+  'rolling'    min / max of the last `window` buckets
+  'fixed'      ranges={'sessions': (lo, hi), 'rps': (lo, hi)}
+and is taken once per append, so earlier audio is never re-rendered.
+Channel gains are fixed up front (peak normalisation would need the
+future); the mix is clipped to [-1, 1] like build_audio's.
+"""
+
+import numpy as np
+
+from sonify import dsp, reverb, wavetable
+from sonify.profile import stage
+from sonify.render import AUDIO_DURATION, DEFAULT_SAMPLE_RATE
+from sonify.stream import _Lowpass, _Room
+
+NORMS = ('expanding', 'rolling', 'fixed')
+SPAN_SAMPLES = 1 << 20      # render large appends in spans of about this size
+
+
+def _catmull_rom(p, t):
+    """Catmull-Rom spline through p[0..n-1] at positions t (0 <= t <= n-1),
+    end points clamped.  Needs p[floor(t) + 2] for interior t."""
+    n = len(p)
+    k = np.minimum(np.floor(t).astype(np.int64), n - 2)
+    u = t - k
+    p0 = p[np.maximum(k - 1, 0)]
+    p1 = p[k]
+    p2 = p[k + 1]
+    p3 = p[np.minimum(k + 2, n - 1)]
+    return 0.5 * ((2 * p1) + (p2 - p0) * u
+                  + (2 * p0 - 5 * p1 + 4 * p2 - p3) * u ** 2
+                  + (3 * p1 - p0 - 3 * p2 + p3) * u ** 3)
+
+
+class _Growing:
+    """Append-only float array with amortised doubling."""
+
+    def __init__(self, shape=(), dtype=float):
+        self._buf = np.zeros((64,) + shape, dtype=dtype)
+        self.n    = 0
+
+    def extend(self, x):
+        need = self.n + len(x)
+        if need > len(self._buf):
+            cap = max(need, 2 * len(self._buf))
+            buf = np.zeros((cap,) + self._buf.shape[1:], dtype=self._buf.dtype)
+            buf[:self.n] = self._buf[:self.n]
+            self._buf = buf
+        self._buf[self.n:need] = x
+        self.n = need
+
+    @property
+    def data(self):
+        return self._buf[:self.n]
+
+
+class LiveRenderer:
+    """Stereo sonification that grows as buckets are appended."""
+
+    def __init__(self, mode='continuous', sample_rate=None, bucket_seconds=None,
+                 lag_days=1, ticks=True, norm='expanding', window=30,
+                 ranges=None, rooms=None, timbres=None, gains=None,
+                 keep=True):
+        if norm not in NORMS:
+            raise ValueError(f"norm must be one of {NORMS}, not {norm!r}")
+        if norm == 'fixed' and not ranges:
+            raise ValueError("norm='fixed' needs ranges={'sessions': (lo, hi), "
+                             "'rps': (lo, hi)}")
+        if lag_days < 0:
+            raise ValueError(f"lag_days must be >= 0 (the echo trails the "
+                             f"traffic), not {lag_days}")
+        self.mode   = mode
+        self.sr     = sr = sample_rate or DEFAULT_SAMPLE_RATE
+        self.spb    = (bucket_seconds or AUDIO_DURATION / 30) * sr  # samples/bucket
+        self.lag    = lag_days
+        self.ticks  = ticks
+        self.norm   = norm
+        self.window = window
+        self.ranges = dict(ranges or {})
+        self.keep   = keep
+
+        rooms, timbres = rooms or {}, timbres or {}
+        ir_L = reverb.resolve_ir(rooms.get('traffic'), sr, 'traffic', mode)
+        ir_R = reverb.resolve_ir(rooms.get('echo'), sr, 'echo', mode)
+        self.osc_L = wavetable.get(timbres.get('traffic', 'organ'))
+        self.osc_R = wavetable.get(timbres.get('echo', 'bright'))
+        if gains is None:
+            # Oscillator peak × loudest amplitude (0.8) → channel target.
+            peaks = [np.abs(o.table()).max() * 0.8 for o in (self.osc_L, self.osc_R)]
+            gains = [t / p for t, p in zip(dsp.CHANNEL_TARGETS, peaks)]
+        self.gains = np.asarray(gains, dtype=float)
+
+        self._sessions = _Growing()
+        self._revenue  = _Growing()
+        self._audio    = _Growing((2,)) if keep else None
+        self._done     = 0        # buckets whose audio is fully rendered
+        self._pos      = 0        # output samples emitted so far
+        self._click    = dsp.click_wave(sr) if ticks else None
+
+        if mode == 'continuous':
+            self._phase_L = 0.0
+            self._phase_R = np.zeros(len(dsp.CHORUS_DETUNE))
+            self._lp_L    = _Lowpass(dsp.LEFT_CUTOFF, sr)
+            self._lp_R    = _Lowpass(dsp.RIGHT_CUTOFF, sr)
+            self._rv_L    = _Room(ir_L)
+            self._rv_R    = _Room(ir_R)
+        else:
+            self._ir_L, self._ir_R = ir_L, ir_R
+        self._echo = np.zeros(int(round(lag_days * self.spb)))  # delay line
+
+    # ── Public API ────────────────────────────────────────────
+    @property
+    def n_buckets(self):
+        return self._sessions.n
+
+    @property
+    def samples(self):
+        return self._pos
+
+    @property
+    def audio(self):
+        """Everything rendered so far, (samples, 2) — a view, don't keep it
+        across appends.  Only with keep=True."""
+        if self._audio is None:
+            raise RuntimeError("LiveRenderer(keep=False) keeps no history")
+        return self._audio.data
+
+    def append(self, sessions, revenue):
+        """Add buckets; returns the (n, 2) block of new audio."""
+        sessions = np.atleast_1d(np.asarray(sessions, dtype=float))
+        revenue  = np.atleast_1d(np.asarray(revenue, dtype=float))
+        if sessions.shape != revenue.shape:
+            raise ValueError("sessions and revenue must be the same length")
+        self._sessions.extend(sessions)
+        self._revenue.extend(revenue)
+        self._update_ranges(sessions, revenue)
+        # Continuous glides need the point after each segment's end.
+        upto = self.n_buckets if self.mode != 'continuous' else self.n_buckets - 2
+        return self._render(max(upto, self._done))
+
+    def flush(self):
+        """Render the newest bucket's glide (continuous mode) with the end
+        point held.  Appending after a flush continues from there."""
+        if self.mode != 'continuous':
+            return np.zeros((0, 2))
+        return self._render(max(self.n_buckets - 1, self._done))
+
+    # ── Rendering ─────────────────────────────────────────────
+    @staticmethod
+    def _levels(sessions, revenue):
+        s = np.maximum(sessions, 1)
+        return s, np.maximum(revenue, 0) / (s + 1e-9)
+
+    def _update_ranges(self, sessions, revenue):
+        """Ranges for the next render — O(new buckets), or O(window)."""
+        if self.norm == 'fixed':
+            return
+        if self.norm == 'rolling':
+            sessions = self._sessions.data[-self.window:]
+            revenue  = self._revenue.data[-self.window:]
+        s, rps = self._levels(sessions, revenue)
+        new = {'sessions': (s.min(), s.max()), 'rps': (rps.min(), rps.max())}
+        if self.norm == 'expanding':
+            for key, (lo, hi) in self.ranges.items():
+                new[key] = (min(lo, new[key][0]), max(hi, new[key][1]))
+        self.ranges = new
+
+    def _ranges(self):
+        return self.ranges['sessions'], self.ranges['rps']
+
+    def _render(self, upto):
+        """Render buckets [_done, upto) in bounded spans.  All state streams
+        (per-day notes end within their bucket), so spans are seamless."""
+        if upto <= self._done:
+            return np.zeros((0, 2))
+        step   = max(1, int(SPAN_SAMPLES // self.spb))
+        blocks = [self._render_span(min(k + step, upto))
+                  for k in range(self._done, upto, step)]
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def _render_span(self, upto):
+        a = int(self._done * self.spb)
+        b = int(upto * self.spb)
+        with stage('live'):
+            left, echo = (self._continuous if self.mode == 'continuous'
+                          else self._per_day)(self._done, upto, a, b)
+            out = np.empty((b - a, 2))
+            out[:, 0] = left
+            line = np.concatenate([self._echo, echo])
+            out[:, 1] = line[:b - a]
+            self._echo = line[b - a:]
+            out *= self.gains
+            if self.ticks:
+                self._add_ticks(out, a, upto)
+            np.clip(out, -1.0, 1.0, out=out)
+        self._done, self._pos = upto, b
+        if self._audio is not None:
+            self._audio.extend(out)
+        return out
+
+    def _continuous(self, k0, k1, a, b):
+        sr, spb = self.sr, self.spb
+        (s_lo, s_hi), (r_lo, r_hi) = self._ranges()
+        with stage('interp'):
+            t = np.minimum(np.arange(a, b) / spb, self.n_buckets - 1)
+            s = np.clip(_catmull_rom(self._sessions.data, t), 1, None)
+            r = np.clip(_catmull_rom(self._revenue.data, t), 0, None)
+
+        with stage('synth'):
+            s_logn = np.clip(dsp.minmax_norm(np.log1p(s), np.log1p(s_lo),
+                                             np.log1p(s_hi)), 0, 1)
+            freq   = dsp.log_pitch(s_logn)
+            amp    = (0.25 + 0.55 * np.clip(dsp.minmax_norm(s, s_lo, s_hi), 0, 1)
+                      ).astype(np.float32)
+            vibrato = 1.0 + 0.004 * np.sin(2 * np.pi * 5.2 * np.arange(a, b) / sr)
+            phase   = self._phase_L + np.cumsum(2 * np.pi * freq * vibrato / sr)
+            self._phase_L = phase[-1]
+            left = self.osc_L(phase, dsp.MAX_PITCH * 1.004, sr) * amp
+
+            rps    = r / (s + 1e-9)
+            rps_ln = np.clip(dsp.minmax_norm(np.log1p(rps), np.log1p(r_lo),
+                                             np.log1p(r_hi)), 0, 1)
+            inc    = 2 * np.pi * dsp.log_pitch(rps_ln) / sr
+            amp_R  = (0.25 + 0.55 * np.clip(dsp.minmax_norm(rps, r_lo, r_hi), 0, 1)
+                      ).astype(np.float32)
+            chorus = 0
+            for v, fm in enumerate(dsp.CHORUS_DETUNE):
+                ph = self._phase_R[v] + np.cumsum(inc * fm)
+                self._phase_R[v] = ph[-1]
+                chorus = chorus + self.osc_R(ph, dsp.MAX_PITCH * fm, sr)
+            echo = chorus / np.float32(len(dsp.CHORUS_DETUNE)) * amp_R
+
+        with stage('lowpass'):
+            left, echo = self._lp_L.process(left), self._lp_R.process(echo)
+        with stage('reverb'):
+            return self._rv_L.process(left), self._rv_R.process(echo)
+
+    def _per_day(self, k0, k1, a, b):
+        from sonify.notes import render_notes
+
+        (s_lo, s_hi), (r_lo, r_hi) = self._ranges()
+        s   = self._sessions.data[k0:k1]
+        rps = self._revenue.data[k0:k1] / (s + 1e-9)
+        s_logn = np.clip(dsp.minmax_norm(np.log1p(s), np.log1p(s_lo),
+                                         np.log1p(s_hi)), 0, 1)
+        r_logn = np.clip(dsp.minmax_norm(np.log1p(rps), np.log1p(r_lo),
+                                         np.log1p(r_hi)), 0, 1)
+        s_n = np.clip(dsp.minmax_norm(s, s_lo, s_hi), 0, 1)
+        r_n = np.clip(dsp.minmax_norm(rps, r_lo, r_hi), 0, 1)
+
+        onsets = (np.arange(k0, k1) * self.spb).astype(np.int64)
+        lens   = np.minimum(onsets + int(self.spb * 0.72), b) - onsets
+        onsets = onsets - a
+        with stage('notes'):
+            left = render_notes(onsets, lens, dsp.log_pitch(s_logn),
+                                0.25 + 0.55 * s_n, b - a, self.sr, self.osc_L,
+                                decay=3.2, cutoff_hz=dsp.LEFT_CUTOFF,
+                                ir=self._ir_L)
+            echo = render_notes(onsets, lens, dsp.log_pitch(r_logn),
+                                0.25 + 0.55 * r_n, b - a, self.sr, self.osc_R,
+                                decay=2.2, detune=dsp.CHORUS_DETUNE,
+                                cutoff_hz=dsp.RIGHT_CUTOFF, ir=self._ir_R)
+        return left, echo
+
+    def _add_ticks(self, out, a, upto):
+        """Click at every bucket start in [a, a + len(out)), vectorised."""
+        b, cd = a + len(out), len(self._click)
+        first = max(int((a - cd) / self.spb), 0)
+        on    = (np.arange(first, upto + 1) * self.spb).astype(np.int64)
+        on    = on[(on + cd > a) & (on < b)]
+        if len(on) == 0:
+            return
+        idx  = on[:, None] + np.arange(cd)[None, :]
+        keep = (idx >= a) & (idx < b)
+        wave = np.broadcast_to(self._click, idx.shape)[keep]
+        out += np.bincount(idx[keep] - a, weights=wave,
+                           minlength=len(out))[:, None]
@@ -0,0 +1,182 @@
+"""
+Load test for the sonification service.
+
+    python -m sonify.loadtest --spawn --requests 400 --concurrency 32
+    python -m sonify.loadtest --url http://127.0.0.1:8765 --dup 0.5
+
+Fires POST /api/sonify/series requests from `concurrency` keep-alive
+connections, fetches each returned clip, and reports p50 / p90 / p99 latency
+for the render call and the audio fetch plus throughput.  --dup is the
+fraction of requests that repeat an earlier payload, which exercises dedup
+and the store; --spawn starts a private service on a free port first.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+class _Conn:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port)
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}",
+                f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        hdrs = {}
+        while (h := await self.reader.readline()) not in (b'\r\n', b''):
+            k, _, v = h.decode('latin-1').partition(':')
+            hdrs[k.strip().lower()] = v.strip()
+        data = await self.reader.readexactly(int(hdrs.get('content-length', 0)))
+        return status, hdrs, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _payload(rng, n_points):
+    base = 100 + 40 * np.sin(np.arange(n_points) / 4) + rng.normal(0, 8, n_points)
+    return {
+        'series':  {'metric': 'revenue', 'bucket': 'day',
+                    'points': [{'t': f"d{i}", 'v': round(float(v), 2)}
+                               for i, v in enumerate(base)]},
+        'mapping': {'preset': 'trend_v1', 'duration_ms': 2500,
+                    'normalize': 'zscore'},
+        'render':  {'format': 'wav', 'sample_rate': 24000},
+    }
+
+
+def percentiles(ms):
+    ms = np.asarray(ms, dtype=float)
+    if len(ms) == 0:
+        return {}
+    p = np.percentile(ms, [50, 90, 99])
+    return {'n': len(ms), 'p50': p[0], 'p90': p[1], 'p99': p[2],
+            'max': float(ms.max())}
+
+
+async def run(url, requests=200, concurrency=16, dup=0.25, n_points=60,
+              seed=0):
+    parts = urlsplit(url)
+    rng   = np.random.default_rng(seed)
+    n_unique = max(1, int(round(requests * (1 - dup))))
+    bodies   = [json.dumps(_payload(rng, n_points)).encode()
+                for _ in range(n_unique)]
+    order    = np.concatenate([np.arange(n_unique),
+                               rng.integers(0, n_unique, requests - n_unique)])
+    rng.shuffle(order)
+
+    queue = asyncio.Queue()
+    for i in order:
+        queue.put_nowait(bodies[i])
+    render_ms, fetch_ms, statuses, caches = [], [], {}, {}
+
+    async def client():
+        conn = _Conn(parts.hostname, parts.port)
+        try:
+            while not queue.empty():
+                body = queue.get_nowait()
+                t0 = time.perf_counter()
+                status, hdrs, data = await conn.request(
+                    'POST', '/api/sonify/series', body,
+                    {'Content-Type': 'application/json'})
+                render_ms.append((time.perf_counter() - t0) * 1e3)
+                statuses[status] = statuses.get(status, 0) + 1
+                cache = hdrs.get('x-sonify-cache', '-')
+                caches[cache] = caches.get(cache, 0) + 1
+                if status != 200:
+                    continue
+                t0 = time.perf_counter()
+                status, _, wav = await conn.request(
+                    'GET', json.loads(data)['audio_url'])
+                fetch_ms.append((time.perf_counter() - t0) * 1e3)
+        finally:
+            conn.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+
+    conn = _Conn(parts.hostname, parts.port)
+    _, _, stats = await conn.request('GET', '/api/sonify/stats')
+    conn.close()
+    return {'requests': requests, 'concurrency': concurrency, 'wall_s': wall,
+            'req_per_s': requests / wall, 'status': statuses, 'cache': caches,
+            'render_ms': percentiles(render_ms),
+            'fetch_ms': percentiles(fetch_ms),
+            'service': json.loads(stats)}
+
+
+def _spawn(workers):
+    cmd = [sys.executable, '-m', 'sonify.service', '--port', '0']
+    if workers:
+        cmd += ['--workers', str(workers)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()          # "Sonify service on http://h:p ..."
+    return proc, line.split()[3]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.loadtest',
+                                 description="Latency percentiles for the "
+                                             "sonification service.")
+    ap.add_argument('--url', default='http://127.0.0.1:8765')
+    ap.add_argument('--spawn', action='store_true',
+                    help="start a private service on a free port")
+    ap.add_argument('--workers', type=int, default=None,
+                    help="worker processes for --spawn")
+    ap.add_argument('--requests', type=int, default=200)
+    ap.add_argument('--concurrency', type=int, default=16)
+    ap.add_argument('--dup', type=float, default=0.25,
+                    help="fraction of requests repeating an earlier payload")
+    ap.add_argument('--points', type=int, default=60)
+    ap.add_argument('--json', action='store_true', help="print the raw report")
+    args = ap.parse_args(argv)
+
+    proc = None
+    if args.spawn:
+        proc, args.url = _spawn(args.workers)
+    try:
+        rep = asyncio.run(run(args.url, args.requests, args.concurrency,
+                              args.dup, args.points))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        print(json.dumps(rep, indent=2))
+        return 0
+    print(f"{rep['requests']} requests, {rep['concurrency']} connections, "
+          f"{rep['wall_s']:.2f}s  ({rep['req_per_s']:.1f} req/s)")
+    for name in ('render_ms', 'fetch_ms'):
+        p = rep[name]
+        if p:
+            print(f"   {name[:-3]:<7} p50 {p['p50']:7.1f} ms   p90 {p['p90']:7.1f} ms"
+                  f"   p99 {p['p99']:7.1f} ms   max {p['max']:7.1f} ms")
+    s = rep['service']
+    print(f"   status {rep['status']}   cache {rep['cache']}")
+    print(f"   service: {s['renders']} renders, {s['shared']} shared in flight, "
+          f"{s['memo']} served from store, {s['rejected']} rejected")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
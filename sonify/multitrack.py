@@ -0,0 +1,174 @@
+"""
+Multitrack renderer: any number of metrics on one stereo mix bus.
+
+    tracks = [{'metric': 'revenue', 'mapping': 'pitch', 'timbre': 'organ'},
+              {'metric': 'orders',  'mapping': 'density', 'pan': 0.4,
+               'gain': 0.3}]
+    audio = render_multitrack({'revenue': rev, 'orders': orders}, tracks)
+
+A track spec is a dict:
+
+  metric   key into the metrics dict (not needed for 'ticks')
+  mapping  'pitch'    gliding tone, pitch and loudness follow the value
+           'notes'    one plucked note per bucket, pitch = value
+           'density'  percussion: 0..max_hits clicks per bucket, more for
+                      larger values, evenly spaced within the bucket
+           'ticks'    one click per bucket, like build_audio's day ticks
+  timbre   registered sonify.wavetable name for 'pitch' / 'notes', or an
+           EVENT_WAVES name for 'density' / 'ticks'
+  pan      -1 (left) .. 1 (right), constant-power; default 0
+  gain     peak level of a tonal track / level of each event; default 0.5
+  room     reverb spec for tonal tracks (sonify.reverb.resolve_ir),
+           default 'dry'
+  max_hits clicks in the loudest bucket of a 'density' track (default 4)
+  name     label for profiling and errors (default: the metric)
+
+Every track renders into one preallocated float32 (samples, 2) bus.  Tonal
+tracks reuse the traffic stem's synthesis; event tracks compute all their
+onsets with array arithmetic and are mixed in with a single scatter-add, so
+a track costs the same whatever its event count and the render scales
+linearly with the number of tracks.  If the sum peaks above 1 the bus is
+scaled back to 1 rather than clipped.
+"""
+
+import numpy as np
+
+from sonify import dsp
+from sonify.anomaly import EARCONS
+from sonify.profile import stage
+from sonify.render import (AUDIO_DURATION, DEFAULT_SAMPLE_RATE,
+                           render_traffic_stem)
+
+MAPPINGS = ('pitch', 'notes', 'density', 'ticks')
+
+# name → wave(sr), peak-normalised below; the anomaly earcons are events too.
+EVENT_WAVES = {'click': dsp.click_wave, **EARCONS}
+
+DEFAULT_GAIN     = 0.5
+DEFAULT_MAX_HITS = 4
+
+# PROJECTSPEC multitrack_v1: revenue → pitch, orders → subtle percussion.
+MULTITRACK_V1 = [
+    {'metric': 'revenue', 'mapping': 'pitch', 'timbre': 'organ', 'pan': -0.2,
+     'gain': 0.6},
+    {'metric': 'orders', 'mapping': 'density', 'timbre': 'click', 'pan': 0.3,
+     'gain': 0.25},
+]
+
+
+def pan_gains(pan):
+    """(left, right) constant-power gains for pan in [-1, 1]."""
+    theta = (np.clip(pan, -1.0, 1.0) + 1.0) * np.pi / 4
+    return np.cos(theta), np.sin(theta)
+
+
+def density_onsets(values, spb, max_hits=DEFAULT_MAX_HITS):
+    """Onsets (samples) of a density track: round(norm × max_hits) clicks in
+    each bucket, evenly spaced from the bucket start.  No per-event loop."""
+    values = np.asarray(values, dtype=float)
+    counts = np.rint(dsp.minmax_norm(values, values.min(), values.max())
+                     * max_hits).astype(np.int64)
+    bucket = np.repeat(np.arange(len(values)), counts)
+    first  = np.repeat(np.cumsum(counts) - counts, counts)
+    rank   = np.arange(len(bucket)) - first
+    return ((bucket + rank / np.maximum(counts[bucket], 1)) * spb).astype(np.int64)
+
+
+def _event_wave(timbre, sr):
+    if timbre not in EVENT_WAVES:
+        raise ValueError(f"unknown event timbre {timbre!r}; "
+                         f"available: {sorted(EVENT_WAVES)}")
+    wave = EVENT_WAVES[timbre](sr)
+    return wave / (np.abs(wave).max() or 1.0)
+
+
+def _check(track, metrics, n):
+    mapping = track.get('mapping', 'pitch')
+    if mapping not in MAPPINGS:
+        raise ValueError(f"track {track.get('name', track.get('metric'))!r}: "
+                         f"mapping must be one of {MAPPINGS}, not {mapping!r}")
+    if mapping != 'ticks':
+        metric = track.get('metric')
+        if metric not in metrics:
+            raise KeyError(f"track needs metric {metric!r}; "
+                           f"have {sorted(metrics)}")
+        if len(metrics[metric]) != n:
+            raise ValueError(f"metric {metric!r} has {len(metrics[metric])} "
+                             f"buckets, expected {n}")
+    return mapping
+
+
+def render_track(track, values, n, total, sr, bus):
+    """Render one track spec and add it to the (total, 2) float32 bus."""
+    mapping  = track.get('mapping', 'pitch')
+    gain     = track.get('gain', DEFAULT_GAIN)
+    g_L, g_R = pan_gains(track.get('pan', 0.0))
+
+    if mapping in ('pitch', 'notes'):
+        mode = 'continuous' if mapping == 'pitch' else 'per-day'
+        mono = render_traffic_stem(np.asarray(values, dtype=float), mode, sr,
+                                   total / sr, track.get('room', 'dry'),
+                                   track.get('timbre', 'organ'))
+        # int(total / sr * sr) can come out a sample short: fit the bus.
+        mono = np.pad(mono[:total], (0, max(0, total - len(mono))))
+        with stage('bus'):
+            peak = np.abs(mono).max()
+            if peak > 0:
+                mono = (mono * (gain / peak)).astype(np.float32)
+                bus[:, 0] += g_L * mono
+                bus[:, 1] += g_R * mono
+        return
+
+    spb = total / float(n)
+    with stage('schedule'):
+        if mapping == 'density':
+            onsets = density_onsets(values, spb,
+                                    track.get('max_hits', DEFAULT_MAX_HITS))
+        else:
+            onsets = (np.arange(n) * spb).astype(np.int64)
+    with stage('bus'):
+        wave = _event_wave(track.get('timbre', 'click'), sr) * gain
+        # One scatter-add into a scratch lane, then panned onto both sides
+        # over just the span the events cover.
+        lane = dsp.scatter_add(np.zeros(total), wave, onsets)
+        if len(onsets):
+            lo, hi = onsets.min(), min(onsets.max() + len(wave), total)
+            bus[lo:hi, 0] += (g_L * lane[lo:hi]).astype(np.float32)
+            bus[lo:hi, 1] += (g_R * lane[lo:hi]).astype(np.float32)
+
+
+def render_multitrack(metrics, tracks=MULTITRACK_V1, sample_rate=None,
+                      duration=None, profiler=None):
+    """
+    metrics: {name: per-bucket array}, all the same length.
+    tracks:  list of track spec dicts (see the module docstring).
+
+    Returns a float32 (samples, 2) array in [-1, 1].  profiler works as in
+    build_audio; each track's stages record under its name.
+    """
+    if profiler is not None:
+        with profiler:
+            return render_multitrack(metrics, tracks, sample_rate, duration)
+
+    sr       = sample_rate or DEFAULT_SAMPLE_RATE
+    duration = duration or AUDIO_DURATION
+    total    = int(duration * sr)
+    lengths  = {len(v) for v in metrics.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"metrics differ in length: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 0
+    if n == 0:
+        raise ValueError("render_multitrack needs at least one non-empty metric")
+
+    mappings = [_check(t, metrics, n) for t in tracks]
+    bus = np.zeros((total, 2), dtype=np.float32)
+    for track, mapping in zip(tracks, mappings):
+        with stage(track.get('name') or track.get('metric') or mapping):
+            render_track(track, metrics.get(track.get('metric')), n, total,
+                         sr, bus)
+
+    with stage('mix'):
+        peak = np.abs(bus).max()
+        if peak > 1.0:
+            bus *= np.float32(1.0 / peak)
+    return bus
@@ -0,0 +1,101 @@
+"""
+Batched note engine for Per-Day mode.
+
+All notes of a channel are synthesised as one 2-D array (notes × samples):
+envelopes and waveforms are broadcast over the rows, the low-pass is designed
+once and run along axis 1 (every row starts from zero filter state, exactly
+like filtering each note on its own), one convolution reverb call treats
+every row as its own channel, and a single bincount overlap-adds the rows
+into the output.  Work per note is pure NumPy, so cost tracks the number of
+output samples rather than the number of buckets.
+
+Rows are processed in chunks of at most `max_elems` samples (counting each
+row's reverb state) so a long series never materialises more than a bounded
+2-D array.
+"""
+
+import numpy as np
+
+from sonify import dsp, parallel, wavetable
+from sonify.profile import stage
+from sonify.reverb import Convolver, PartitionedIR
+
+MAX_ELEMS = 1 << 22    # samples per row-chunk (~32 MB of float64)
+
+
+def _envelopes(lengths, width, decay, sr):
+    """Pluck envelope for each row, padded to `width` columns."""
+    env  = np.broadcast_to(dsp.pluck_envelope(width, decay, sr),
+                           (len(lengths), width))
+    atk  = min(int(0.006 * sr), width)
+    # A row shorter than the attack (last note cut off by the end of the
+    # buffer) gets its own, shorter ramp.
+    short = np.flatnonzero(lengths < atk)
+    if len(short):
+        env = env.copy()
+        for i in short:
+            env[i, :lengths[i]] = dsp.pluck_envelope(lengths[i], decay, sr)
+    return env
+
+
+def render_notes(onsets, lengths, freqs, amps, total, sr, timbre, decay,
+                 detune=(1.0,), cutoff_hz=None, ir=None,
+                 max_elems=MAX_ELEMS):
+    """
+    Overlap-add one plucked note per row into a `total`-sample signal.
+
+    onsets, lengths  sample position and length of every note
+    freqs, amps      fundamental (Hz) and linear gain of every note
+    timbre           sonify.wavetable name or Wavetable
+    decay            envelope decay rate (1/s)
+    detune           chorus voice ratios; voices are averaged
+    cutoff_hz, ir    optional low-pass and reverb impulse response, applied
+                     per note (each note's reverb tail ends with the note)
+    """
+    from scipy.signal import sosfilt
+
+    onsets  = np.asarray(onsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    freqs   = np.asarray(freqs, dtype=float)
+    amps    = np.asarray(amps, dtype=float)
+    out     = np.zeros(total)
+    if len(onsets) == 0 or lengths.max() <= 0:
+        return out
+
+    osc   = wavetable.get(timbre)
+    top   = dsp.MAX_PITCH * max(detune)      # band-limit bound for the table
+    width = int(lengths.max())
+    sos   = dsp.lowpass_sos(cutoff_hz, sr) if cutoff_hz else None
+    room  = PartitionedIR(ir) if ir is not None else None
+    t     = np.arange(width) / sr
+    k     = np.arange(width)
+    # A row's footprint is its samples plus, with reverb, the Convolver's
+    # per-channel delay line — which dwarfs very short notes.
+    footprint = width + (room.B * (2 * room.P + 6) if room is not None else 0)
+    rows_per_chunk = max(1, max_elems // footprint)
+
+    for c0 in range(0, len(onsets), rows_per_chunk):
+        sl   = slice(c0, c0 + rows_per_chunk)
+        w2pi = 2 * np.pi * freqs[sl]
+
+        with stage('synth'):
+            wave = sum(parallel.map(
+                lambda fm: osc((w2pi * fm)[:, None] * t[None, :], top, sr),
+                detune)) / np.float32(len(detune))
+            env   = _envelopes(lengths[sl], width, decay, sr).astype(np.float32)
+            notes = wave * amps[sl, None].astype(np.float32) * env
+
+        if sos is not None:
+            with stage('lowpass'):
+                notes = sosfilt(sos, notes, axis=1)
+        if room is not None:
+            with stage('reverb'):
+                notes = Convolver(room).process(notes)
+
+        with stage('overlap_add'):
+            keep = k[None, :] < lengths[sl, None]
+            idx  = onsets[sl, None] + k[None, :]
+            out += np.bincount(idx[keep], weights=notes[keep],
+                               minlength=total)[:total]
+
+    return out
@@ -0,0 +1,239 @@
+"""
+Real-time playback engine.
+
+Player plays a rendered (n, 2) buffer through an output stream whose callback
+reads straight from the buffer — no int16 copy, no temp WAV, no child
+process.  Channel muting is a per-channel gain applied inside the callback,
+so "Traffic only" / "Revenue only" don't copy the audio either.
+
+Player.position is the stream's own clock: the sample index of the most
+recent buffer handed to the device, advanced by the stream time elapsed since
+that buffer's DAC time.  Cursors that follow it stay locked to what you hear.
+
+Backends
+  SoundDeviceBackend  sounddevice.OutputStream (PortAudio)
+  NullBackend         no device; a thread (or the caller) drives the callback
+                      on a virtual or wall clock — for headless use and tests
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+
+# ── Backends ────────────────────────────────────────────────────────────
+class SoundDeviceBackend:
+    name = 'sounddevice'
+
+    def __init__(self, device=None, latency='low'):
+        import sounddevice as sd
+        self._sd          = sd
+        self.CallbackStop = sd.CallbackStop
+        self.device       = device
+        self.latency      = latency
+
+    def open_stream(self, samplerate, channels, blocksize, callback,
+                    finished_callback):
+        return self._sd.OutputStream(
+            samplerate=samplerate, channels=channels, blocksize=blocksize,
+            dtype='float32', device=self.device, latency=self.latency,
+            callback=callback, finished_callback=finished_callback)
+
+
+class _NullCallbackStop(Exception):
+    pass
+
+
+class NullStream:
+    """Stands in for sounddevice.OutputStream without touching any device.
+
+    realtime=True paces callbacks against the wall clock; realtime=False runs
+    them back-to-back on a virtual clock.  With capture=True every buffer the
+    callback fills is kept, so tests can compare what "played" to the input.
+    """
+
+    def __init__(self, samplerate, channels, blocksize, callback,
+                 finished_callback=None, realtime=True, capture=None):
+        self.samplerate = samplerate
+        self.channels   = channels
+        self.blocksize  = blocksize
+        self._callback  = callback
+        self._finished  = finished_callback
+        self._realtime  = realtime
+        self._capture   = capture
+        self._frames    = 0
+        self._t0        = 0.0
+        self._halt      = threading.Event()
+        self._thread    = None
+        self.active     = False
+
+    @property
+    def time(self):
+        if self._realtime:
+            return time.monotonic()
+        return self._t0 + self._frames / self.samplerate
+
+    def start(self):
+        self._t0     = time.monotonic() if self._realtime else 0.0
+        self._frames = 0
+        self._halt.clear()
+        self.active  = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        buf = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        try:
+            while not self._halt.is_set():
+                dac  = self._t0 + self._frames / self.samplerate
+                info = SimpleNamespace(outputBufferDacTime=dac,
+                                       currentTime=self.time)
+                try:
+                    self._callback(buf, self.blocksize, info, None)
+                    last = False
+                except _NullCallbackStop:
+                    last = True
+                if self._capture is not None:
+                    self._capture.append(buf.copy())
+                self._frames += self.blocksize
+                if last:
+                    break
+                if self._realtime:
+                    wait = self._t0 + self._frames / self.samplerate - time.monotonic()
+                    if wait > 0:
+                        self._halt.wait(wait)
+        finally:
+            self.active = False
+            if self._finished is not None:
+                self._finished()
+
+    def stop(self):
+        self._halt.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    close = stop
+
+
+class NullBackend:
+    name = 'null'
+    CallbackStop = _NullCallbackStop
+
+    def __init__(self, realtime=True, capture=False):
+        self.realtime = realtime
+        self.captured = [] if capture else None
+
+    def open_stream(self, samplerate, channels, blocksize, callback,
+                    finished_callback):
+        return NullStream(samplerate, channels, blocksize, callback,
+                          finished_callback, realtime=self.realtime,
+                          capture=self.captured)
+
+    def output(self):
+        """Everything the callback wrote so far, as one (n, channels) array."""
+        if not self.captured:
+            return np.zeros((0, 2), dtype=np.float32)
+        return np.concatenate(self.captured)
+
+
+def default_backend():
+    """sounddevice when it imports and has an output device, else null."""
+    try:
+        import sounddevice as sd
+        sd.query_devices(kind='output')
+        return SoundDeviceBackend()
+    except Exception:
+        return NullBackend()
+
+
+# ── Player ──────────────────────────────────────────────────────────────
+class Player:
+    """One output stream at a time, fed from a rendered stereo buffer."""
+
+    def __init__(self, sample_rate, backend=None, blocksize=1024):
+        self.sample_rate = sample_rate
+        self.backend     = backend or default_backend()
+        self.blocksize   = blocksize
+        self._stream     = None
+        self._audio      = None
+        self._gains      = np.ones(2, dtype=np.float32)
+        self._pos        = 0          # frames handed to the device so far
+        self._clock      = None       # (frame index, DAC time) of last buffer
+        self._done       = threading.Event()
+        self._lock       = threading.Lock()
+
+    # ── Control ───────────────────────────────────────────────
+    def play(self, audio, gains=(1.0, 1.0)):
+        """Start playing `audio` from the top, replacing anything playing.
+        gains: per-channel level, e.g. (1, 0) to mute the right channel."""
+        self.stop()
+        with self._lock:
+            self._audio = audio
+            self._gains = np.asarray(gains, dtype=np.float32)
+            self._pos   = 0
+            self._clock = None
+            self._done.clear()
+            self._stream = self.backend.open_stream(
+                self.sample_rate, audio.shape[1], self.blocksize,
+                self._callback, self._done.set)
+            self._stream.start()
+
+    def set_gains(self, gains):
+        """Change channel levels mid-playback; picked up by the next buffer."""
+        self._gains = np.asarray(gains, dtype=np.float32)
+
+    def stop(self):
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    # ── Audio clock ───────────────────────────────────────────
+    @property
+    def active(self):
+        return self._stream is not None and not self._done.is_set()
+
+    @property
+    def position(self):
+        """Sample index currently reaching the speakers."""
+        if self._audio is None:
+            return 0
+        total = len(self._audio)
+        if self._done.is_set():
+            return total if self._stream is not None else min(self._pos, total)
+        clock, stream = self._clock, self._stream
+        if clock is None or stream is None:
+            return 0
+        frame, dac = clock
+        pos = frame + (stream.time - dac) * self.sample_rate
+        return int(max(0, min(pos, total)))
+
+    @property
+    def seconds(self):
+        return self.position / self.sample_rate
+
+    @property
+    def progress(self):
+        """Fraction of the current buffer played, 0.0 – 1.0."""
+        if self._audio is None or len(self._audio) < 2:
+            return 0.0
+        return min(self.position / (len(self._audio) - 1), 1.0)
+
+    # ── Stream callback (audio thread) ────────────────────────
+    def _callback(self, outdata, frames, time_info, status):
+        audio, pos = self._audio, self._pos
+        n = max(0, min(frames, len(audio) - pos))
+        # Scale the buffer view straight into the device buffer.
+        np.multiply(audio[pos:pos + n], self._gains, out=outdata[:n])
+        outdata[n:] = 0
+        self._clock = (pos, time_info.outputBufferDacTime)
+        self._pos   = pos + n
+        if pos + n >= len(audio):
+            raise self.backend.CallbackStop
@@ -0,0 +1,191 @@
+"""
+Clip presets behind the sonification API.
+
+Python ports of the testapp presets (testapp/app/lib/sonification/presets)
+so the local service renders the same clips as the web app:
+
+  trend_v1    one series; pitch = value, a step per bucket with continuous
+              phase, 880 Hz tick on |z| >= 2 spikes and dips
+  compare_v1  series A, a 60 ms gap, then series B on a shared pitch scale
+  anomalies   trend_v1 plus a bell "chime" earcon on each flagged bucket
+
+Every preset is vectorised: the per-sample frequency is a np.repeat of the
+per-bucket pitches and the phase one cumsum, so a clip costs a few array
+passes whatever the point count.  Output is mono float32 in [-1, 1].
+"""
+
+import numpy as np
+
+from sonify import dsp, wavetable
+from sonify.profile import stage
+
+DEFAULT_SAMPLE_RATE = 24000
+TREND_DURATION_MS   = 2800
+COMPARE_DURATION_MS = 3200
+
+PITCH_MIN_HZ  = 110.0
+PITCH_OCTAVES = 3               # 110 → 880 Hz
+Z_SPIKE       = 2.0             # |z| that earns a spike / dip tick
+
+TICK_MS, TICK_FREQ, TICK_GAIN, TICK_DECAY = 40, 880.0, 0.15, 40.0
+CHIME_MS, CHIME_GAIN, CHIME_DECAY = 180, 0.22, 14.0
+CHIME_PARTIALS = ((1320.0, 1.0), (1980.0, 0.5), (2640.0, 0.25))
+
+TREND_FADE_MS   = 20
+COMPARE_FADE_MS = 30
+COMPARE_GAP_MS  = 60
+
+NORMALIZE_METHODS = ('minmax', 'zscore', 'none')
+
+
+# ── Mapping ─────────────────────────────────────────────────────────────
+def normalize(values, method='minmax'):
+    """Values to [0, 1].  zscore centres on 0.5 and spans ±3σ (clipped);
+    none keeps the raw scale, anchored at zero."""
+    v = np.asarray(values, dtype=float)
+    if len(v) == 0:
+        return v
+    if method == 'zscore':
+        sigma = v.std() or 1.0
+        return np.clip((v - v.mean()) / (sigma * 3) + 0.5, 0.0, 1.0)
+    if method == 'none':
+        top = np.abs(v).max() or 1.0
+        return np.clip(v / top, 0.0, 1.0)
+    if method != 'minmax':
+        raise ValueError(f"normalize method must be one of "
+                         f"{NORMALIZE_METHODS}, not {method!r}")
+    span = (v.max() - v.min()) or 1.0
+    return (v - v.min()) / span
+
+
+def norm_to_freq(norm):
+    return PITCH_MIN_HZ * 2.0 ** (PITCH_OCTAVES * np.clip(norm, 0.0, 1.0))
+
+
+def zscores(values):
+    v = np.asarray(values, dtype=float)
+    return (v - v.mean()) / (v.std() or 1.0)
+
+
+def point_values(points):
+    """(labels, values) from [{"t", "v"}, ...] or a plain list of numbers."""
+    if len(points) and isinstance(points[0], dict):
+        return ([p.get('t') for p in points],
+                np.array([p['v'] for p in points], dtype=float))
+    values = np.asarray(points, dtype=float)
+    return list(range(len(values))), values
+
+
+# ── Synthesis ───────────────────────────────────────────────────────────
+def _slots(n_points, total):
+    """Start sample of each bucket (plus the end) for n equal slices."""
+    return np.minimum((np.arange(n_points + 1) * (total / n_points))
+                      .astype(np.int64), total)
+
+
+def _stepped_tone(norm, total, sr, timbre='trend_v1'):
+    """One held note per bucket, phase carried across buckets."""
+    edges = _slots(len(norm), total)
+    lens  = np.diff(edges)
+    freq  = np.repeat(norm_to_freq(norm), lens)
+    amp   = np.repeat((0.25 + 0.55 * norm).astype(np.float32), lens)
+    phase = np.empty(total)
+    phase[0] = 0.0
+    np.cumsum(2 * np.pi * freq[:-1] / sr, out=phase[1:])
+    osc = wavetable.get(timbre)
+    return osc(phase, PITCH_MIN_HZ * 2 ** PITCH_OCTAVES, sr) * amp, edges
+
+
+def _decaying(partials, n, decay, sr):
+    t = np.arange(n) / sr
+    return np.exp(-t * decay) * sum(g * np.sin(2 * np.pi * f * t)
+                                    for f, g in partials)
+
+
+def _fade(x, n, start=0, length=None):
+    length = len(x) - start if length is None else length
+    n = min(n, length)
+    ramp = (np.arange(n) / max(n, 1)).astype(x.dtype)
+    x[start:start + n] *= ramp
+    x[start + length - n:start + length] *= ramp[::-1]
+    return x
+
+
+# ── Presets ─────────────────────────────────────────────────────────────
+def trend_v1(points, duration_ms=TREND_DURATION_MS,
+             sample_rate=DEFAULT_SAMPLE_RATE, normalize_method='minmax',
+             speed=1.0):
+    """(samples, events) for a single series."""
+    labels, values = point_values(points)
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.float32), []
+    sr    = sample_rate
+    total = max(1, int(sr * duration_ms / max(0.1, speed) / 1000))
+    with stage('map'):
+        norm = normalize(values, normalize_method)
+        z    = zscores(values)
+        hits = np.flatnonzero(np.abs(z) >= Z_SPIKE)
+    with stage('synth'):
+        out, edges = _stepped_tone(norm, total, sr)
+    with stage('earcons'):
+        tick = _decaying(((TICK_FREQ, 1.0),), int(sr * TICK_MS / 1000),
+                         TICK_DECAY, sr)
+        dsp.scatter_add(out, tick, edges[hits], TICK_GAIN)
+    _fade(out, int(sr * TREND_FADE_MS / 1000))
+
+    events = [{'t': labels[i], 'type': 'spike' if z[i] > 0 else 'dip',
+               'strength': float(min(1.0, abs(z[i]) / 4))} for i in hits]
+    return out, events
+
+
+def compare_v1(a_points, b_points, duration_ms=COMPARE_DURATION_MS,
+               sample_rate=DEFAULT_SAMPLE_RATE, a_label='A', b_label='B'):
+    """(samples, explain_hint): A, a short gap, then B on one pitch scale."""
+    _, a = point_values(a_points)
+    _, b = point_values(b_points)
+    sr   = sample_rate
+    gap  = int(sr * COMPARE_GAP_MS / 1000)
+    half = max(1, int((sr * duration_ms / 1000 - gap) // 2))
+    norm = normalize(np.concatenate([a, b]), 'minmax')
+    fade = int(sr * COMPARE_FADE_MS / 1000)
+
+    out = np.zeros(2 * half + gap, dtype=np.float32)
+    for start, part in ((0, norm[:len(a)]), (half + gap, norm[len(a):])):
+        with stage('synth'):
+            out[start:start + half], _ = _stepped_tone(part, half, sr,
+                                                       'compare_v1')
+        _fade(out, fade, start, half)
+    hint = (f"First phrase is {a_label}, second phrase is {b_label}. "
+            "Higher notes mean larger values.")
+    return out, hint
+
+
+def anomalies(points, flagged, duration_ms=TREND_DURATION_MS,
+              sample_rate=DEFAULT_SAMPLE_RATE, normalize_method='zscore',
+              speed=1.0):
+    """(samples, events): trend_v1 with a chime on each flagged bucket.
+    flagged: bucket labels ("t" values) or integer indices."""
+    labels, values = point_values(points)
+    out, events = trend_v1(points, duration_ms, sample_rate, normalize_method,
+                           speed)
+    if len(values) == 0:
+        return out, events
+    where = {t: i for i, t in enumerate(labels)}
+    idx   = []
+    for f in flagged:
+        i = where.get(f.get('t') if isinstance(f, dict) else f)
+        if i is None and isinstance(f, (int, np.integer)) and 0 <= f < len(values):
+            i = int(f)
+        if i is not None:
+            idx.append(i)
+    idx   = np.unique(np.array(idx, dtype=np.int64))
+    sr    = sample_rate
+    with stage('earcons'):
+        chime = _decaying(CHIME_PARTIALS, int(sr * CHIME_MS / 1000),
+                          CHIME_DECAY, sr)
+        dsp.scatter_add(out, chime / sum(g for _, g in CHIME_PARTIALS),
+                        _slots(len(values), len(out))[idx], CHIME_GAIN)
+    np.clip(out, -1.0, 1.0, out=out)
+    events = events + [{'t': labels[i], 'type': 'anomaly', 'strength': 1.0}
+                       for i in idx]
+    return out, events
@@ -0,0 +1,240 @@
+"""
+Opt-in per-stage profiling of the render pipeline.
+
+Renderers mark their stages with
+
+    with profile.stage('interp'):
+        ...
+
+which costs one ContextVar lookup when no profiler is active.  To record,
+activate a Profiler around the render (or pass it as build_audio's
+`profiler`):
+
+    prof = Profiler(memory=True)
+    with prof:
+        build_audio(sessions, revenue)
+    print(prof.report())
+    prof.write_chrome('render.trace.json')     # chrome://tracing, Perfetto
+
+Stages nest: a record's `path` is its ancestors' names joined by '/', e.g.
+'echo/notes/reverb'.  With memory=True each stage also records, via
+tracemalloc, the net bytes it left allocated and the peak it allocated above
+its starting point — NumPy reports its buffers to tracemalloc, so this is
+the audio arrays the stage created.  Tracing memory slows NumPy-heavy code
+noticeably; timings from a memory run are indicative only.  tracemalloc's
+counters are process-wide, so when stages run concurrently (threads=...,
+or other threads allocating) a stage's bytes and peak include whatever the
+other threads allocated meanwhile; profile memory on a serial render.
+
+The active profiler is a ContextVar, so concurrent renders on other threads
+or asyncio tasks don't record into each other's traces.  Work a render hands
+to a thread pool (sonify.parallel) goes through bind(), which carries the
+profiler and the open stage path over to the worker.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+_current = ContextVar('sonify_profiler', default=None)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+def stage(name):
+    """Context manager timing `name` on the active profiler (if any)."""
+    prof = _current.get()
+    return _NULL if prof is None else prof.span(name)
+
+
+def active():
+    return _current.get()
+
+
+def bind(fn):
+    """fn wrapped to run, on any thread, in a copy of the current context
+    and under the calling thread's open stages — for work handed to a pool,
+    so its stages record as 'echo/synth' rather than 'synth'.  Bind once
+    per task: a copied context can only be entered by one thread at a time."""
+    ctx  = contextvars.copy_context()
+    prof = _current.get()
+    open_stages = [f['name'] for f in prof._stack] if prof is not None else []
+
+    def run(*args, **kwargs):
+        return ctx.run(_under, prof, open_stages, fn, args, kwargs)
+    return run
+
+
+def _under(prof, names, fn, args, kwargs):
+    if prof is None or not names:
+        return fn(*args, **kwargs)
+    stack = prof._stack
+    base  = len(stack)
+    stack.extend({'name': n, 'start': 0.0, 'mem': None, 'peak': 0}
+                 for n in names)             # path prefix only; never popped
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        del stack[base:]
+
+
+class _Span:
+    __slots__ = ('prof', 'name')
+
+    def __init__(self, prof, name):
+        self.prof, self.name = prof, name
+
+    def __enter__(self):
+        self.prof._push(self.name)
+
+    def __exit__(self, *exc):
+        self.prof._pop()
+        return False
+
+
+class Profiler:
+    """Collects one record per stage entered while it is active."""
+
+    def __init__(self, memory=False):
+        self.memory  = memory
+        self.records = []
+        self._local  = threading.local()     # per-thread stage stack
+        self._tokens = []
+        self._t0     = time.perf_counter()
+        self._own_tm = False
+
+    # ── Activation ────────────────────────────────────────────
+    def __enter__(self):
+        if self.memory and not self._tokens:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tm = True
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._tokens.pop())
+        if self._own_tm and not self._tokens:
+            import tracemalloc
+            tracemalloc.stop()
+            self._own_tm = False
+        return False
+
+    def span(self, name):
+        return _Span(self, name)
+
+    # ── Recording ─────────────────────────────────────────────
+    @property
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, name):
+        mem = None
+        if self.memory:
+            import tracemalloc
+            cur, peak = tracemalloc.get_traced_memory()
+            stack = self._stack
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            mem = cur
+        self._stack.append({'name': name, 'start': time.perf_counter(),
+                            'mem': mem, 'peak': 0})
+
+    def _pop(self):
+        end   = time.perf_counter()
+        stack = self._stack
+        frame = stack.pop()
+        rec   = {'name': frame['name'],
+                 'path': '/'.join([f['name'] for f in stack] + [frame['name']]),
+                 'depth': len(stack),
+                 'start_s': frame['start'] - self._t0,
+                 'dur_s': end - frame['start'],
+                 'tid': threading.get_ident()}
+        if self.memory:
+            import tracemalloc
+            cur, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame['peak'])
+            rec['bytes']      = cur - frame['mem']
+            rec['peak_bytes'] = peak - frame['mem']
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        self.records.append(rec)
+
+    # ── Output ────────────────────────────────────────────────
+    def summary(self):
+        """{path: {calls, total_s, bytes, peak_bytes}} in first-seen order."""
+        out = {}
+        for r in sorted(self.records, key=lambda r: r['start_s']):
+            s = out.setdefault(r['path'], {'calls': 0, 'total_s': 0.0})
+            s['calls']   += 1
+            s['total_s'] += r['dur_s']
+            if 'bytes' in r:
+                s['bytes']      = s.get('bytes', 0) + r['bytes']
+                s['peak_bytes'] = max(s.get('peak_bytes', 0), r['peak_bytes'])
+        return out
+
+    def totals(self):
+        """{stage name: seconds} summed over every path — the leaf view."""
+        out = {}
+        for r in self.records:
+            out[r['name']] = out.get(r['name'], 0.0) + r['dur_s']
+        return out
+
+    def report(self):
+        """Indented table of the summary for console output."""
+        lines = []
+        for path, s in self.summary().items():
+            depth = path.count('/')
+            name  = '  ' * depth + path.rsplit('/', 1)[-1]
+            line  = f"   {name:<28} {s['total_s'] * 1e3:9.1f} ms"
+            if s['calls'] > 1:
+                line += f"  ×{s['calls']}"
+            if 'bytes' in s:
+                line += f"  {s['peak_bytes'] / 2 ** 20:8.1f} MB peak"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def compact(self, depth=0):
+        """One line: 'name 12ms · name 3ms' for stages at `depth`."""
+        return '  ·  '.join(f"{p.rsplit('/', 1)[-1]} {s['total_s'] * 1e3:.0f}ms"
+                            for p, s in self.summary().items()
+                            if p.count('/') == depth)
+
+    def write_jsonl(self, fp):
+        """One JSON object per stage record."""
+        for r in self.records:
+            fp.write(json.dumps(r) + '\n')
+
+    def chrome_trace(self):
+        """Trace Event Format dict (complete 'X' events, microseconds)."""
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            args = {k: r[k] for k in ('bytes', 'peak_bytes') if k in r}
+            events.append({'name': r['name'], 'cat': r['path'], 'ph': 'X',
+                           'ts': r['start_s'] * 1e6, 'dur': r['dur_s'] * 1e6,
+                           'pid': pid, 'tid': r['tid'], 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,163 @@
+"""
+Multi-resolution pyramid of a metric, for charts and audio that can't use
+every bucket.
+
+    pyr = Pyramid(sessions)
+    w   = pyr.window(lo, hi, max_points=800)     # ≤ 800 bars for [lo, hi)
+    w.x, w.width, w.min, w.max, w.mean           # one entry per bar
+    x, y = pyr.decimate(720, lo, hi)             # LTTB line through the range
+
+Level 0 is the series itself; each level above aggregates FACTOR buckets of
+the one below into their min, max, sum and count, so all levels together
+cost a third of the series again and are built in one pass of reduceats.
+A view of any sub-range reads the finest level that still fits the budget —
+at most ~FACTOR × max_points buckets are touched, whatever the series
+length, so zooming never rescans the raw data.
+
+lttb() is Largest-Triangle-Three-Buckets decimation: it keeps, per output
+bucket, the point forming the largest triangle with its neighbours, so
+spikes survive where averaging would flatten them.  The renderers use it
+through audible() — a series with more buckets than AUDIBLE_RATE per second
+of audio is replaced by decimate()'s line before its spline is fitted, read
+from a level of at most OVERSAMPLE × that many buckets; shorter series are
+used unchanged.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+FACTOR       = 4         # buckets merged per level
+AUDIBLE_RATE = 40        # distinct values per second of audio the ear follows
+OVERSAMPLE   = 4         # decimate() reads a level with ≤ this × n_points
+
+Level  = namedtuple('Level', 'step min max sum count')
+Window = namedtuple('Window', 'x width min max mean step')
+
+
+# ── LTTB ────────────────────────────────────────────────────────────────
+def lttb(x, y, n_out):
+    """(x, y) decimated to n_out points by Largest-Triangle-Three-Buckets.
+    First and last points are kept; series of ≤ n_out points are returned
+    as they are."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    # Interior points 1..n-2 split into n_out - 2 buckets; bucket i is
+    # [edges[i], edges[i + 1]).  The last point is a bucket of its own.
+    edges = np.concatenate([
+        (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1,
+        [n]])
+    cnt   = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / cnt
+    avg_y = np.add.reduceat(y, edges[:-1]) / cnt
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = avg_x[i + 1], avg_y[i + 1]      # next bucket's centroid
+        area = np.abs((x[a] - bx) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (by - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def audible_points(duration, rate=AUDIBLE_RATE):
+    """Most distinct values `duration` seconds of audio can carry."""
+    return max(4, int(duration * rate))
+
+
+def audible(series, duration, rate=AUDIBLE_RATE):
+    """(x, y) knots for a renderer's spline: the series at x = 0..n-1, or,
+    if it has more points than audible_points(), Pyramid.decimate()'s line.
+    Only the level decimate() would read is aggregated — one reduceat over
+    the series — so a render never builds the levels below it."""
+    y     = np.asarray(series, dtype=float)
+    n     = len(y)
+    n_out = audible_points(duration, rate)
+    if n <= n_out:
+        return np.arange(n, dtype=float), y
+    step = 1
+    while -(-n // step) > OVERSAMPLE * n_out:
+        step *= FACTOR
+    at    = np.arange(0, n, step)
+    width = np.diff(np.append(at, n))
+    x, m  = _pin_ends(at + (width - 1) / 2.0, np.add.reduceat(y, at) / width,
+                      y, 0, n)
+    return lttb(x, m, n_out)
+
+
+def _pin_ends(x, y, raw, lo, hi):
+    """Coarse bucket centres x don't fall on the range's ends (and the edge
+    buckets may overhang it): pin the line's ends to the raw values."""
+    inner = (x > lo) & (x < hi - 1)
+    return (np.concatenate([[lo], x[inner], [hi - 1]]),
+            np.concatenate([[raw[lo]], y[inner], [raw[hi - 1]]]))
+
+
+# ── Pyramid ─────────────────────────────────────────────────────────────
+class Pyramid:
+    """Min / max / mean of a series at every FACTOR-fold coarsening."""
+
+    def __init__(self, values, factor=FACTOR):
+        v = np.asarray(values, dtype=float)
+        if len(v) == 0:
+            raise ValueError("Pyramid needs a non-empty series")
+        self.factor = factor
+        self.levels = [Level(1, v, v, v, np.ones(len(v), dtype=np.int64))]
+        while len(self.levels[-1].sum) > 1:
+            prev = self.levels[-1]
+            at   = np.arange(0, len(prev.sum), factor)
+            self.levels.append(Level(prev.step * factor,
+                                     np.minimum.reduceat(prev.min, at),
+                                     np.maximum.reduceat(prev.max, at),
+                                     np.add.reduceat(prev.sum, at),
+                                     np.add.reduceat(prev.count, at)))
+
+    def __len__(self):
+        return len(self.levels[0].sum)
+
+    def _range(self, lo, hi):
+        n  = len(self)
+        lo = max(0, int(np.floor(lo or 0)))
+        hi = n if hi is None else min(n, int(np.ceil(hi)))
+        return lo, max(lo + 1, hi)
+
+    def level_for(self, max_points, lo=0, hi=None):
+        """Finest level with at most max_points buckets across [lo, hi)."""
+        lo, hi = self._range(lo, hi)
+        for k, level in enumerate(self.levels):
+            if (hi - 1) // level.step - lo // level.step + 1 <= max_points:
+                return k
+        return len(self.levels) - 1
+
+    def window(self, lo=0, hi=None, max_points=None, level=None):
+        """Window of the buckets covering raw [lo, hi) at `level`, or at the
+        finest level with ≤ max_points of them.  x is each bucket's centre
+        and width its span, both in raw bucket units."""
+        lo, hi = self._range(lo, hi)
+        if level is None:
+            level = 0 if max_points is None else self.level_for(max_points, lo, hi)
+        L  = self.levels[level]
+        i0 = lo // L.step
+        i1 = (hi - 1) // L.step + 1
+        start = np.arange(i0, i1) * L.step
+        width = L.count[i0:i1]
+        return Window(start + (width - 1) / 2.0, width, L.min[i0:i1],
+                      L.max[i0:i1], L.sum[i0:i1] / width, L.step)
+
+    def decimate(self, n_points, lo=0, hi=None):
+        """LTTB line of ≤ n_points through [lo, hi), read from the level
+        with at most OVERSAMPLE × n_points buckets there.  The line starts
+        and ends on the raw values at lo and hi - 1, as lttb() would."""
+        lo, hi = self._range(lo, hi)
+        w   = self.window(lo, hi, max_points=OVERSAMPLE * n_points)
+        x, y = w.x, w.mean
+        if w.step > 1:
+            x, y = _pin_ends(x, y, self.levels[0].sum, lo, hi)
+        return lttb(x, y, n_points)
@@ -0,0 +1,325 @@
+"""
+Synthesis core: series in, stereo float buffer out.
+
+This is build_audio() and its stems, free of any GUI or audio-device
+import, so batch jobs and services can render without matplotlib or a
+sound card.  sonify_dashboard.py re-exports everything here.
+
+  LEFT  = traffic stem (organ pad, pitch = sessions)
+  RIGHT = echo stem (chorus of revenue per session, lag_days later)
+  ticks = woodblock click per day, mixed on top of both
+"""
+
+import numpy as np
+
+from sonify import dsp, parallel, reverb, wavetable
+from sonify.profile import stage
+from sonify.cache import stem_key
+from sonify.notes import render_notes
+from sonify.pyramid import audible
+
+AUDIO_DURATION      = 18.0    # seconds for the full sweep, whatever the day count
+DEFAULT_SAMPLE_RATE = 48000   # Hz, when the caller doesn't pass one
+RENDER_RATE         = 24000   # Hz, internal synthesis rate for render_rate
+
+
+def _day_tick_track(total_samples, n_days=30, sr=None):
+    """Mono track with a soft woodblock click at every day boundary.
+    Lets you count ticks between a traffic spike and the echo that follows —
+    that count is the lag in days."""
+    sr  = sr or DEFAULT_SAMPLE_RATE
+    spd = total_samples / float(n_days)
+    return dsp.scatter_add(np.zeros(total_samples), dsp.click_wave(sr),
+                           (np.arange(n_days) * spd).astype(np.int64))
+
+
+def _smooth(series, total_samples, floor, duration=None):
+    """Cubic-interpolated series at every output sample, clipped at floor.
+    Series with more buckets than `duration` seconds can carry audibly are
+    decimated from a pyramid level first (sonify.pyramid.audible)."""
+    from scipy.interpolate import interp1d
+
+    n_days = len(series)
+    knot_x, knot_y = audible(series, duration or AUDIO_DURATION)
+    t_x    = np.linspace(0, n_days - 1, total_samples)
+    return np.clip(
+        interp1d(knot_x, knot_y, kind=dsp.interp_kind(len(knot_x)),
+                 fill_value='extrapolate')(t_x), floor, None)
+
+
+def _per_day_slots(n_days, total_samples):
+    spd    = total_samples / float(n_days)   # samples per day
+    onsets = (np.arange(n_days) * spd).astype(np.int64)
+    blens  = (np.minimum(onsets + int(spd * 0.72), total_samples)
+              - onsets)                      # 72% of slot = note, 28% = gap
+    return spd, onsets, blens
+
+
+def render_traffic_stem(sessions, mode='continuous', sample_rate=None,
+                        duration=None, room=None, timbre='organ'):
+    """LEFT channel before normalisation: organ pad, pitch = sessions.
+    room: reverb spec for sonify.reverb.resolve_ir (None = mode default).
+    timbre: registered sonify.wavetable name."""
+    sr       = sample_rate or DEFAULT_SAMPLE_RATE
+    duration = duration or AUDIO_DURATION
+    total_samples = int(duration * sr)
+    ir  = reverb.resolve_ir(room, sr, 'traffic', mode)
+    osc = wavetable.get(timbre)
+
+    if mode == 'continuous':
+        with stage('interp'):
+            s_smooth = _smooth(sessions, total_samples, 1, duration)
+        with stage('map'):
+            s_log  = np.log1p(s_smooth)
+            s_logn = dsp.minmax_norm(s_log, s_log.min(), s_log.max())
+            freq   = dsp.log_pitch(s_logn)   # 80–640 Hz, 3 octaves, exponential
+
+            s_n   = dsp.minmax_norm(s_smooth, s_smooth.min(), s_smooth.max())
+            amp_L = (0.25 + 0.55 * s_n).astype(np.float32)
+
+        # Organ pad + gentle vibrato + small room reverb
+        with stage('phase'):
+            t_arr    = np.arange(total_samples) / sr
+            vibrato  = 1.0 + 0.004 * np.sin(2 * np.pi * 5.2 * t_arr)
+            phase_L  = np.cumsum(2 * np.pi * freq * vibrato / sr)
+        with stage('synth'):
+            signal_L = osc(phase_L, dsp.MAX_PITCH * 1.004, sr) * amp_L
+        with stage('lowpass'):
+            signal_L = dsp.lowpass(signal_L, dsp.LEFT_CUTOFF, sr)
+        with stage('reverb'):
+            return reverb.convolve(signal_L, ir)
+
+    with stage('map'):
+        s_log  = np.log1p(sessions.astype(float))
+        s_logn = dsp.minmax_norm(s_log, s_log.min(), s_log.max())
+        s_n    = dsp.minmax_norm(sessions.astype(float),
+                                 sessions.min(), sessions.max())
+
+    # One batched note engine call: all notes are synthesised as a 2-D
+    # array, filtered and reverbed once, then overlap-added.
+    _, onsets, blens = _per_day_slots(len(sessions), total_samples)
+    with stage('notes'):
+        return render_notes(
+            onsets, blens, dsp.log_pitch(s_logn), 0.25 + 0.55 * s_n,
+            total_samples, sr, osc, decay=3.2,   # fast attack, exp decay
+            cutoff_hz=dsp.LEFT_CUTOFF, ir=ir)
+
+
+def render_echo_stem(sessions, revenue, lag_days=1, mode='continuous',
+                     sample_rate=None, duration=None, room=None,
+                     timbre='bright'):
+    """RIGHT channel before normalisation: chorus echo of revenue per
+    session, muffled, more reverb, arriving lag_days later."""
+    if lag_days < 0:
+        raise ValueError(f"lag_days must be >= 0 (the echo trails the "
+                         f"traffic), not {lag_days}")
+    sr       = sample_rate or DEFAULT_SAMPLE_RATE
+    duration = duration or AUDIO_DURATION
+    n_days   = len(sessions)
+    total_samples = int(duration * sr)
+    ir  = reverb.resolve_ir(room, sr, 'echo', mode)
+    osc = wavetable.get(timbre)
+
+    if mode == 'continuous':
+        with stage('interp'):
+            s_smooth = _smooth(sessions, total_samples, 1, duration)
+            r_smooth = _smooth(revenue, total_samples, 0, duration)
+        with stage('map'):
+            rps   = r_smooth / (s_smooth + 1e-9)
+            rps_n = dsp.minmax_norm(rps, rps.min(), rps.max())
+
+            # Driven by conversion rate data (its own graph), not traffic.
+            # Pitch and amplitude both follow rps — so the ear tracks the right chart.
+            rps_log  = np.log1p(rps)
+            rps_logn = dsp.minmax_norm(rps_log, rps_log.min(), rps_log.max())
+            freq_R   = dsp.log_pitch(rps_logn)   # same 3-octave range as left
+            amp_R    = (0.25 + 0.55 * rps_n).astype(np.float32)
+
+        def _pad_c(fm):
+            with stage('phase'):
+                ph = np.cumsum(2 * np.pi * freq_R * fm / sr)
+            with stage('synth'):
+                return osc(ph, dsp.MAX_PITCH * fm, sr)
+        # The three voices are independent; summed in order either way.
+        chorus = sum(parallel.map(_pad_c, dsp.CHORUS_DETUNE)) / np.float32(3.0)
+        with stage('lowpass'):
+            echo_signal = dsp.lowpass(chorus * amp_R, dsp.RIGHT_CUTOFF, sr)
+        with stage('reverb'):
+            echo_signal = reverb.convolve(echo_signal, ir)
+
+        with stage('delay'):
+            lag_samples = min(int(lag_days * (duration / n_days) * sr), total_samples)
+            signal_R    = np.zeros(total_samples)
+            signal_R[lag_samples:] = echo_signal[:total_samples - lag_samples]
+        return signal_R
+
+    with stage('map'):
+        rps      = revenue / (sessions.astype(float) + 1e-9)
+        rps_n    = dsp.minmax_norm(rps, rps.min(), rps.max())
+        rps_log  = np.log1p(rps)
+        rps_logn = dsp.minmax_norm(rps_log, rps_log.min(), rps_log.max())
+
+    # Echo of day i lands lag_days slots later, same note length as the
+    # traffic note.  Bright timbre + wide chorus — clearly distinct from
+    # the organ on the left.
+    spd, _, blens = _per_day_slots(n_days, total_samples)
+    src   = np.arange(max(n_days - lag_days, 0))
+    ons_R = ((src + lag_days) * spd).astype(np.int64)
+    with stage('notes'):
+        return render_notes(
+            ons_R, np.minimum(ons_R + blens[src], total_samples) - ons_R,
+            dsp.log_pitch(rps_logn[src]), 0.25 + 0.55 * rps_n[src],
+            total_samples, sr, osc, decay=2.2,  # slower decay — more bloom
+            detune=dsp.CHORUS_DETUNE, cutoff_hz=dsp.RIGHT_CUTOFF, ir=ir)
+
+
+def _room(ir):
+    """Resolved IR back to a room spec: None means no reverb."""
+    return 'dry' if ir is None else ir
+
+
+def mix_stems(traffic, echo, tick_track=None):
+    """Stereo mix: each stem normalised to its channel target, ticks on top."""
+    with stage('mix'):
+        return _mix(traffic, echo, tick_track)
+
+
+def _mix(traffic, echo, tick_track):
+    audio = np.zeros((len(traffic), 2))
+    audio[:, 0] = traffic
+    audio[:, 1] = echo
+
+    # Normalise channels to different targets: echo (right) louder than traffic (left)
+    for ch, target in enumerate(dsp.CHANNEL_TARGETS):
+        mx = np.max(np.abs(audio[:, ch]))
+        if mx > 0:
+            audio[:, ch] *= target / mx
+
+    if tick_track is not None:
+        audio += tick_track[:, None]
+
+    np.clip(audio, -1.0, 1.0, out=audio)
+    return audio
+
+
+def build_audio(sessions, revenue, lag_days=1, mode='continuous', ticks=True,
+                sample_rate=None, duration=None, cache=None, rooms=None,
+                timbres=None, profiler=None, render_rate=None, anomalies=None,
+                threads=None):
+    """
+    mode='continuous': smooth gliding theremin-style tone across all days.
+    mode='per-day':    one plucked pad note per day; echo arrives lag_days later.
+    lag_days must be >= 0 (ValueError otherwise): the echo can only trail.
+
+    LEFT  = traffic (organ pad, pitch = sessions)
+    RIGHT = revenue echo (chorus, muffled, more reverb)
+    ticks=True: woodblock click every day to count lag.
+
+    The series may be any length from 2 buckets up; sample_rate and
+    duration default to DEFAULT_SAMPLE_RATE and AUDIO_DURATION.  For very
+    long renders use sonify.stream.render_blocks, which yields the same
+    audio in fixed-size blocks without allocating the whole buffer.
+
+    cache: optional sonify.cache.StemCache.  The traffic, echo and tick
+    stems are looked up separately, so toggling ticks or changing only the
+    lag re-synthesises nothing that is already cached.
+
+    rooms: optional {'traffic': room, 'echo': room} convolution reverb per
+    stem — a sonify.reverb preset name ('room', 'hall', ...), an IR file
+    path, an IR array or 'dry'.  Unset stems keep the classic tap rooms.
+
+    timbres: optional {'traffic': name, 'echo': name} of registered
+    sonify.wavetable timbres (default organ / bright).
+
+    profiler: optional sonify.profile.Profiler, active for this call; each
+    stem and its stages (interp, phase, synth, lowpass, reverb, ...) are
+    recorded under it.  A Profiler activated by the caller works the same.
+
+    render_rate: synthesise the traffic and echo stems at this rate and
+    polyphase-resample them to sample_rate (ticks are drawn at sample_rate).
+    Everything the stems contain sits under their 1 / 2.5 kHz low-passes,
+    so RENDER_RATE (24 kHz) sounds the same as 48 kHz for half the work.
+
+    anomalies: optional sonify.anomaly.Anomalies (bucket indices); each
+    event's earcon — chime for a spike, thud for a dip — is mixed on top of
+    both channels at the start of its bucket, like the ticks.
+
+    threads: render the stems, and the chorus voices within the echo, on a
+    sonify.parallel pool of this many threads (or an Executor).  The output
+    is bit-identical to the serial render; see sonify.parallel.
+    """
+    if lag_days < 0:
+        raise ValueError(f"lag_days must be >= 0 (the echo trails the "
+                         f"traffic), not {lag_days}")
+    sessions, revenue = np.asarray(sessions), np.asarray(revenue)
+    if len(sessions) < 2:
+        raise ValueError(f"need at least 2 buckets, got {len(sessions)}")
+    if profiler is not None:
+        with profiler:
+            return build_audio(sessions, revenue, lag_days, mode, ticks,
+                               sample_rate, duration, cache, rooms, timbres,
+                               render_rate=render_rate, anomalies=anomalies,
+                               threads=threads)
+    if threads is not None:
+        with parallel.threads(threads):
+            return build_audio(sessions, revenue, lag_days, mode, ticks,
+                               sample_rate, duration, cache, rooms, timbres,
+                               render_rate=render_rate, anomalies=anomalies)
+
+    sr       = sample_rate or DEFAULT_SAMPLE_RATE
+    rr       = render_rate or sr
+    duration = duration or AUDIO_DURATION
+    n_days   = len(sessions)
+    total_samples = int(duration * sr)
+
+    rooms = rooms or {}
+    ir_L  = reverb.resolve_ir(rooms.get('traffic'), rr, 'traffic', mode)
+    ir_R  = reverb.resolve_ir(rooms.get('echo'), rr, 'echo', mode)
+    timbres = timbres or {}
+    osc_L = wavetable.get(timbres.get('traffic', 'organ'))
+    osc_R = wavetable.get(timbres.get('echo', 'bright'))
+
+    def _stem(name, render, *key_parts):
+        with stage(name):
+            if cache is None:
+                return render()
+            return cache.get_or_render(
+                stem_key(name, *key_parts, sr, duration), render)
+
+    def _at_rate(render):
+        """Render at rr, resampled to the output rate."""
+        if rr == sr:
+            return render
+        def resampled():
+            stem = render()
+            with stage('resample'):
+                return dsp.resample(stem, rr, sr, total_samples)
+        return resampled
+
+    # The stems share nothing until the mix: with a pool active
+    # (threads=...) they render concurrently.
+    stems = [lambda: _stem('traffic',
+                           _at_rate(lambda: render_traffic_stem(
+                               sessions, mode, rr, duration, _room(ir_L), osc_L)),
+                           sessions, mode, ir_L, osc_L.key, rr),
+             lambda: _stem('echo',
+                           _at_rate(lambda: render_echo_stem(
+                               sessions, revenue, lag_days, mode, rr, duration,
+                               _room(ir_R), osc_R)),
+                           sessions, revenue, lag_days, mode, ir_R, osc_R.key, rr)]
+    if ticks:
+        stems.append(lambda: _stem(
+            'ticks', lambda: _day_tick_track(total_samples, n_days, sr), n_days))
+    if anomalies is not None and len(anomalies.index):
+        from sonify.anomaly import earcon_track
+        stems.append(lambda: _stem(
+            'earcons', lambda: earcon_track(anomalies, n_days, total_samples, sr),
+            n_days, anomalies.index, anomalies.score, anomalies.kind.astype(str),
+            anomalies.threshold))
+
+    traffic, echo, *events = parallel.call(*stems)
+    tick_track = None
+    for track in events:
+        tick_track = track if tick_track is None else tick_track + track
+
+    return mix_stems(traffic, echo, tick_track)
@@ -0,0 +1,474 @@
+"""
+Local sonification HTTP service.
+
+    python -m sonify.service --port 8765 --workers 4
+
+Implements the sonification API from PROJECTSPEC.md on localhost, with no
+network access and nothing beyond numpy/scipy:
+
+  POST /api/sonify/series       trend_v1 clip of one series
+  POST /api/sonify/compare      compare_v1 clip of series A then B
+  POST /api/sonify/anomalies    trend_v1 clip with a chime on flagged points
+  GET  /api/sonify/audio/<hash>.wav   the rendered WAV (ETag, 304)
+  GET  /api/sonify/stats        render / dedup / store counters
+
+The event loop only parses requests and moves bytes.  Rendering and WAV
+encoding run on a bounded process pool; once max_pending renders are queued
+new ones get 503 rather than an ever-growing backlog.
+
+Identical requests are rendered once: each request is reduced to a canonical
+key, and a request whose key is already rendering awaits the same future.
+Finished clips live in an LRU store addressed by the hash of the WAV bytes,
+which is also the ETag, so clients revalidate with If-None-Match for free.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from http import HTTPStatus
+
+DEFAULT_PORT     = 8765
+MAX_BODY         = 8 * 1024 * 1024          # bytes per request body
+MAX_POINTS       = 1_000_000
+STORE_BUDGET     = 256 * 1024 * 1024        # bytes of encoded audio kept
+MAX_DURATION_MS  = 600_000
+AUDIO_PREFIX     = '/api/sonify/audio/'
+
+log = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ── Request → render job ────────────────────────────────────────────────
+def _points(obj, where):
+    pts = obj.get('points') if isinstance(obj, dict) else None
+    if not isinstance(pts, list) or not pts:
+        raise BadRequest(f"{where}.points must be a non-empty array")
+    if len(pts) > MAX_POINTS:
+        raise BadRequest(f"{where}.points has more than {MAX_POINTS} points")
+    if isinstance(pts[0], dict):
+        for i, p in enumerate(pts):
+            if not (isinstance(p, dict) and _finite(p.get('v'))
+                    and ('t' not in p or isinstance(p['t'], str)
+                         or _finite(p['t']))):
+                raise BadRequest(f"{where}.points[{i}] must be "
+                                 '{"t": label, "v": finite number}')
+    elif not all(_finite(p) for p in pts):
+        raise BadRequest(f"{where}.points must all be finite numbers "
+                         'or all {"t", "v"} objects')
+    return pts
+
+
+def _finite(x):
+    return (isinstance(x, (int, float)) and not isinstance(x, bool)
+            and math.isfinite(x))
+
+
+def _object(body, key):
+    obj = body.get(key)
+    if obj is None:
+        return {}
+    if not isinstance(obj, dict):
+        raise BadRequest(f"{key} must be an object")
+    return obj
+
+
+def _number(obj, key, default, lo, hi, where):
+    """obj[key] as a float in [lo, hi]; default when missing or 0."""
+    x = obj.get(key) or default
+    try:
+        x = math.nan if isinstance(x, bool) else float(x)
+    except (TypeError, ValueError):
+        x = math.nan
+    if not lo <= x <= hi:
+        raise BadRequest(f"{where}.{key} must be {lo:g}–{hi:g}")
+    return x
+
+
+def _render_opts(body):
+    render  = _object(body, 'render')
+    mapping = _object(body, 'mapping')
+    if render.get('format', 'wav') != 'wav':
+        raise BadRequest("render.format must be 'wav'")
+    sr    = int(_number(render, 'sample_rate', 24000, 8000, 192000, 'render'))
+    speed = _number(mapping, 'speed', 1.0, 0.1, 10, 'mapping')
+    return mapping, sr, speed
+
+
+def _duration(mapping, default):
+    return _number(mapping, 'duration_ms', default, 50, MAX_DURATION_MS,
+                   'mapping')
+
+
+def _normalize(mapping, default):
+    from sonify.presets import NORMALIZE_METHODS
+
+    method = mapping.get('normalize', default)
+    if method not in NORMALIZE_METHODS:
+        raise BadRequest(f"mapping.normalize must be one of "
+                         f"{', '.join(NORMALIZE_METHODS)}")
+    return method
+
+
+def _flagged(flagged):
+    """Flagged buckets: labels, indices or {"t": label} objects."""
+    if not isinstance(flagged, list):
+        raise BadRequest("anomalies must be an array")
+    for i, f in enumerate(flagged):
+        t = f.get('t') if isinstance(f, dict) else f
+        if not (isinstance(t, str) or _finite(t)):
+            raise BadRequest(f"anomalies[{i}] must be a label, an index "
+                             'or {"t": label}')
+    return flagged
+
+
+def parse_job(kind, body):
+    """Validated, canonical (kind, params) for a request body.  Equal
+    params render equal audio, so their JSON is the dedup key."""
+    from sonify import presets
+
+    if not isinstance(body, dict):
+        raise BadRequest("request body must be a JSON object")
+    mapping, sr, speed = _render_opts(body)
+
+    if kind == 'series':
+        preset = mapping.get('preset', 'trend_v1')
+        if preset != 'trend_v1':
+            raise BadRequest(f"unknown preset {preset!r} for /series "
+                             "(use /compare for compare_v1)")
+        return kind, dict(
+            points=_points(body.get('series'), 'series'),
+            duration_ms=_duration(mapping, presets.TREND_DURATION_MS),
+            sample_rate=sr, speed=speed,
+            normalize_method=_normalize(mapping, 'minmax'))
+
+    if kind == 'compare':
+        a, b = _object(body, 'a'), _object(body, 'b')
+        return kind, dict(
+            a_points=_points(a, 'a'), b_points=_points(b, 'b'),
+            a_label=str(a.get('label', 'A')), b_label=str(b.get('label', 'B')),
+            duration_ms=_duration(mapping, presets.COMPARE_DURATION_MS) / speed,
+            sample_rate=sr)
+
+    if kind == 'anomalies':
+        return kind, dict(
+            points=_points(body.get('series'), 'series'),
+            flagged=_flagged(body.get('anomalies') or []),
+            duration_ms=_duration(mapping, presets.TREND_DURATION_MS),
+            sample_rate=sr, speed=speed,
+            normalize_method=_normalize(mapping, 'zscore'))
+
+    raise KeyError(kind)
+
+
+def job_key(kind, params):
+    blob = json.dumps([kind, params], sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+
+def render_clip(kind, params, profile=False):
+    """Worker side: render and encode one clip.  Returns (wav, meta);
+    profile adds per-stage timings as meta['stages']."""
+    from sonify import presets
+    from sonify.encode import encode
+    from sonify.profile import Profiler, stage
+
+    t0   = time.perf_counter()
+    prof = Profiler() if profile else None
+    with prof if prof is not None else nullcontext():
+        if kind == 'compare':
+            audio, hint = presets.compare_v1(**params)
+            meta = {'explain_hint': hint}
+        else:
+            audio, events = getattr(presets, 'trend_v1' if kind == 'series'
+                                    else kind)(**params)
+            meta = {'events': events}
+        sr  = params['sample_rate']
+        with stage('encode'):
+            wav = encode(audio, 'wav', sr)
+    meta = {'duration_ms': round(len(audio) / sr * 1000), **meta,
+            'render_ms': round((time.perf_counter() - t0) * 1000, 2)}
+    if prof is not None:
+        meta['stages'] = {path: round(s['total_s'] * 1000, 3)
+                          for path, s in prof.summary().items()}
+    return wav, meta
+
+
+# ── Audio store ─────────────────────────────────────────────────────────
+class AudioStore:
+    """Content-addressed LRU of encoded clips, bounded by total bytes."""
+
+    def __init__(self, max_bytes=STORE_BUDGET):
+        self.max_bytes = max_bytes
+        self._items    = OrderedDict()
+        self._bytes    = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, digest):
+        return digest in self._items
+
+    def put(self, data):
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if digest not in self._items and len(data) <= self.max_bytes:
+            self._items[digest] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+        return digest
+
+    def get(self, digest):
+        data = self._items.get(digest)
+        if data is not None:
+            self._items.move_to_end(digest)
+        return data
+
+    def stats(self):
+        return {'entries': len(self._items), 'bytes': self._bytes,
+                'max_bytes': self.max_bytes, 'evictions': self.evictions}
+
+
+# ── Service ─────────────────────────────────────────────────────────────
+class Busy(Exception):
+    pass
+
+
+class SonifyService:
+    """Routing, dedup and the worker pool; transport-agnostic."""
+
+    def __init__(self, workers=None, max_pending=64, store=None,
+                 executor='process', profile=False):
+        self.workers     = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.store       = store if store is not None else AudioStore()
+        self._kind       = executor
+        self.profile     = profile
+        self._pool       = None
+        self._inflight   = {}            # job key → asyncio.Future
+        self._done       = OrderedDict() # job key → (digest, meta)
+        self.counts      = dict(requests=0, renders=0, shared=0, memo=0,
+                                rejected=0, errors=0)
+
+    def start(self):
+        if self._kind == 'thread':
+            self._pool = ThreadPoolExecutor(self.workers)
+        else:
+            import multiprocessing
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def sonify(self, kind, body):
+        """(response dict, cache status) for one POST body."""
+        kind, params = parse_job(kind, body)
+        key = job_key(kind, params)
+        self.counts['requests'] += 1
+
+        done = self._done.get(key)
+        if done is not None and done[0] in self.store:
+            self._done.move_to_end(key)
+            self.counts['memo'] += 1
+            return self._response(*done), 'hit'
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.counts['shared'] += 1
+            return self._response(*await asyncio.shield(fut)), 'shared'
+
+        if len(self._inflight) >= self.max_pending:
+            self.counts['rejected'] += 1
+            raise Busy()
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            wav, meta = await asyncio.get_running_loop().run_in_executor(
+                self._pool, render_clip, kind, params, self.profile)
+            result = (self.store.put(wav), meta)
+            self.counts['renders'] += 1
+            self._done[key] = result
+            while len(self._done) > 4 * max(len(self.store), 1):
+                self._done.popitem(last=False)
+            fut.set_result(result)
+        except BaseException as e:
+            self.counts['errors'] += 1
+            fut.set_exception(e)
+            fut.exception()          # consumed here if nobody else awaits
+            raise
+        finally:
+            del self._inflight[key]
+        return self._response(*result), 'miss'
+
+    @staticmethod
+    def _response(digest, meta):
+        return {'audio_url': f"{AUDIO_PREFIX}{digest}.wav", 'meta': meta}
+
+    def stats(self):
+        return {**self.counts, 'inflight': len(self._inflight),
+                'workers': self.workers, 'store': self.store.stats()}
+
+
+# ── HTTP/1.1 transport ──────────────────────────────────────────────────
+def _reply(status, body=b'', content_type='application/json', headers=None):
+    status = HTTPStatus(status)
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode()
+    head = [f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Length: {len(body)}"]
+    if body:
+        head.append(f"Content-Type: {content_type}")
+    for k, v in (headers or {}).items():
+        head.append(f"{k}: {v}")
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+
+def _error(status, message):
+    return _reply(status, {'error': message})
+
+
+async def _route(service, method, path, headers, body):
+    path = path.split('?', 1)[0]
+
+    if path.startswith(AUDIO_PREFIX):
+        if method not in ('GET', 'HEAD'):
+            return _error(405, "use GET")
+        digest = path[len(AUDIO_PREFIX):].removesuffix('.wav')
+        data   = service.store.get(digest)
+        if data is None:
+            return _error(404, "unknown or evicted clip")
+        etag = f'"{digest}"'
+        hdrs = {'ETag': etag, 'Cache-Control': 'public, max-age=31536000, immutable'}
+        if etag in headers.get('if-none-match', ''):
+            return _reply(304, headers=hdrs)
+        return _reply(200, b'' if method == 'HEAD' else data, 'audio/wav', hdrs)
+
+    if path == '/api/sonify/stats':
+        return _reply(200, service.stats())
+
+    kind = path.removeprefix('/api/sonify/')
+    if kind not in ('series', 'compare', 'anomalies'):
+        return _error(404, f"no route for {path}")
+    if method != 'POST':
+        return _error(405, "use POST")
+    try:
+        body = json.loads(body or b'null')
+    except ValueError as e:          # JSONDecodeError, UnicodeDecodeError
+        return _error(400, f"invalid JSON: {e}")
+    try:
+        result, status = await service.sonify(kind, body)
+    except BadRequest as e:
+        return _error(400, str(e))
+    except Busy:
+        return _reply(503, {'error': "render queue full"},
+                      headers={'Retry-After': '1'})
+    return _reply(200, result, headers={'X-Sonify-Cache': status})
+
+
+async def _handle(service, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, path, version = line.decode('latin-1').split()
+            except ValueError:
+                writer.write(_error(400, "malformed request line"))
+                break
+            headers = {}
+            while (h := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                k, _, v = h.decode('latin-1').partition(':')
+                headers[k.strip().lower()] = v.strip()
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY:
+                writer.write(_error(413, "request body too large"))
+                break
+            body = await reader.readexactly(length) if length else b''
+            try:
+                writer.write(await _route(service, method, path, headers, body))
+            except Exception as e:
+                log.exception("%s %s failed", method, path)
+                writer.write(_error(500, f"{type(e).__name__}: {e}"))
+            await writer.drain()
+            if (headers.get('connection', '').lower() == 'close'
+                    or version == 'HTTP/1.0'):
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, service=None, ready=None):
+    """Run the service until cancelled.  ready(port) is called once bound."""
+    service = service or SonifyService()
+    service.start()
+    server = await asyncio.start_server(
+        lambda r, w: _handle(service, r, w), host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m sonify.service',
+                                 description="Local sonification HTTP service.")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=DEFAULT_PORT,
+                    help="0 picks a free port")
+    ap.add_argument('--workers', type=int, default=None,
+                    help="render processes (default: all cores)")
+    ap.add_argument('--max-pending', type=int, default=64,
+                    help="distinct renders queued before answering 503")
+    ap.add_argument('--store-mb', type=float, default=STORE_BUDGET / 2 ** 20)
+    ap.add_argument('--threads', action='store_true',
+                    help="render on threads instead of processes")
+    ap.add_argument('--profile', action='store_true',
+                    help="report per-stage render times in meta.stages")
+    args = ap.parse_args(argv)
+
+    service = SonifyService(args.workers, args.max_pending,
+                            AudioStore(int(args.store_mb * 2 ** 20)),
+                            'thread' if args.threads else 'process',
+                            args.profile)
+
+    def ready(port):
+        print(f"Sonify service on http://{args.host}:{port}  "
+              f"[{service.workers} {'threads' if args.threads else 'processes'}]",
+              flush=True)
+
+    # SIGTERM (loadtest --spawn, service managers) unwinds like Ctrl-C, so
+    # the render pool is shut down instead of orphaning its workers.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(serve(args.host, args.port, service, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Block-based streaming renderer.
+
+render_blocks() yields the same stereo audio as build_audio() as a sequence
+of fixed-size (n, 2) blocks, so a 365-day or multi-year hourly series can be
+sonified at any AUDIO_DURATION without allocating the whole buffer.
+
+State carried from one block to the next:
+  * oscillator phase   — cumulative phase offset per voice
+  * filter state       — sosfilt zi per low-pass
+  * reverb tails       — each Convolver's frequency-domain delay line
+
+Peak memory is O(block_size) for audio plus O(n_days) for the input series
+and its interpolating spline.  Per-channel peak normalisation needs the peak
+before the first block can be scaled, so by default a measuring pass renders
+the raw signal once and discards it; pass `gains` to skip that pass.
+"""
+
+import numpy as np
+
+from sonify import dsp, wavetable
+from sonify.pyramid import audible
+from sonify.reverb import Convolver, PartitionedIR, resolve_ir
+
+DEFAULT_BLOCK = 8192
+
+
+# ── Streaming DSP state ─────────────────────────────────────────────────
+class _Lowpass:
+    """dsp.lowpass with its filter state carried across calls."""
+
+    def __init__(self, cutoff_hz, sr):
+        self.sos = dsp.lowpass_sos(cutoff_hz, sr)
+        self.zi  = np.zeros((self.sos.shape[0], 2))
+
+    def process(self, x):
+        from scipy.signal import sosfilt
+        y, self.zi = sosfilt(self.sos, x, zi=self.zi)
+        return y
+
+
+class _Room:
+    """Convolution reverb for one voice; passes through when dry."""
+
+    def __init__(self, ir):
+        if ir is not None and not isinstance(ir, PartitionedIR):
+            ir = PartitionedIR(ir)
+        self._conv = Convolver(ir) if ir is not None else None
+
+    def process(self, x):
+        return self._conv.process(x) if self._conv is not None else x
+
+
+# ── Continuous mode ─────────────────────────────────────────────────────
+class _Curves:
+    """Cubic-interpolated sessions / revenue evaluated one sample range at a
+    time, plus the global ranges build_audio() normalises against."""
+
+    def __init__(self, sessions, revenue, total, block_size, duration):
+        from scipy.interpolate import interp1d
+
+        n = len(sessions)
+        # Same knots as build_audio: LTTB-decimated past the audible rate.
+        s_x, s_y = audible(sessions, duration)
+        r_x, r_y = audible(revenue, duration)
+        self._s = interp1d(s_x, s_y, kind=dsp.interp_kind(len(s_x)),
+                           fill_value='extrapolate')
+        self._r = interp1d(r_x, r_y, kind=dsp.interp_kind(len(r_x)),
+                           fill_value='extrapolate')
+        self.step = (n - 1) / (total - 1) if total > 1 else 0.0
+
+        # Range pass: spline evaluation only, no synthesis.
+        s_lo = rps_lo = np.inf
+        s_hi = rps_hi = -np.inf
+        for a in range(0, total, block_size):
+            s, r = self.eval(a, min(a + block_size, total))
+            rps  = r / (s + 1e-9)
+            s_lo, s_hi     = min(s_lo, s.min()), max(s_hi, s.max())
+            rps_lo, rps_hi = min(rps_lo, rps.min()), max(rps_hi, rps.max())
+        self.s_range   = (s_lo, s_hi)
+        self.rps_range = (rps_lo, rps_hi)
+
+    def eval(self, a, b):
+        t_x = np.arange(a, b) * self.step
+        return (np.clip(self._s(t_x), 1, None),
+                np.clip(self._r(t_x), 0, None))
+
+
+class _ContinuousSource:
+    def __init__(self, sessions, revenue, lag_days, sr, duration, block_size,
+                 ir_L, ir_R, osc_L, osc_R):
+        self.sr     = sr
+        self.osc_L  = osc_L
+        self.osc_R  = osc_R
+        self.total  = int(duration * sr)
+        self.curves = _Curves(sessions, revenue, self.total, block_size,
+                              duration)
+        self.lag    = min(int(lag_days * (duration / len(sessions)) * sr),
+                          self.total)
+
+        self.phase_L = 0.0
+        self.lp_L    = _Lowpass(dsp.LEFT_CUTOFF, sr)
+        self.rv_L    = _Room(ir_L)
+
+        self.phase_R = np.zeros(len(dsp.CHORUS_DETUNE))
+        self.lp_R    = _Lowpass(dsp.RIGHT_CUTOFF, sr)
+        self.rv_R    = _Room(ir_R)
+
+    def _left(self, a, b):
+        s, _   = self.curves.eval(a, b)
+        lo, hi = self.curves.s_range
+        s_logn = dsp.minmax_norm(np.log1p(s), np.log1p(lo), np.log1p(hi))
+        freq   = dsp.log_pitch(s_logn)
+        amp    = (0.25 + 0.55 * dsp.minmax_norm(s, lo, hi)).astype(np.float32)
+
+        t_arr   = np.arange(a, b) / self.sr
+        vibrato = 1.0 + 0.004 * np.sin(2 * np.pi * 5.2 * t_arr)
+        phase   = self.phase_L + np.cumsum(2 * np.pi * freq * vibrato / self.sr)
+        self.phase_L = phase[-1]
+
+        sig = self.osc_L(phase, dsp.MAX_PITCH * 1.004, self.sr) * amp
+        sig = self.lp_L.process(sig)
+        return self.rv_L.process(sig)
+
+    def _echo(self, a, b):
+        s, r   = self.curves.eval(a, b)
+        lo, hi = self.curves.rps_range
+        rps    = r / (s + 1e-9)
+        freq   = dsp.log_pitch(dsp.minmax_norm(np.log1p(rps),
+                                               np.log1p(lo), np.log1p(hi)))
+        amp    = (0.25 + 0.55 * dsp.minmax_norm(rps, lo, hi)).astype(np.float32)
+
+        inc    = 2 * np.pi * freq / self.sr
+        chorus = 0
+        for v, fm in enumerate(dsp.CHORUS_DETUNE):
+            ph = self.phase_R[v] + np.cumsum(inc * fm)
+            self.phase_R[v] = ph[-1]
+            chorus = chorus + self.osc_R(ph, dsp.MAX_PITCH * fm, self.sr)
+        chorus = chorus / np.float32(3.0)
+
+        sig = self.lp_R.process(chorus * amp)
+        return self.rv_R.process(sig)
+
+    def render(self, a, b):
+        out = np.zeros((b - a, 2))
+        out[:, 0] = self._left(a, b)
+        # The echo channel is the echo chain delayed by `lag` samples.
+        ea, eb = max(a - self.lag, 0), b - self.lag
+        if eb > ea:
+            out[b - a - (eb - ea):, 1] = self._echo(ea, eb)
+        return out
+
+
+# ── Per-Day mode ────────────────────────────────────────────────────────
+class _NoteTrack:
+    """One channel of plucked per-day notes.  Each note has its own low-pass
+    (and optionally reverb) state, exactly like the per-note processing in
+    build_audio(); a note that straddles a block boundary resumes where it
+    left off in the next block."""
+
+    def __init__(self, onsets, lengths, dry, cutoff_hz, ir, sr):
+        self.onsets  = onsets
+        self.ends    = onsets + lengths
+        self.dry     = dry          # dry(note_index, local_start, local_end)
+        self.cutoff  = cutoff_hz
+        self.ir      = PartitionedIR(ir) if ir is not None else None
+        self.sr      = sr
+        self._active = {}
+
+    def render(self, a, b):
+        out = np.zeros(b - a)
+        lo = np.searchsorted(self.ends, a, side='right')
+        hi = np.searchsorted(self.onsets, b, side='left')
+        for i in range(lo, hi):
+            on, end = int(self.onsets[i]), int(self.ends[i])
+            if end <= on:
+                continue
+            st = self._active.get(i)
+            if st is None:
+                st = self._active[i] = (_Lowpass(self.cutoff, self.sr),
+                                        _Room(self.ir))
+            u, v = max(a, on), min(b, end)
+            seg  = st[1].process(st[0].process(self.dry(i, u - on, v - on)))
+            out[u - a:v - a] += seg
+            if v == end:
+                del self._active[i]
+        return out
+
+
+def _envelope(u, v, n, decay, sr):
+    """Samples [u, v) of dsp.pluck_envelope(n, decay, sr)."""
+    k   = np.arange(u, v)
+    env = np.exp(-(k / sr) * decay)
+    atk = min(int(0.006 * sr), n)
+    if atk > 0:
+        ramp = k / (atk - 1) if atk > 1 else np.zeros(len(k))
+        env  = np.where(k < atk, ramp, env)
+    return env
+
+
+class _PerDaySource:
+    def __init__(self, sessions, revenue, lag_days, sr, duration, ir_L, ir_R,
+                 osc_L, osc_R):
+        sessions = np.asarray(sessions, dtype=float)
+        n_days   = len(sessions)
+        total    = int(duration * sr)
+        spd      = total / float(n_days)
+
+        s_log  = np.log1p(sessions)
+        s_logn = dsp.minmax_norm(s_log, s_log.min(), s_log.max())
+        s_n    = dsp.minmax_norm(sessions, sessions.min(), sessions.max())
+        rps      = revenue / (sessions + 1e-9)
+        rps_n    = dsp.minmax_norm(rps, rps.min(), rps.max())
+        rps_log  = np.log1p(rps)
+        rps_logn = dsp.minmax_norm(rps_log, rps_log.min(), rps_log.max())
+
+        f_L, a_L = dsp.log_pitch(s_logn), 0.25 + 0.55 * s_n
+        f_R, a_R = dsp.log_pitch(rps_logn), 0.25 + 0.55 * rps_n
+
+        top_L  = dsp.MAX_PITCH
+        top_R  = dsp.MAX_PITCH * max(dsp.CHORUS_DETUNE)
+        onsets = (np.arange(n_days) * spd).astype(np.int64)
+        blens  = np.minimum(onsets + int(spd * 0.72), total) - onsets
+
+        def dry_L(i, u, v):
+            t = np.arange(u, v) / sr
+            return (osc_L(2 * np.pi * f_L[i] * t, top_L, sr) *
+                    np.float32(a_L[i]) *
+                    _envelope(u, v, blens[i], 3.2, sr).astype(np.float32))
+
+        # Echo of day i lands lag_days slots later, same note length.
+        src_R  = np.arange(max(n_days - lag_days, 0))
+        ons_R  = ((src_R + lag_days) * spd).astype(np.int64)
+        lens_R = np.minimum(ons_R + blens[src_R], total) - ons_R
+
+        def dry_R(j, u, v):
+            i = src_R[j]
+            t = np.arange(u, v) / sr
+            chorus = sum(osc_R(2 * np.pi * f_R[i] * fm * t, top_R, sr)
+                         for fm in dsp.CHORUS_DETUNE) / np.float32(3.0)
+            return (chorus * np.float32(a_R[i]) *
+                    _envelope(u, v, lens_R[j], 2.2, sr).astype(np.float32))
+
+        self.left  = _NoteTrack(onsets, blens, dry_L, dsp.LEFT_CUTOFF, ir_L, sr)
+        self.right = _NoteTrack(ons_R, lens_R, dry_R, dsp.RIGHT_CUTOFF, ir_R, sr)
+
+    def render(self, a, b):
+        out = np.zeros((b - a, 2))
+        out[:, 0] = self.left.render(a, b)
+        out[:, 1] = self.right.render(a, b)
+        return out
+
+
+# ── Ticks ───────────────────────────────────────────────────────────────
+def _add_ticks(block, a, total, n_days, click):
+    """Add every day-boundary click that overlaps samples [a, a+len(block))."""
+    b   = a + len(block)
+    spd = total / float(n_days)
+    cd  = len(click)
+    first = max(int((a - cd) / spd) - 1, 0)
+    last  = min(int(b / spd) + 1, n_days - 1)
+    days  = np.arange(first, last + 1)
+    on    = (days * spd).astype(np.int64)
+    on    = on[(on < b) & (on + cd > a)]
+    if len(on) == 0:
+        return
+    idx  = on[:, None] + np.arange(cd)[None, :]
+    keep = (idx >= a) & (idx < min(b, total))
+    wave = np.broadcast_to(click, idx.shape)[keep]
+    hit  = np.bincount(idx[keep] - a, weights=wave, minlength=len(block))
+    block += hit[:, None]
+
+
+# ── Public API ──────────────────────────────────────────────────────────
+def _make_source(sessions, revenue, lag_days, mode, sr, duration, block_size,
+                 rooms, timbres):
+    if lag_days < 0:
+        raise ValueError(f"lag_days must be >= 0 (the echo trails the "
+                         f"traffic), not {lag_days}")
+    sessions, revenue = np.asarray(sessions), np.asarray(revenue)
+    if len(sessions) < 2:
+        raise ValueError(f"need at least 2 buckets, got {len(sessions)}")
+    rooms   = rooms or {}
+    timbres = timbres or {}
+    ir_L  = resolve_ir(rooms.get('traffic'), sr, 'traffic', mode)
+    ir_R  = resolve_ir(rooms.get('echo'), sr, 'echo', mode)
+    osc_L = wavetable.get(timbres.get('traffic', 'organ'))
+    osc_R = wavetable.get(timbres.get('echo', 'bright'))
+    if mode == 'continuous':
+        return _ContinuousSource(sessions, revenue, lag_days, sr, duration,
+                                 block_size, ir_L, ir_R, osc_L, osc_R)
+    return _PerDaySource(sessions, revenue, lag_days, sr, duration, ir_L, ir_R,
+                         osc_L, osc_R)
+
+
+def measure_gains(sessions, revenue, sample_rate, duration, lag_days=1,
+                  mode='continuous', block_size=DEFAULT_BLOCK, rooms=None,
+                  timbres=None):
+    """Per-channel gains that bring each channel's raw peak to
+    dsp.CHANNEL_TARGETS, found by rendering once without keeping the audio."""
+    total = int(duration * sample_rate)
+    src   = _make_source(sessions, revenue, lag_days, mode, sample_rate,
+                         duration, block_size, rooms, timbres)
+    peak  = np.zeros(2)
+    for a in range(0, total, block_size):
+        blk  = src.render(a, min(a + block_size, total))
+        peak = np.maximum(peak, np.max(np.abs(blk), axis=0))
+    return np.array([t / p if p > 0 else 1.0
+                     for t, p in zip(dsp.CHANNEL_TARGETS, peak)])
+
+
+def render_blocks(sessions, revenue, sample_rate, duration, lag_days=1,
+                  mode='continuous', ticks=True, block_size=DEFAULT_BLOCK,
+                  gains=None, rooms=None, timbres=None):
+    """
+    Generator over (n, 2) float64 stereo blocks of the build_audio() mix.
+
+    Every block has block_size frames except possibly the last.  The
+    concatenated output matches build_audio() with the same arguments to
+    within floating-point rounding.  gains: optional per-channel scale from
+    measure_gains(); computed here (one extra render) when omitted.
+    rooms, timbres: per-stem reverb and oscillator, as for build_audio().
+    A negative lag_days or a series of fewer than 2 buckets raises
+    ValueError, as in build_audio().
+    """
+    total  = int(duration * sample_rate)
+    n_days = len(sessions)
+    if gains is None:
+        gains = measure_gains(sessions, revenue, sample_rate, duration,
+                              lag_days, mode, block_size, rooms, timbres)
+    gains = np.asarray(gains, dtype=float)
+    click = dsp.click_wave(sample_rate) if ticks else None
+    src   = _make_source(sessions, revenue, lag_days, mode, sample_rate,
+                         duration, block_size, rooms, timbres)
+
+    for a in range(0, total, block_size):
+        b   = min(a + block_size, total)
+        blk = src.render(a, b)
+        blk *= gains
+        if ticks:
+            _add_ticks(blk, a, total, n_days, click)
+        np.clip(blk, -1.0, 1.0, out=blk)
+        yield blk
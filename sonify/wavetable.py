@@ -0,0 +1,110 @@
+"""
+Wavetable oscillator bank.
+
+Each timbre is a harmonic recipe rendered once into a single-cycle float32
+table.  An oscillator is then one interpolated table lookup per sample,
+driven by the same cumulative-phase arrays the renderers already build,
+instead of one np.sin per harmonic:
+
+    organ    4 sines   →  1 lookup
+    bright   6 sines   →  1 lookup   (×3 chorus voices in Continuous mode)
+
+Tables are band-limited: a timbre keeps a mip level per harmonic count, and a
+lookup that knows its highest fundamental uses the level whose top harmonic
+stays below Nyquist.  Callers pass a fixed bound (dsp.MAX_PITCH × detune)
+rather than the data's maximum, so the full-buffer and streaming renderers
+always pick the same level.
+
+The phase → table index reduction runs in float64 (cumulative phase reaches
+1e5 rad, beyond float32's resolution); interpolation and everything the
+oscillator returns are float32.
+
+Timbres are registered by name; build_audio(timbres=...) and the presets
+below use register()/get().
+"""
+
+import numpy as np
+
+from sonify import dsp
+
+TABLE_SIZE = 4096
+
+_TWO_PI = 2 * np.pi
+
+
+class Wavetable:
+    """Band-limited single-cycle oscillator for one harmonic recipe."""
+
+    def __init__(self, name, harmonics, size=TABLE_SIZE):
+        self.name      = name
+        self.harmonics = tuple(float(a) for a in harmonics)
+        self.size      = size
+        self._levels   = {}
+
+    @property
+    def key(self):
+        """Identity for cache keys — changes if the recipe does."""
+        return (self.name, self.harmonics, self.size)
+
+    def table(self, n_harmonics=None):
+        """float32 table (size + 1 guard sample) with at most n harmonics."""
+        n = min(n_harmonics or len(self.harmonics), len(self.harmonics))
+        tab = self._levels.get(n)
+        if tab is None:
+            ph  = _TWO_PI * np.arange(self.size + 1) / self.size
+            tab = np.zeros(self.size + 1) + dsp.additive(ph, self.harmonics[:n])
+            tab = self._levels[n] = tab.astype(np.float32)
+        return tab
+
+    def __call__(self, phase, max_freq=None, sr=None):
+        """Oscillator output for a phase array (radians), float32."""
+        n = None
+        if max_freq and sr:
+            n = max(1, int((sr / 2) // max_freq))
+        tab  = self.table(n)
+        pos  = np.mod(np.multiply(phase, self.size / _TWO_PI), self.size)
+        # A tiny negative phase rounds up to exactly size under mod: wrap it.
+        pos[pos >= self.size] = 0.0
+        i    = pos.astype(np.int32)
+        frac = (pos - i).astype(np.float32)
+        lo   = tab[i]
+        return lo + frac * (tab[i + 1] - lo)
+
+
+# ── Registry ────────────────────────────────────────────────────────────
+_REGISTRY = {}
+
+
+def register(name, harmonics, size=TABLE_SIZE):
+    """Add (or replace) a named timbre and return its Wavetable."""
+    wt = _REGISTRY[name] = Wavetable(name, harmonics, size)
+    return wt
+
+
+def get(name):
+    """Wavetable for a registered name; Wavetable instances pass through."""
+    if isinstance(name, Wavetable):
+        return name
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"unknown timbre {name!r}; registered: "
+                       f"{', '.join(sorted(_REGISTRY))}") from None
+
+
+def names():
+    return sorted(_REGISTRY)
+
+
+# Band-limited triangle — the waveform of the spec's trend_v1 / compare_v1
+# presets (see testapp sharedMapping.triangleSample).
+TRIANGLE_HARMONICS = tuple(
+    (8 / np.pi ** 2) * (-1) ** ((k - 1) // 2) / k ** 2 if k % 2 else 0.0
+    for k in range(1, 32))
+
+register('organ',      dsp.ORGAN_HARMONICS)
+register('bright',     dsp.BRIGHT_HARMONICS)
+register('sine',       (1.0,))
+register('triangle',   TRIANGLE_HARMONICS)
+register('trend_v1',   TRIANGLE_HARMONICS)
+register('compare_v1', TRIANGLE_HARMONICS)
@@ -13,33 +13,42 @@ AUDIO
   Echo LOUD = converting well.  Echo FAINT = funnel leak.
 
 CONTROLS
-  Sound: Continuous  — smooth gliding theremin-style tone across all 30 days
+  Sound: Continuous  — smooth gliding theremin-style tone across all days
   Sound: Per-Day     — one plucked note per day; the gap between left/right = lag
   Ticks: On/Off      — soft woodblock click every day so you can count the lag
+
+DATA
+  python sonify_dashboard.py                       30-day demo store
+  python sonify_dashboard.py --orders orders.csv [--sessions sessions.csv]
+                             [--bucket hour]       your own exports
 """
 
+import argparse
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.animation import FuncAnimation
-from matplotlib.widgets import Button
-import threading, time, os, subprocess, tempfile
-
-try:
-    from scipy.io import wavfile
-    HAS_SCIPY = True
-except ImportError:
-    HAS_SCIPY = False
-
-try:
-    import sounddevice as sd
-    HAS_SOUNDDEVICE = True
-except ImportError:
-    HAS_SOUNDDEVICE = False
+import time
+
+from sonify.anomaly import collapse, detect as detect_anomalies
+from sonify.cache import StemCache
+from sonify.data import generate_data
+from sonify.ingest import BUCKETS, load_series
+from sonify.lag import describe as describe_lag, detect_lag
+from sonify.parallel import DEFAULT_THREADS
+from sonify.playback import Player
+from sonify.profile import Profiler
+from sonify.pyramid import Pyramid
+from sonify.render import (AUDIO_DURATION, RENDER_RATE, build_audio,
+                           mix_stems, render_echo_stem, render_traffic_stem)
+from sonify.timescale import SPEEDS, speed_variant
+
+# matplotlib and sounddevice are imported where they're used, so importing
+# this module (or anything in sonify) never loads a GUI toolkit or probes
+# audio hardware.  Renderers take sample_rate as a parameter; only the
+# interactive dashboard asks the device.
 
 # Match device sample rate — AirPods use 48000, not 44100
 def _detect_sr():
     try:
+        import sounddevice as sd
         dev = sd.query_devices(sd.default.device[1]
                                if hasattr(sd.default.device, '__len__')
                                else sd.default.device)
@@ -47,298 +56,274 @@ def _detect_sr():
     except Exception:
         return 48000
 
-SAMPLE_RATE = _detect_sr()
+_sample_rate = None
+
+def get_sample_rate():
+    """Output device sample rate, queried on first use and then cached."""
+    global _sample_rate
+    if _sample_rate is None:
+        _sample_rate = _detect_sr()
+    return _sample_rate
+
+
+def __getattr__(name):
+    # SAMPLE_RATE used to be a module constant set at import time.
+    if name == 'SAMPLE_RATE':
+        return get_sample_rate()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ─────────────────────────────────────────────
 # 1. DATA
 # ─────────────────────────────────────────────
-def generate_data(seed=42):
-    np.random.seed(seed)
-    days = np.arange(30)
-
-    weekly  = 1 + 0.3 * np.sin(2 * np.pi * days / 7 + 1.0)
-    trend   = 1 + days * 0.015
-    noise   = np.random.lognormal(0, 0.10, 30)
-    sessions = (1400 * weekly * trend * noise).astype(int)
-
-    sessions[10:13] = (sessions[10:13] * 3.2).astype(int)
-    sessions[18:23] = (sessions[18:23] * 1.9).astype(int)
-    sessions[25]    = int(sessions[25] * 4.5)
-
-    avg_order_value = 87.0
-    conversion_rate = 0.034
-    revenue = np.zeros(30)
-    for day in range(30):
-        revenue[day] = (
-            0.30 * sessions[day] +
-            0.50 * sessions[max(0, day - 1)] +
-            0.20 * sessions[max(0, day - 2)]
-        ) * avg_order_value * conversion_rate
-    revenue += np.random.normal(0, revenue.std() * 0.05, 30)
-    revenue = np.clip(revenue, 0, None)
-
-    return days, sessions, revenue
+# generate_data lives in sonify.data; re-exported here.
 
 
 # ─────────────────────────────────────────────
 # 2. AUDIO
 # ─────────────────────────────────────────────
 
-AUDIO_DURATION = 18.0   # seconds for the full 30-day sweep
-
-
-def _add_day_ticks(audio, total_samples):
-    """Soft woodblock click at every day boundary in both channels.
-    Lets you count ticks between a traffic spike and the echo that follows —
-    that count is the lag in days."""
-    click_dur  = int(0.018 * SAMPLE_RATE)
-    click_t    = np.arange(click_dur) / SAMPLE_RATE
-    click_wave = (np.exp(-click_t * 300.0) *
-                  np.sin(2 * np.pi * 900.0 * click_t)) * 0.13
-    spd = total_samples / 30.0
-    for day_i in range(30):
-        onset = int(day_i * spd)
-        end   = min(onset + click_dur, total_samples)
-        clen  = end - onset
-        audio[onset:end, 0] += click_wave[:clen]
-        audio[onset:end, 1] += click_wave[:clen]
-
-
-def build_audio(sessions, revenue, lag_days=1, mode='continuous', ticks=True):
-    """
-    mode='continuous': smooth gliding theremin-style tone across all 30 days.
-    mode='per-day':    one plucked pad note per day; echo arrives lag_days later.
-
-    LEFT  = traffic (organ pad, pitch = sessions)
-    RIGHT = revenue echo (chorus, muffled, more reverb)
-    ticks=True: woodblock click every day to count lag.
-    """
-    from scipy.interpolate import interp1d
-    from scipy.signal import butter, sosfilt
-
-    total_samples = int(AUDIO_DURATION * SAMPLE_RATE)
-
-    # ── Shared helpers ──────────────────────────────────────────────────
-    def _lp(sig, cutoff_hz):
-        sos = butter(2, min(cutoff_hz / (SAMPLE_RATE / 2), 0.99),
-                     btype='low', output='sos')
-        return sosfilt(sos, sig)
-
-    def _reverb(sig, taps):
-        out = sig.copy()
-        for delay_ms, decay in taps:
-            d = int(SAMPLE_RATE * delay_ms / 1000)
-            if d < len(out):
-                out[d:] += sig[:-d] * decay
-        return out
-
-    def _organ(phase):
-        """Warm organ: heavy on fundamentals, fades toward upper harmonics."""
-        return (1.00 * np.sin(phase) +
-                0.50 * np.sin(2 * phase) +
-                0.25 * np.sin(3 * phase) +
-                0.10 * np.sin(4 * phase))
-
-    def _bright(phase):
-        """Bright string/synth: rising upper harmonics — clearly distinct from organ."""
-        return (1.00 * np.sin(phase) +
-                0.80 * np.sin(2 * phase) +
-                0.60 * np.sin(3 * phase) +
-                0.45 * np.sin(4 * phase) +
-                0.30 * np.sin(5 * phase) +
-                0.18 * np.sin(6 * phase))
-
-    # ── Continuous mode ─────────────────────────────────────────────────
-    if mode == 'continuous':
-        day_x = np.arange(30, dtype=float)
-        t_x   = np.linspace(0, 29, total_samples)
-        t_arr = np.arange(total_samples) / SAMPLE_RATE
-
-        s_smooth = np.clip(
-            interp1d(day_x, sessions.astype(float), kind='cubic',
-                     fill_value='extrapolate')(t_x), 1, None)
-        r_smooth = np.clip(
-            interp1d(day_x, revenue.astype(float), kind='cubic',
-                     fill_value='extrapolate')(t_x), 0, None)
-
-        s_log  = np.log1p(s_smooth)
-        s_logn = (s_log - s_log.min()) / (s_log.max() - s_log.min() + 1e-9)
-        freq   = 80.0 * (2.0 ** (3.0 * s_logn))   # 80–640 Hz, 3 octaves, exponential
-
-        s_n   = (s_smooth - s_smooth.min()) / (s_smooth.max() - s_smooth.min() + 1e-9)
-        amp_L = 0.25 + 0.55 * s_n
-
-        rps   = r_smooth / (s_smooth + 1e-9)
-        rps_n = (rps - rps.min()) / (rps.max() - rps.min() + 1e-9)
-
-        # LEFT: organ pad + gentle vibrato + small room reverb
-        vibrato  = 1.0 + 0.004 * np.sin(2 * np.pi * 5.2 * t_arr)
-        phase_L  = np.cumsum(2 * np.pi * freq * vibrato / SAMPLE_RATE)
-        signal_L = _lp(_organ(phase_L) * amp_L, 1000)
-        signal_L = _reverb(signal_L, [(18, 0.20), (37, 0.12), (58, 0.07)])
-
-        # RIGHT: driven by conversion rate data (its own graph), not traffic.
-        # Pitch and amplitude both follow rps — so the ear tracks the right chart.
-        rps_log  = np.log1p(rps)
-        rps_logn = (rps_log - rps_log.min()) / (rps_log.max() - rps_log.min() + 1e-9)
-        freq_R   = 80.0 * (2.0 ** (3.0 * rps_logn))   # same 3-octave range as left
-        amp_R    = 0.25 + 0.55 * rps_n
-
-        def _pad_c(fm):
-            ph = np.cumsum(2 * np.pi * freq_R * fm / SAMPLE_RATE)
-            return _bright(ph)
-        chorus      = (_pad_c(1.000) + _pad_c(1.015) + _pad_c(0.985)) / 3.0
-        echo_signal = _lp(chorus * amp_R, 2500)
-        echo_signal = _reverb(echo_signal,
-                              [(28, 0.45), (55, 0.32), (90, 0.20), (135, 0.12)])
-
-        lag_samples = int(lag_days * (AUDIO_DURATION / 30) * SAMPLE_RATE)
-        signal_R    = np.zeros(total_samples)
-        signal_R[lag_samples:] = echo_signal[:total_samples - lag_samples]
-
-    # ── Per-Day mode ─────────────────────────────────────────────────────
-    else:
-        s_log  = np.log1p(sessions.astype(float))
-        s_logn = (s_log - s_log.min()) / (s_log.max() - s_log.min() + 1e-9)
-        s_n    = ((sessions.astype(float) - sessions.min()) /
-                  (sessions.max() - sessions.min() + 1e-9))
-        rps      = revenue / (sessions.astype(float) + 1e-9)
-        rps_n    = (rps - rps.min()) / (rps.max() - rps.min() + 1e-9)
-        rps_log  = np.log1p(rps)
-        rps_logn = (rps_log - rps_log.min()) / (rps_log.max() - rps_log.min() + 1e-9)
-
-        signal_L = np.zeros(total_samples)
-        signal_R = np.zeros(total_samples)
-        spd      = total_samples / 30.0   # samples per day
-
-        for day_i in range(30):
-            onset = int(day_i * spd)
-            blen  = int(spd * 0.72)       # 72% of slot = note, 28% = gap
-            end   = min(onset + blen, total_samples)
-            blen  = end - onset
-
-            f_L  = 80.0 * (2.0 ** (3.0 * s_logn[day_i]))   # 80–640 Hz, 3 octaves
-            a_L  = 0.25 + 0.55 * s_n[day_i]
-            t_b  = np.arange(blen) / SAMPLE_RATE
-            atk  = min(int(0.006 * SAMPLE_RATE), blen)
-
-            # Pluck envelope: fast attack, exponential decay
-            env_L = np.exp(-t_b * 3.2)
-            env_L[:atk] = np.linspace(0, 1, atk)
-
-            note_L = _lp(_organ(2 * np.pi * f_L * t_b) * a_L * env_L, 1000)
-            signal_L[onset:end] += note_L
-
-            # Echo lands lag_days slots later
-            echo_day = day_i + lag_days
-            if echo_day < 30:
-                o_R   = int(echo_day * spd)
-                e_R   = min(o_R + blen, total_samples)
-                elen  = e_R - o_R
-                t_e   = np.arange(elen) / SAMPLE_RATE
-                # Driven by conversion rate data — its own pitch and amplitude
-                f_R   = 80.0 * (2.0 ** (3.0 * rps_logn[day_i]))
-                a_R   = 0.25 + 0.55 * rps_n[day_i]
-                atk_e = min(int(0.006 * SAMPLE_RATE), elen)
-
-                env_R = np.exp(-t_e * 2.2)   # slower decay — more bloom
-                env_R[:atk_e] = np.linspace(0, 1, atk_e)
-
-                # _bright timbre + wide chorus — clearly distinct from _organ left
-                def _cho(fm, t=t_e, f=f_R):
-                    return _bright(2 * np.pi * f * fm * t)
-
-                chorus_d = (_cho(1.000) + _cho(1.015) + _cho(0.985)) / 3.0
-                note_R   = _lp(chorus_d * a_R * env_R, 2500)
-                note_R   = _reverb(note_R, [(28, 0.35), (55, 0.20)])
-                signal_R[o_R:e_R] += note_R
-
-    # ── Stereo mix ────────────────────────────────────────────────────────
-    audio = np.zeros((total_samples, 2))
-    audio[:, 0] = signal_L
-    audio[:, 1] = signal_R
-
-    # Normalise channels to different targets: echo (right) louder than traffic (left)
-    for ch, target in enumerate([0.80, 0.80]):
-        mx = np.max(np.abs(audio[:, ch]))
-        if mx > 0:
-            audio[:, ch] *= target / mx
-
-    if ticks:
-        _add_day_ticks(audio, total_samples)
-
-    np.clip(audio, -1.0, 1.0, out=audio)
-    return audio
+# The synthesis core lives in sonify.render and is re-exported here:
+# build_audio, render_traffic_stem, render_echo_stem, mix_stems, AUDIO_DURATION.
 
 
 # ─────────────────────────────────────────────
 # 3. PLAYBACK
 # ─────────────────────────────────────────────
-_t0 = None
-
-def play_async(audio):
-    """Always write a WAV and play via afplay — simplest, most reliable on macOS."""
-    global _t0
-
-    def _run():
-        global _t0
-        try:
-            arr = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
-            tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            wavfile.write(tmp.name, SAMPLE_RATE, arr)
-            tmp.close()
-            print(f"   Audio file: {tmp.name}  ({arr.shape[0]/SAMPLE_RATE:.1f}s)")
-            _t0 = time.time()
-            result = subprocess.run(["afplay", tmp.name], capture_output=True)
-            if result.returncode != 0:
-                print(f"   afplay error: {result.stderr.decode()}")
-            os.unlink(tmp.name)
-        except Exception as e:
-            print(f"   Playback error: {e}")
-            _t0 = time.time()
-
-    threading.Thread(target=_run, daemon=True).start()
+_player = None
+
+def get_player():
+    """Shared Player on the default output device (null device if none)."""
+    global _player
+    if _player is None:
+        _player = Player(get_sample_rate())
+        if _player.backend.name == 'null':
+            print("   No audio output device — playing to the null device.")
+    return _player
+
+
+def play_async(audio, gains=(1.0, 1.0)):
+    """Stream audio to the output device and return immediately.
+    gains mutes or scales channels inside the stream callback."""
+    player = get_player()
+    print(f"   Streaming {len(audio) / player.sample_rate:.1f}s via {player.backend.name}")
+    player.play(audio, gains)
+    return player
 
 
 # ─────────────────────────────────────────────
 # 4. DASHBOARD
 # ─────────────────────────────────────────────
-EVENTS = {10: "Email\ncampaign", 18: "Paid\nsurge", 25: "Black\nFriday"}
-EVENT_COLOR = "#FFD700"
+FRAME_INTERVAL_MS = 16    # cursor frame period while playing (~60 fps)
+
+
+class CursorAnimator:
+    """Moves the playback cursors on a timer that runs only while audio
+    plays.
+
+    blit=True caches the figure (bars, colorbar, annotations, legend) as a
+    background bitmap after every full draw and, per frame, restores it and
+    draws just the cursors — so a frame costs the same at 30 bars or 5,000.
+    blit=False (or a backend without blitting) redraws the whole figure,
+    the old behaviour.  Frame times are kept per playback; report() sums
+    them up and is printed when playback ends."""
+
+    def __init__(self, fig, cursors, position, interval=FRAME_INTERVAL_MS,
+                 blit=True):
+        self.fig      = fig
+        self.cursors  = cursors
+        self.position = position        # () → x per cursor, or None when idle
+        self.blit     = blit and fig.canvas.supports_blit
+        self.draw_ms  = []
+        self.ticks    = []
+        self._bg      = None
+        self._timer   = fig.canvas.new_timer(interval=interval)
+        self._timer.add_callback(self._frame)
+        self.running  = False
+        if self.blit:
+            for c in cursors:
+                c.set_animated(True)
+            fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def start(self):
+        self.draw_ms, self.ticks = [], []
+        if not self.running:
+            self.running = True
+            self._timer.start()
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            self._timer.stop()
+
+    def _on_draw(self, event):
+        # A full draw (resize, button toggle) — re-cache the background,
+        # then put the cursors back on top of it.
+        self._bg = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_cursors()
+
+    def _draw_cursors(self):
+        for c in self.cursors:
+            self.fig.draw_artist(c)
+        self.fig.canvas.blit(self.fig.bbox)
+
+    def _frame(self):
+        xs = self.position()
+        if xs is None:
+            self.stop()
+            if self.draw_ms:
+                print(f"   {self.report()}")
+            return
+        t0 = time.perf_counter()
+        for c, x in zip(self.cursors, xs):
+            c.set_xdata([x, x])
+        if self.blit and self._bg is not None:
+            self.fig.canvas.restore_region(self._bg)
+            self._draw_cursors()
+        else:
+            self.fig.canvas.draw()
+        self.fig.canvas.flush_events()
+        self.draw_ms.append((time.perf_counter() - t0) * 1e3)
+        self.ticks.append(t0)
+
+    def report(self):
+        """'Animation (blit): 412 frames, 0.6 ms mean / 1.1 ms p95 draw, 59 fps'."""
+        if not self.draw_ms:
+            return "Animation: no frames drawn"
+        ms  = np.asarray(self.draw_ms)
+        fps = ((len(self.ticks) - 1) / (self.ticks[-1] - self.ticks[0])
+               if len(self.ticks) > 1 and self.ticks[-1] > self.ticks[0] else 0.0)
+        return (f"Animation ({'blit' if self.blit else 'full redraw'}): "
+                f"{len(ms)} frames, {ms.mean():.1f} ms mean / "
+                f"{np.percentile(ms, 95):.1f} ms p95 draw, {fps:.0f} fps")
+
+
+BAR_PIXELS = 2            # screen pixels per bar before a coarser level is read
+
+
+class LevelBars:
+    """Bar chart of a sonify.pyramid.Pyramid, drawn from the level that
+    fits the axes' pixel width: one bar per bucket while they fit, else one
+    per level bucket at its mean, with a min–max whisker.  Zooming or
+    panning redraws the visible range from the matching level — the raw
+    series is never rescanned.  colors(window) gives each bar's colour."""
+
+    def __init__(self, ax, pyramid, colors, x0=0, width=0.75, **bar_kw):
+        self.ax      = ax
+        self.pyramid = pyramid
+        self.colors  = colors
+        self.x0      = x0
+        self.width   = width
+        self.bar_kw  = bar_kw
+        self.artists = []
+        self.drawn   = None             # (level, lo, hi) currently on screen
+        self.draw(0, len(pyramid))
+        ax.autoscale_view()
+        ax.set_autoscale_on(False)      # redraws must not move the view
+        ax.callbacks.connect('xlim_changed', lambda ax: self.redraw())
+
+    def max_bars(self):
+        return max(1, int(self.ax.get_window_extent().width / BAR_PIXELS))
+
+    def draw(self, lo, hi):
+        """Bars for raw buckets [lo, hi), plus a one-view margin either
+        side so small pans need no redraw."""
+        level = self.pyramid.level_for(self.max_bars(), lo, hi)
+        span  = hi - lo
+        lo, hi = max(0, lo - span), min(len(self.pyramid), hi + span)
+        if self.drawn == (level, lo, hi):
+            return
+        for a in self.artists:
+            a.remove()
+        w = self.pyramid.window(lo, hi, level=level)
+        x = self.x0 + w.x
+        c = self.colors(w)
+        self.artists = [self.ax.bar(x, w.mean, width=self.width * w.width,
+                                    color=c, **self.bar_kw)]
+        if w.step > 1:
+            self.artists.append(self.ax.vlines(x, w.min, w.max, colors=c,
+                                               lw=0.6, alpha=0.6))
+        self.drawn = (level, lo, hi)
+
+    def redraw(self):
+        """Follow the axes' new x-range (xlim_changed)."""
+        x_lo, x_hi = self.ax.get_xlim()
+        lo = max(0, int(np.floor(x_lo - self.x0)))
+        hi = min(len(self.pyramid), int(np.ceil(x_hi - self.x0)) + 1)
+        if hi <= lo:
+            return
+        level = self.pyramid.level_for(self.max_bars(), lo, hi)
+        if self.drawn is not None:
+            d_level, d_lo, d_hi = self.drawn
+            if level == d_level and d_lo <= lo and hi <= d_hi:
+                return
+        self.draw(lo, hi)
+
+
+EVENT_COLORS    = {'spike': "#FFD700", 'dip': "#FF7043"}
+MAX_ANNOTATIONS = 12      # labelled episodes per chart
+
+def build_dashboard(days, sessions, revenue, audio, lag_days, cache=None,
+                    lag_estimate=None, blit=True, anomalies=None):
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Button
 
-def build_dashboard(days, sessions, revenue, audio, lag_days):
     fig, axes = plt.subplots(1, 2, figsize=(14, 6), facecolor="#0d0d0d")
     fig.subplots_adjust(left=0.07, right=0.96, top=0.88, bottom=0.22,
                         wspace=0.38)
 
-    fig.suptitle("Sales Follow Traffic  —  30-Day Lag Sonification",
-                 color="white", fontsize=14, fontweight="bold")
+    title = f"Sales Follow Traffic  —  {len(days)}-Day Lag Sonification"
+    if lag_estimate is not None:
+        title += f"   ·   lag {describe_lag(lag_estimate)}"
+    fig.suptitle(title, color="white", fontsize=14, fontweight="bold")
 
     ax_s, ax_r = axes
 
+    # Spikes and dips in traffic, detected from the data; one annotation
+    # (and one earcon) per episode.
+    if anomalies is None:
+        anomalies = detect_anomalies(sessions)
+    episodes = collapse(anomalies)
+
+    # Labelled arrows for the strongest episodes only; the rest still show
+    # as coloured bars (and sound their earcons).
+    strongest = np.sort(np.argsort(-np.abs(episodes.score),
+                                   kind='stable')[:MAX_ANNOTATIONS])
+
+    def _annotate(ax, values):
+        for d, score, kind in zip(*(a[strongest] for a in episodes)):
+            ax.annotate(f"{kind.title()}\n{score:+.1f}", xy=(days[d], values[d]),
+                        xytext=(days[d], values[d] * 1.06),
+                        color=EVENT_COLORS[kind], fontsize=7, ha="center",
+                        arrowprops=dict(arrowstyle="-", color=EVENT_COLORS[kind],
+                                        lw=0.8))
+
     # ── Traffic chart ─────────────────────────────────────────
-    bar_colors_s = ["#FFD700" if d in EVENTS else "#29B6F6" for d in days]
-    ax_s.bar(days, sessions, color=bar_colors_s, alpha=0.85, width=0.75)
+    # Bars come from a pyramid level that fits the chart's width, so a
+    # year of hourly buckets draws as fast as the 30-day demo.
+    def _traffic_colors(w):
+        cols  = np.full(len(w.x), "#29B6F6", dtype=object)
+        first = int(w.x[0]) // w.step          # level index of the first bar
+        for kind, color in EVENT_COLORS.items():
+            at = anomalies.index[anomalies.kind == kind] // w.step - first
+            cols[at[(at >= 0) & (at < len(cols))]] = color
+        return cols.tolist()
+
+    LevelBars(ax_s, Pyramid(sessions), _traffic_colors, x0=days[0], alpha=0.85)
     _style(ax_s)
     ax_s.set_title("Daily Traffic  (Sessions)", color="white", fontsize=11, pad=8)
     ax_s.set_xlabel("Day", color="#aaa", fontsize=9)
     ax_s.set_ylabel("Sessions", color="#29B6F6", fontsize=9)
     ax_s.tick_params(axis='y', colors="#29B6F6")
 
-    for d, label in EVENTS.items():
-        ax_s.annotate(label, xy=(d, sessions[d]),
-                      xytext=(d, sessions[d] * 1.06),
-                      color=EVENT_COLOR, fontsize=7, ha="center",
-                      arrowprops=dict(arrowstyle="-", color=EVENT_COLOR, lw=0.8))
+    _annotate(ax_s, sessions)
 
     # ── Conversion rate chart ──────────────────────────────────
-    rps      = revenue / (sessions.astype(float) + 1e-9)
-    rps_norm = (rps - rps.min()) / (rps.max() - rps.min() + 1e-9)
-
-    cmap      = plt.cm.RdYlGn
-    bar_cols  = [cmap(float(v)) for v in rps_norm]
-    ax_r.bar(days, rps, color=bar_cols, alpha=0.88, width=0.75)
+    rps  = revenue / (sessions.astype(float) + 1e-9)
+    cmap = plt.cm.RdYlGn
+    LevelBars(ax_r, Pyramid(rps),
+              lambda w: cmap((w.mean - rps.min()) / (rps.max() - rps.min() + 1e-9)),
+              x0=days[0], alpha=0.88)
     _style(ax_r)
     ax_r.set_title(f"Conversion Rate  (revenue ÷ traffic)  =  echo volume",
                    color="white", fontsize=10, pad=8)
@@ -353,11 +338,7 @@ def build_dashboard(days, sessions, revenue, audio, lag_days):
     cb.ax.tick_params(colors="#aaa", labelsize=7)
     cb.set_label("Conversion strength", color="#aaa", fontsize=7)
 
-    for d, label in EVENTS.items():
-        ax_r.annotate(label, xy=(d, rps[d]),
-                      xytext=(d, rps[d] * 1.06),
-                      color=EVENT_COLOR, fontsize=7, ha="center",
-                      arrowprops=dict(arrowstyle="-", color=EVENT_COLOR, lw=0.8))
+    _annotate(ax_r, rps)
 
     # ── Scanning cursors ──────────────────────────────────────
     cursor_s = ax_s.axvline(x=-2, color="white", lw=1.8, alpha=0.9, zorder=10)
@@ -371,20 +352,33 @@ def build_dashboard(days, sessions, revenue, audio, lag_days):
         0.5, 0.5,
         "LEFT = traffic  · organ pad  · pitch rises with sessions     "
         "RIGHT = revenue echo  · chorus + reverb  · arrives lag_days later     "
-        "TICKS (if on) = 1 per day  · count ticks between spike and echo = lag",
+        "TICKS (if on) = 1 per day  · count ticks between spike and echo = lag\n"
+        "CHIME = traffic spike  · THUD = traffic dip",
         color="#cccccc", fontsize=8.5, ha="center", va="center",
         transform=legend_ax.transAxes, fontfamily="monospace"
     )
 
     # ── Mutable audio state ────────────────────────────────────
-    # Rebuilt whenever the user toggles Sound or Ticks options.
-    state = {'mode': 'continuous', 'ticks': True, 'audio': audio}
+    # Rebuilt whenever the user toggles Sound or Ticks options.  Stems come
+    # from the cache, so a toggle only re-synthesises what it hasn't heard.
+    state = {'mode': 'continuous', 'ticks': True, 'audio': audio, 'speed': 1.0}
+    if cache is None:
+        cache = StemCache()
 
     def _rebuild():
         print(f"   Rebuilding audio  [mode={state['mode']}  ticks={state['ticks']}]...")
+        t0   = time.perf_counter()
+        prof = Profiler()
         state['audio'] = build_audio(sessions, revenue, lag_days=lag_days,
-                                     mode=state['mode'], ticks=state['ticks'])
-        print("   Done.")
+                                     mode=state['mode'], ticks=state['ticks'],
+                                     sample_rate=get_sample_rate(), cache=cache,
+                                     profiler=prof, render_rate=RENDER_RATE,
+                                     anomalies=episodes, threads=DEFAULT_THREADS)
+        st = cache.stats()
+        print(f"   Done in {time.perf_counter() - t0:.2f}s  "
+              f"[cache: {st['hits']} hits / {st['misses']} misses, "
+              f"{st['bytes'] / 1e6:.0f} MB]")
+        print(f"   {prof.compact()}")
 
     # ── Five buttons across the bottom (equal width, 0.01 gap) ───────────
     # [Sound: Continuous] [▶ Traffic] [▶ Both] [▶ Revenue] [Ticks: On]
@@ -445,55 +439,59 @@ def build_dashboard(days, sessions, revenue, audio, lag_days):
     btn_tck.on_clicked(on_ticks)
 
     # ── Play callbacks ────────────────────────────────────────
-    playing = [False]
-
-    def _start(audio_to_play, label):
-        global _t0
-        _t0 = None
+    # Channel muting happens in the stream callback — no copy of the audio.
+    def _start(gains, label):
         cursor_s.set_xdata([-2, -2])
         cursor_r.set_xdata([-2, -2])
-        playing[0] = True
-        print(f"\n▶  {label}")
-        play_async(audio_to_play)
+        speed = state['speed']
+        print(f"\n▶  {label}" + (f"  at {speed:g}×" if speed != 1.0 else ""))
+        # Speed variants are stretched from the current render (and cached),
+        # not re-synthesised.
+        play_async(speed_variant(state['audio'], speed, get_sample_rate(), cache),
+                   gains)
+        anim.start()
 
     def on_play_left(event):
-        a = state['audio'].copy()
-        a[:, 1] = 0.0
-        _start(a, "Traffic only  (left ear)")
+        _start((1.0, 0.0), "Traffic only  (left ear)")
 
     def on_play_both(event):
-        _start(state['audio'], "Both channels")
+        _start((1.0, 1.0), "Both channels")
 
     def on_play_right(event):
-        a = state['audio'].copy()
-        a[:, 0] = 0.0
-        _start(a, "Revenue only  (right ear)")
+        _start((0.0, 1.0), "Revenue only  (right ear)")
 
     btn_left.on_clicked(on_play_left)
     btn_both.on_clicked(on_play_both)
     btn_right.on_clicked(on_play_right)
 
+    # ── Playback speed: '-' / '+' step through SPEEDS ─────────────
+    def on_key(event):
+        step = {'-': -1, '+': 1, '=': 1}.get(event.key)
+        if step is None:
+            return
+        i = SPEEDS.index(state['speed']) + step
+        state['speed'] = SPEEDS[max(0, min(i, len(SPEEDS) - 1))]
+        print(f"   Speed {state['speed']:g}×  (pitch kept)")
+
+    fig.canvas.mpl_connect('key_press_event', on_key)
+
     # keep a ref so btn isn't shadowed below
     btn = btn_both
 
-    # ── Animation — cursors glide smoothly with the audio ─────
-    def animate(frame):
-        global _t0
-        if _t0 is None or not playing[0]:
-            return cursor_s, cursor_r
-        elapsed  = time.time() - _t0
-        day      = elapsed / AUDIO_DURATION * 29
-        day      = max(0, min(day, 29))
+    # ── Animation — cursors follow the stream's own sample clock ─────
+    def cursor_days():
+        if _player is None or not _player.active:
+            return None
+        last     = len(days) - 1
+        day      = _player.progress * last
+        day      = max(0, min(day, last))
         rev_day  = max(0, day - lag_days)
-        cursor_s.set_xdata([day, day])
-        cursor_r.set_xdata([rev_day, rev_day])
-        return cursor_s, cursor_r
+        return day, rev_day
 
-    ani = FuncAnimation(fig, animate, interval=40,
-                        blit=False, cache_frame_data=False)
+    anim = CursorAnimator(fig, (cursor_s, cursor_r), cursor_days, blit=blit)
 
     # Return all button refs to prevent garbage collection
-    return fig, ani, btn, btn_mode, btn_left, btn_right, btn_tck
+    return fig, anim, btn, btn_mode, btn_left, btn_right, btn_tck
 
 
 def _style(ax):
@@ -506,33 +504,52 @@ def _style(ax):
 # ─────────────────────────────────────────────
 # 5. MAIN
 # ─────────────────────────────────────────────
-def main():
-    print(f"\nSample rate: {SAMPLE_RATE} Hz")
-    print("Generating data and audio...")
-
-    days, sessions, revenue = generate_data()
-
-    s = (sessions - sessions.mean()) / sessions.std()
-    r = (revenue  - revenue.mean())  / revenue.std()
-    best_lag, best_corr = 1, -1
-    for lag in range(0, 4):
-        if lag == 0:
-            c = float(np.mean(s * r))
-        else:
-            c = float(np.mean(s[:-lag] * r[lag:]))
-        if c > best_corr:
-            best_corr, best_lag = c, lag
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sales Follow Traffic — "
+                                             "sonification dashboard")
+    ap.add_argument('--orders', help="orders export (.csv, .parquet, .npy) "
+                                     "to play instead of the demo data")
+    ap.add_argument('--sessions', help="sessions export; without it traffic "
+                                       "is the order count")
+    ap.add_argument('--bucket', choices=sorted(BUCKETS), default='day')
+    args = ap.parse_args(argv)
+
+    print(f"\nSample rate: {get_sample_rate()} Hz")
+    if args.orders:
+        print(f"Loading {args.orders} by {args.bucket}...")
+        days, sessions, revenue = load_series(args.orders, args.sessions,
+                                              args.bucket)
+    else:
+        print("Generating data and audio...")
+        days, sessions, revenue = generate_data()
+
+    # Search up to a tenth of the series (3 days for the 30-day demo) and
+    # test the best lag against shuffled revenue.
+    lag_est  = detect_lag(sessions, revenue, max_lag=max(3, len(days) // 10),
+                          n_perm=1000)
+    best_lag = lag_est.lag
+
+    print(f"Detected lag: {describe_lag(lag_est)}")
 
-    print(f"Detected lag: {best_lag} day(s)  (correlation = {best_corr:.3f})")
+    anomalies = detect_anomalies(sessions)
+    print(f"Anomalies: {len(collapse(anomalies).index)} episode(s) "
+          f"over {len(anomalies.index)} day(s)")
 
+    cache = StemCache()
     audio = build_audio(sessions, revenue, lag_days=best_lag,
-                        mode='continuous', ticks=True)
-    fig, ani, btn, btn_mode, btn_left, btn_right, btn_tck = build_dashboard(
-        days, sessions, revenue, audio, lag_days=best_lag)
+                        mode='continuous', ticks=True,
+                        sample_rate=get_sample_rate(), cache=cache,
+                        render_rate=RENDER_RATE, anomalies=collapse(anomalies),
+                        threads=DEFAULT_THREADS)
+    fig, anim, btn, btn_mode, btn_left, btn_right, btn_tck = build_dashboard(
+        days, sessions, revenue, audio, lag_days=best_lag, cache=cache,
+        lag_estimate=lag_est, anomalies=anomalies)
 
     print("\nClick  ▶ Play  in the window.")
     print("Toggle  Sound: Continuous / Per-Day  and  Ticks: On / Off")
+    print("Press  - / +  to play slower or faster (0.5× – 2×, same pitch)")
     print("Use headphones for the clearest stereo separation.\n")
+    import matplotlib.pyplot as plt
     plt.show()
 
 
@@ -0,0 +1,9 @@
+import pytest
+
+from sonify.data import demo_series
+
+
+@pytest.fixture
+def make_series():
+    """demo_series(n, seed=0): demo-shaped (sessions, revenue) of length n."""
+    return demo_series
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from sonify.anomaly import (EARCON_GAIN, THRESHOLDS, Anomalies, collapse,
+                            detect, earcon_track)
+
+SR = 8000
+
+
+def _peak(anoms, n_buckets=10, **kw):
+    return np.abs(earcon_track(anoms, n_buckets, SR, SR, **kw)).max()
+
+
+@pytest.fixture
+def flat_with_spike():
+    x = 100 + np.random.default_rng(0).normal(0, 1, 60)
+    x[40] += 5
+    return x
+
+
+@pytest.mark.parametrize('method', ['zscore', 'mad'])
+def test_detect_records_threshold(flat_with_spike, method):
+    anoms = detect(flat_with_spike, method=method)
+    assert anoms.threshold == THRESHOLDS[method]
+    assert 40 in anoms.index
+    assert collapse(anoms).threshold == THRESHOLDS[method]
+    assert detect(flat_with_spike, threshold=2.0).threshold == 2.0
+
+
+def test_lone_event_scales_against_detection_threshold():
+    # One event just over the threshold: base gain, not the 2× ceiling that
+    # scaling against the weakest flagged score gave.
+    t    = THRESHOLDS['mad']
+    base = _peak(Anomalies(np.array([2]), np.array([1.0]), np.array(['spike'])),
+                 threshold=1.0)
+    assert base == pytest.approx(EARCON_GAIN)
+    lone = Anomalies(np.array([2]), np.array([1.1 * t]), np.array(['spike']), t)
+    assert _peak(lone) == pytest.approx(1.1 * base)
+    loud = lone._replace(score=np.array([3 * t]))
+    assert _peak(loud) == pytest.approx(2 * base)
+
+
+def test_threshold_argument_overrides():
+    anoms = Anomalies(np.array([2]), np.array([-4.0]), np.array(['dip']), 3.5)
+    assert _peak(anoms, threshold=2.0) == pytest.approx(
+        _peak(anoms._replace(threshold=2.0)))
+    assert _peak(anoms._replace(threshold=None)) == pytest.approx(
+        _peak(anoms))                        # THRESHOLDS['mad'] by default
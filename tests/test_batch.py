@@ -0,0 +1,70 @@
+import json
+import wave
+
+import numpy as np
+import pytest
+
+from sonify import batch
+
+SR, SECONDS = 8000, 1.0
+
+
+def _manifest(tmp_path, jobs):
+    path = tmp_path / 'jobs.jsonl'
+    path.write_text('\n'.join(json.dumps(j) for j in jobs) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def jobs(tmp_path, make_series):
+    sessions, revenue = make_series(60)
+    np.save(tmp_path / 'sessions.npy', sessions)
+    base = dict(sample_rate=SR, duration=SECONDS)
+    return [dict(id='synthetic', sessions={'synthetic': 1},
+                 revenue={'synthetic': 1}, **base),
+            dict(id='npy', sessions='sessions.npy', revenue=revenue.tolist(),
+                 lag_days='auto', mode='per-day', **base),
+            dict(id='stream', sessions={'synthetic': 2},
+                 revenue={'synthetic': 2}, stream=True, ticks=False, **base),
+            dict(id='broken', sessions=[5], revenue=[1.0], **base)]
+
+
+def test_run_on_two_workers(tmp_path, jobs):
+    out    = tmp_path / 'out'
+    report = batch.run(batch.load_manifest(_manifest(tmp_path, jobs)),
+                       str(out), workers=2)
+    rows   = report['jobs']
+    assert [r['id'] for r in rows] == [j['id'] for j in jobs]
+    assert report['summary']['jobs'] == 4 and report['summary']['failed'] == 1
+
+    for row in rows[:3]:
+        assert row['status'] == 'ok'
+        assert {'render_s', 'write_s', 'total_s', 'bytes'} <= set(row)
+        with wave.open(row['path']) as w:
+            assert w.getframerate() == SR
+            assert w.getnframes() == row['samples'] == int(SR * SECONDS)
+    assert 0 <= rows[1]['lag_days'] <= 6
+    assert rows[3]['status'] == 'error'
+    assert 'at least 2 buckets' in rows[3]['error']
+    assert sorted(p.name for p in out.iterdir()) == \
+        ['npy.wav', 'stream.wav', 'synthetic.wav']
+
+
+def test_serial_run_matches_pool(tmp_path, jobs):
+    manifest = _manifest(tmp_path, jobs[:2])
+    batch.run(batch.load_manifest(manifest), str(tmp_path / 'a'), workers=1)
+    batch.run(batch.load_manifest(manifest), str(tmp_path / 'b'), workers=2)
+    for job in jobs[:2]:
+        name = f"{job['id']}.wav"
+        assert (tmp_path / 'a' / name).read_bytes() == \
+            (tmp_path / 'b' / name).read_bytes()
+
+
+def test_duplicate_ids_rejected(tmp_path, jobs):
+    jobs[1]['id'] = jobs[0]['id']
+    with pytest.raises(ValueError, match='duplicate job id'):
+        batch.load_manifest(_manifest(tmp_path, jobs))
+    with pytest.raises(ValueError, match='duplicate job id'):
+        batch.run(jobs, str(tmp_path / 'out'), workers=1)
+    assert batch.main([_manifest(tmp_path, jobs),
+                       '--out', str(tmp_path / 'out')]) == 2
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from sonify import bench
+
+TINY = dict(lengths=(30,), rates=(8000,), durations=(0.5,))
+KEYS = {'kind', 'params', 'best_s', 'mean_s', 'repeat', 'peak_mb', 'rss_mb'}
+
+
+@pytest.fixture(scope='module')
+def report():
+    return bench.run(bench.cases(**TINY), repeat=1, isolate=False)
+
+
+def test_every_case_runs(report):
+    ids = [cid for cid, _, _ in bench.cases(**TINY)]
+    assert list(report['results']) == ids
+    assert {cid.split('/')[0] for cid in ids} == \
+        {'build_audio', 'ticks', 'rebuild', 'multitrack'}
+    for res in report['results'].values():
+        assert set(res) == KEYS, res.get('error')
+        assert res['best_s'] > 0 and res['peak_mb'] >= 0
+    assert {'python', 'numpy', 'cpus', 'git', 'date'} <= set(report['meta'])
+    json.dumps(report)
+
+
+def test_compare_flags_slowdowns(report):
+    rows = bench.compare(report, report)
+    assert len(rows) == len(report['results'])
+    assert not any(r['regressed'] for r in rows)
+
+    slow = json.loads(json.dumps(report))
+    cid  = next(iter(slow['results']))
+    slow['results'][cid]['best_s'] += 1.0
+    flagged = [r['id'] for r in bench.compare(report, slow) if r['regressed']]
+    assert flagged == [cid]
+
+
+def test_cli_round_trip(tmp_path):
+    out = tmp_path / 'base.json'
+    assert bench.main(['run', '--lengths', '30', '--rates', '8000',
+                       '--durations', '0.5', '--only', 'ticks/',
+                       '--repeat', '1', '--out', str(out)]) == 0
+    base = json.loads(out.read_text())
+    assert len(base['results']) == 1
+    assert 'error' not in next(iter(base['results'].values()))
+    assert bench.main(['compare', str(out), str(out)]) == 0
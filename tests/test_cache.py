@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from sonify.cache import StemCache, stem_key
+from sonify.render import build_audio
+
+
+def _arr(n_bytes, fill=0.0):
+    return np.full(n_bytes // 8, fill)
+
+
+def test_hit_and_miss():
+    cache, calls = StemCache(), []
+    render = lambda: calls.append(1) or _arr(800)
+    a = cache.get_or_render('k', render)
+    b = cache.get_or_render('k', render)
+    assert a is b and len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not a.flags.writeable
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = StemCache(max_bytes=3000)
+    for k in 'abc':
+        cache.put(k, _arr(1000))
+    cache.get('a')                        # b is now the oldest
+    cache.put('d', _arr(1000))
+    assert 'b' not in cache and all(k in cache for k in 'acd')
+    assert cache.stats()['bytes'] <= cache.max_bytes
+    assert cache.evictions == 1
+
+
+def test_oversized_stem_is_not_cached():
+    cache = StemCache(max_bytes=1000)
+    cache.put('a', _arr(800))
+    big = cache.put('big', _arr(8000))
+    assert len(big) == 1000 and 'big' not in cache and 'a' in cache
+
+
+def test_stem_key_tracks_contents():
+    x = np.arange(5.0)
+    assert stem_key('echo', x, 2) == stem_key('echo', x.copy(), 2)
+    assert stem_key('echo', x, 2) != stem_key('echo', x, 3)
+    assert stem_key('echo', x, 2) != stem_key('echo', x + 1, 2)
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_cached_render_is_identical(mode, make_series):
+    sessions, revenue = make_series(60)
+    kw    = dict(mode=mode, sample_rate=8000, duration=2.0)
+    cache = StemCache()
+    ref   = build_audio(sessions, revenue, **kw)
+    np.testing.assert_array_equal(build_audio(sessions, revenue, cache=cache, **kw), ref)
+    misses = cache.misses
+    np.testing.assert_array_equal(build_audio(sessions, revenue, cache=cache, **kw), ref)
+    assert cache.misses == misses and cache.hits >= 3
+    # Only the echo depends on the lag.
+    build_audio(sessions, revenue, lag_days=3, cache=cache, **kw)
+    assert cache.misses == misses + 1
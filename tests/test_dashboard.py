@@ -0,0 +1,78 @@
+import pytest
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+
+from matplotlib.figure import Figure                        # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+from sonify_dashboard import CursorAnimator                 # noqa: E402
+
+
+def _figure():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    axes    = fig.subplots(2)
+    bars    = [ax.bar(range(30), range(30)) for ax in axes]
+    cursors = [ax.axvline(0) for ax in axes]
+    return fig, bars, cursors
+
+
+def _spy(monkeypatch, obj, name, calls):
+    real = getattr(obj, name)
+
+    def spy(*args, **kwargs):
+        calls.append(name)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(obj, name, spy)
+
+
+def test_timer_stops_when_idle(monkeypatch):
+    fig, _, cursors = _figure()
+    xs   = [[3, 3], None]
+    anim = CursorAnimator(fig, cursors, lambda: xs.pop(0))
+    calls = []
+    _spy(monkeypatch, anim._timer, 'start', calls)
+    _spy(monkeypatch, anim._timer, 'stop', calls)
+    anim.start()
+    anim.start()                        # already running: one timer only
+    anim._frame()
+    assert anim.running and len(anim.draw_ms) == 1
+    anim._frame()                       # position() → None: idle
+    assert not anim.running
+    assert calls == ['start', 'stop']
+    anim.stop()
+    assert calls == ['start', 'stop']
+
+
+def test_blit_frame_redraws_only_the_cursors(monkeypatch):
+    fig, bars, cursors = _figure()
+    anim = CursorAnimator(fig, cursors, lambda: [7, 7])
+    assert anim.blit and all(c.get_animated() for c in cursors)
+    fig.canvas.draw()                   # full draw caches the background
+    assert anim._bg is not None
+
+    drawn, calls = [], []
+    monkeypatch.setattr(fig, 'draw_artist', drawn.append)
+    for name in ('draw', 'restore_region', 'blit'):
+        _spy(monkeypatch, fig.canvas, name, calls)
+    bar_draws = []
+    for rect in bars[0]:
+        monkeypatch.setattr(rect, 'draw', lambda r: bar_draws.append(r))
+
+    anim._frame()
+    assert drawn == cursors
+    assert calls == ['restore_region', 'blit']
+    assert bar_draws == []
+    assert [c.get_xdata()[0] for c in cursors] == [7, 7]
+
+
+def test_no_blit_falls_back_to_full_redraw(monkeypatch):
+    fig, _, cursors = _figure()
+    anim  = CursorAnimator(fig, cursors, lambda: [1, 1], blit=False)
+    calls = []
+    _spy(monkeypatch, fig.canvas, 'draw', calls)
+    _spy(monkeypatch, fig.canvas, 'restore_region', calls)
+    anim._frame()
+    assert calls == ['draw']
+    assert 'full redraw' in anim.report()
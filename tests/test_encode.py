@@ -0,0 +1,67 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from sonify import encode
+
+SR = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).uniform(-1, 1, (10001, 2))
+
+
+def _pcm(audio):
+    return np.clip(np.rint(audio * 32767), -32767, 32767).astype(np.int16)
+
+
+@pytest.mark.parametrize('seekable', [True, False])
+def test_wav_round_trip(audio, seekable):
+    buf = io.BytesIO()
+    if not seekable:
+        buf.seekable = lambda: False
+    n = encode.write('wav', buf, encode.iter_blocks(audio, 4096), SR,
+                     frames=None if seekable else len(audio))
+    assert n == len(audio)
+    with wave.open(io.BytesIO(buf.getvalue())) as w:
+        assert (w.getframerate(), w.getnchannels(), w.getsampwidth()) == (SR, 2, 2)
+        assert w.getnframes() == len(audio)
+        got = np.frombuffer(w.readframes(n), '<i2').reshape(-1, 2)
+    np.testing.assert_array_equal(got, _pcm(audio))
+
+
+def test_mono_encode_matches_blockwise(audio):
+    mono = audio[:, 0]
+    data = encode.encode(mono, sample_rate=SR, block=1000)
+    with wave.open(io.BytesIO(data)) as w:
+        assert w.getnchannels() == 1
+        got = np.frombuffer(w.readframes(w.getnframes()), '<i2')
+    np.testing.assert_array_equal(got, _pcm(mono))
+
+
+def test_dither_stays_within_one_lsb(audio):
+    a = encode.PCM16('tpdf', seed=1)(audio).astype(int)
+    assert np.abs(a - _pcm(audio)).max() <= 1
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        encode.write('mp3', io.BytesIO(), [], SR)
+
+
+@pytest.mark.parametrize('fmt', ['flac', 'ogg'])
+def test_soundfile_round_trip(audio, fmt, tmp_path):
+    sf = pytest.importorskip('soundfile')
+    try:
+        encode.check(fmt, SR)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+    path = tmp_path / f'out.{fmt}'
+    encode.write(fmt, str(path), encode.iter_blocks(audio, 4096), SR)
+    got, sr = sf.read(str(path), dtype='int16')
+    assert sr == SR and got.shape == audio.shape
+    if fmt == 'flac':                                  # lossless
+        np.testing.assert_array_equal(got, _pcm(audio))
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+from sonify import importcheck
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_core_within_budget():
+    out = subprocess.run([sys.executable, '-m', 'sonify.importcheck'],
+                         cwd=ROOT, capture_output=True, text=True)
+    assert out.returncode == 0, out.stdout + out.stderr
+
+
+def test_forbidden_import_fails():
+    (res,) = importcheck.check(['scipy.signal'], budget_ms=1e9, repeat=1)
+    assert not res['ok'] and res['forbidden'] == ['scipy']
@@ -0,0 +1,128 @@
+import csv
+
+import numpy as np
+import pytest
+
+from sonify import ingest
+
+
+def _reference(path, bucket='day'):
+    """Per-bucket (count, total) via the csv module, one row at a time."""
+    width, out = ingest.BUCKETS[bucket], {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            ts = row['created_at'][:19].replace(' ', 'T')
+            if not ts:
+                continue
+            b = int(np.datetime64(ts, 's').astype(np.int64)) // width
+            c, t = out.get(b, (0, 0.0))
+            out[b] = (c + 1, t + float(row['total_price'] or 0))
+    lo, hi = min(out), max(out)
+    count, total = np.zeros(hi - lo + 1), np.zeros(hi - lo + 1)
+    for b, (c, t) in out.items():
+        count[b - lo], total[b - lo] = c, t
+    return count, total
+
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text(
+        'id,created_at,total_price,note\n'
+        '1,2024-05-30 21:38:53 -0400,10.50,plain\n'
+        '2,2024-05-31T01:00:00Z,3,"two\nlines, and a comma"\n'
+        '3,2024-05-31 23:59:59 -0400,,"""quoted"""\n'
+        '4,2024-06-01 08:00:00 -0400,7.25,"a\nb\nc"\n'
+        '5,2024-06-02 00:00:00 -0400,-1.25,last\n')
+    return path
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 3, 1 << 18])
+@pytest.mark.parametrize('row_bytes', [4, 16, ingest.CSV_ROW_BYTES])
+def test_quoted_multiline_fields_across_blocks(quoted_csv, monkeypatch,
+                                               chunk_rows, row_bytes):
+    # Tiny blocks put block boundaries inside the quoted records.
+    monkeypatch.setattr(ingest, 'CSV_ROW_BYTES', row_bytes)
+    t = ingest.aggregate(quoted_csv, 'created_at', 'total_price',
+                         chunk_rows=chunk_rows)
+    count, total = _reference(quoted_csv)
+    assert t.rows == 5
+    np.testing.assert_array_equal(t.count, count)
+    np.testing.assert_allclose(t.total, total)
+
+
+@pytest.mark.parametrize('bucket', ['day', 'hour'])
+def test_demo_orders_match_reference(tmp_path, bucket):
+    path = tmp_path / 'demo.csv'
+    ingest.write_demo_orders(path, 3000, days=5)
+    t = ingest.aggregate(path, 'created_at', 'total_price', bucket=bucket,
+                         chunk_rows=97)
+    count, total = _reference(path, bucket)
+    np.testing.assert_array_equal(t.count, count)
+    np.testing.assert_allclose(t.total, total)
+
+
+def test_decimals_match_float():
+    a = np.array([b'43.59', b'-1.5', b'0', b'12', b'.25', b'3.', b'1e3'])
+    np.testing.assert_array_equal(ingest.to_values(a[:-1]),
+                                  [43.59, -1.5, 0.0, 12.0, 0.25, 3.0])
+    assert ingest.to_values(a)[-1] == 1000.0          # falls back to float()
+
+
+def test_decimals_past_2_53_fall_back():
+    # Mantissas past 2**53 have no exact double: rounding one before the
+    # division and the quotient after can miss float()'s answer.
+    a = np.array([b'7.3785690282684228', b'7931475343646273.2', b'0.1'])
+    out = ingest.to_values(a)
+    assert out.tolist() == [float(x) for x in a]
+
+
+def test_fully_quoted_csv_takes_the_fast_path(tmp_path, monkeypatch):
+    path = tmp_path / 'orders.csv'
+    path.write_text(
+        '"id","created_at","total_price"\r\n'
+        '"1","2024-05-30 21:38:53 -0400","10.50"\r\n'
+        '"2","2024-05-31T01:00:00Z",""\r\n'
+        '3,"2024-05-31 23:59:59 -0400",7.25\r\n')
+    split, fast = ingest._split_fields, []
+    monkeypatch.setattr(ingest, '_split_fields',
+                        lambda *a: fast.append(split(*a)) or fast[-1])
+    t = ingest.aggregate(path, 'created_at', 'total_price')
+    assert fast and all(cols is not None for cols in fast)
+    count, total = _reference(path)
+    assert t.rows == 3
+    np.testing.assert_array_equal(t.count, count)
+    np.testing.assert_allclose(t.total, total)
+
+
+@pytest.mark.parametrize('block', [
+    b'1,"a,b",3\n', b'1,"a\nb",3\n', b'1,"say ""hi""",3\n', b'1,x"y",3\n'])
+def test_unquote_leaves_embedded_separators_to_csv(block):
+    assert ingest._unquote(block) is None
+
+
+def test_npy_table_matches_csv(tmp_path):
+    path = tmp_path / 'demo.csv'
+    ingest.write_demo_orders(path, 2000, days=3)
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    table = np.zeros(len(rows), dtype=[('created_at', 'M8[s]'),
+                                       ('total_price', 'f8')])
+    table['created_at']  = [r['created_at'].replace(' ', 'T') for r in rows]
+    table['total_price'] = [float(r['total_price']) for r in rows]
+    np.save(tmp_path / 'orders.npy', table)
+
+    a = ingest.aggregate(path, 'created_at', 'total_price')
+    b = ingest.aggregate(tmp_path / 'orders.npy', 'created_at', 'total_price',
+                         chunk_rows=333)
+    assert a.start == b.start
+    np.testing.assert_array_equal(a.count, b.count)
+    np.testing.assert_allclose(a.total, b.total)
+
+
+def test_load_series_without_sessions_counts_orders(tmp_path):
+    path = tmp_path / 'demo.csv'
+    ingest.write_demo_orders(path, 1000, days=4)
+    days, sessions, revenue = ingest.load_series(path)
+    assert len(days) == len(sessions) == len(revenue) == 4
+    assert sessions.sum() == 1000
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from sonify.lag import detect_lag
+from sonify.live import LiveRenderer
+from sonify.render import build_audio
+from sonify.stream import render_blocks
+
+
+def test_negative_lag_is_reported():
+    a = np.random.default_rng(1).normal(size=200)
+    assert detect_lag(a, np.roll(a, -4), max_lag=10, min_lag=-10).lag == -4
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_negative_lag_days_rejected(mode, make_series):
+    sessions, revenue = make_series(120)
+    with pytest.raises(ValueError, match='lag_days'):
+        build_audio(sessions, revenue, lag_days=-1, mode=mode,
+                    sample_rate=8000, duration=1.0)
+    with pytest.raises(ValueError, match='lag_days'):
+        next(render_blocks(sessions, revenue, 8000, 1.0, lag_days=-1,
+                           mode=mode))
+    with pytest.raises(ValueError, match='lag_days'):
+        LiveRenderer(mode=mode, sample_rate=8000, lag_days=-1)
+
+
+@pytest.mark.parametrize('shift', [0, 3, 11])
+def test_recovers_known_shift(shift):
+    rng = np.random.default_rng(shift)
+    a   = np.convolve(rng.normal(size=400), np.ones(5) / 5, mode='same')
+    b   = np.roll(a, shift) + rng.normal(0, 0.1, len(a))
+    est = detect_lag(a, b, max_lag=20, n_perm=99, method='phase')
+    assert est.lag == shift
+    assert est.corr > 0.8 and est.p_value <= 0.05
+
+
+def test_batched_pairs_match_single():
+    rng   = np.random.default_rng(7)
+    a     = rng.normal(size=(3, 200))
+    b     = np.stack([np.roll(x, k) for x, k in zip(a, (1, 4, 9))])
+    batch = detect_lag(a, b, max_lag=12)
+    assert list(batch.lag) == [1, 4, 9]
+    for i in range(3):
+        single = detect_lag(a[i], b[i], max_lag=12)
+        assert single.lag == batch.lag[i]
+        assert single.corr == pytest.approx(batch.corr[i])
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from sonify.live import LiveRenderer
+from sonify.render import build_audio
+from sonify.stream import measure_gains
+
+SR, SPB = 8000, 400         # samples per bucket: a whole number, as build_audio's
+
+
+def _fixed(sessions, revenue):
+    s, rps = LiveRenderer._levels(sessions, revenue)
+    return {'sessions': (s.min(), s.max()), 'rps': (rps.min(), rps.max())}
+
+
+def _feed(live, sessions, revenue, chunk):
+    blocks = [live.append(sessions[k:k + chunk], revenue[k:k + chunk])
+              for k in range(0, len(sessions), chunk)]
+    return np.concatenate(blocks + [live.flush()])
+
+
+@pytest.mark.parametrize('ticks', [True, False])
+@pytest.mark.parametrize('lag', [0, 1, 3])
+def test_per_day_matches_build_audio(lag, ticks, make_series):
+    # With build_audio's global ranges and channel gains, a per-day live
+    # render fed a week at a time is the one-shot render.
+    sessions, revenue = make_series(40)
+    seconds = len(sessions) * SPB / SR
+    ref  = build_audio(sessions, revenue, lag_days=lag, mode='per-day',
+                       ticks=ticks, sample_rate=SR, duration=seconds)
+    live = LiveRenderer('per-day', SR, SPB / SR, lag_days=lag, ticks=ticks,
+                        norm='fixed', ranges=_fixed(sessions, revenue),
+                        gains=measure_gains(sessions, revenue, SR, seconds,
+                                            lag, 'per-day'))
+    audio = _feed(live, sessions, revenue, 7)
+    np.testing.assert_allclose(audio, ref, atol=1e-6)
+    np.testing.assert_array_equal(live.audio, audio)
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_incremental_matches_one_shot(mode, make_series):
+    # Continuous mode's Catmull-Rom glides differ from build_audio's global
+    # spline by design; fed in any chunks it must match one append.
+    sessions, revenue = make_series(40)
+    kw  = dict(mode=mode, sample_rate=SR, bucket_seconds=SPB / SR, lag_days=2,
+               norm='fixed', ranges=_fixed(sessions, revenue))
+    ref = _feed(LiveRenderer(**kw), sessions, revenue, len(sessions))
+    for chunk in (1, 7):
+        audio = _feed(LiveRenderer(keep=False, **kw), sessions, revenue, chunk)
+        np.testing.assert_allclose(audio, ref, atol=1e-6)
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_append_never_rewrites_history(mode, make_series):
+    sessions, revenue = make_series(40)
+    live  = LiveRenderer(mode, SR, SPB / SR)
+    first = live.append(sessions[:20], revenue[:20]).copy()
+    # A much louder second half widens the expanding range, which only the
+    # new audio may hear.
+    block = live.append(sessions[20:] * 10, revenue[20:])
+    assert live.ranges['sessions'][1] == (sessions[20:] * 10).max()
+    np.testing.assert_array_equal(live.audio, np.concatenate([first, block]))
+    assert live.n_buckets == 40 and live.samples == len(live.audio)
+
+
+def test_continuous_holds_back_the_newest_glide(make_series):
+    sessions, revenue = make_series(10)
+    live = LiveRenderer('continuous', SR, SPB / SR)
+    assert len(live.append(sessions[:1], revenue[:1])) == 0
+    assert live.samples == 0
+    live.append(sessions[1:5], revenue[1:5])
+    assert live.samples == 3 * SPB           # glides 0→1 … 2→3
+    assert len(live.flush()) == SPB          # 3→4, end point held
+    assert len(live.flush()) == 0
+    live.append(sessions[5:], revenue[5:])
+    assert live.samples == 8 * SPB
+
+
+def test_rolling_range_forgets(make_series):
+    sessions, revenue = make_series(40)
+    live = LiveRenderer('per-day', SR, SPB / SR, norm='rolling', window=10)
+    live.append(sessions[:1] * 100, revenue[:1])
+    assert live.ranges['sessions'][1] == sessions[0] * 100
+    live.append(sessions[1:20], revenue[1:20])
+    assert live.ranges['sessions'] == (sessions[10:20].min(),
+                                       sessions[10:20].max())
+
+
+def test_bad_appends_rejected():
+    live = LiveRenderer('per-day', SR, SPB / SR)
+    with pytest.raises(ValueError, match='same length'):
+        live.append([1, 2, 3], [1.0, 2.0])
+    with pytest.raises(ValueError, match='fixed'):
+        LiveRenderer(norm='fixed')
+    with pytest.raises(RuntimeError):
+        LiveRenderer(keep=False).audio
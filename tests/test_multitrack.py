@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from sonify.multitrack import (MULTITRACK_V1, density_onsets, pan_gains,
+                               render_multitrack)
+
+SR = 8000
+
+
+def _metrics(make_series, n=30):
+    sessions, revenue = make_series(n)
+    return {'revenue': revenue, 'orders': sessions}
+
+
+def test_tracks_sum_linearly(make_series):
+    metrics = _metrics(make_series)
+    tracks  = [dict(t, gain=0.2) for t in MULTITRACK_V1] + \
+              [{'mapping': 'ticks', 'gain': 0.1, 'pan': 1}]
+    alone = [render_multitrack(metrics, [t], SR, 2.0) for t in tracks]
+    both  = render_multitrack(metrics, tracks, SR, 2.0)
+    assert np.abs(both).max() <= 1.0          # no bus scaling at these gains
+    np.testing.assert_allclose(both, sum(alone), atol=1e-6)
+
+
+def test_density_onsets():
+    # min → no hits, midpoint → max_hits / 2, max → max_hits, spread evenly.
+    onsets = density_onsets([0.0, 0.5, 1.0], spb=100, max_hits=4)
+    assert onsets.tolist() == [100, 150, 200, 225, 250, 275]
+    assert len(density_onsets([3.0, 3.0], spb=100)) == 0
+
+
+def test_density_track_places_clicks():
+    # One click at the start of each loud bucket, silence in the quiet ones.
+    track  = {'metric': 'orders', 'mapping': 'density', 'max_hits': 1}
+    audio  = render_multitrack({'orders': [0.0, 1.0, 0.0, 1.0]}, [track],
+                               SR, 1.0)
+    spb    = SR // 4
+    loud   = np.abs(audio[:, 0]).reshape(4, spb).max(axis=1) > 0
+    assert loud.tolist() == [False, True, False, True]
+    first  = np.flatnonzero(audio[:, 0])[0]
+    assert spb <= first < spb + 10
+
+
+@pytest.mark.parametrize('pan', [-1.0, -0.3, 0.0, 0.5, 1.0])
+def test_pan_law_is_constant_power(pan):
+    g_L, g_R = pan_gains(pan)
+    assert g_L ** 2 + g_R ** 2 == pytest.approx(1.0)
+    track = {'metric': 'v', 'mapping': 'pitch', 'pan': pan, 'gain': 0.5}
+    audio = render_multitrack({'v': np.arange(10.0)}, [track], SR, 1.0)
+    np.testing.assert_allclose(np.abs(audio).max(axis=0),
+                               [0.5 * g_L, 0.5 * g_R], atol=1e-6)
+
+
+def test_pan_extremes():
+    np.testing.assert_allclose(pan_gains(-1), (1, 0), atol=1e-12)
+    np.testing.assert_allclose(pan_gains(1), (0, 1), atol=1e-12)
+    np.testing.assert_allclose(pan_gains(0), (0.5 ** 0.5,) * 2)
+
+
+def test_duration_that_rounds_a_sample_short(make_series):
+    # int(2.3 * 22050) = 50714 but int(50714 / 22050 * 22050) = 50713.
+    audio = render_multitrack(_metrics(make_series), MULTITRACK_V1,
+                              22050, 2.3)
+    assert audio.shape == (50714, 2)
+    assert np.isfinite(audio).all() and np.abs(audio).max() <= 1.0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from sonify import dsp, reverb
+from sonify.notes import render_notes
+
+SR = 8000
+
+
+@pytest.fixture
+def notes():
+    rng     = np.random.default_rng(3)
+    onsets  = np.sort(rng.integers(0, 7000, 40))
+    lengths = rng.integers(2, 900, 40)
+    freqs   = rng.uniform(110, 640, 40)
+    amps    = rng.uniform(0.1, 0.5, 40)
+    return onsets, lengths, freqs, amps
+
+
+@pytest.mark.parametrize('room', [False, True])
+def test_batched_matches_per_note(notes, room):
+    kw = dict(total=8000, sr=SR, timbre='bright', decay=6.0,
+              detune=dsp.CHORUS_DETUNE, cutoff_hz=dsp.RIGHT_CUTOFF,
+              ir=reverb.resolve_ir('room', SR, 'echo', 'per-day') if room else None)
+    batched = render_notes(*notes, **kw)
+    looped  = sum(render_notes(*(col[i:i + 1] for col in notes), **kw)
+                  for i in range(len(notes[0])))
+    np.testing.assert_allclose(batched, looped, atol=1e-9)
+    # Row chunking must not change the result either.
+    np.testing.assert_allclose(render_notes(*notes, max_elems=1000, **kw),
+                               batched, atol=1e-9)
+
+
+def test_no_notes_is_silence():
+    assert not render_notes([], [], [], [], 100, SR, 'organ', 6.0).any()
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from sonify import parallel
+from sonify.anomaly import collapse, detect
+from sonify.profile import Profiler, stage
+from sonify.render import build_audio
+
+
+def test_map_matches_serial():
+    items = list(range(20))
+    with parallel.threads(4) as pool:
+        assert parallel.active() is pool
+        out = parallel.map(lambda x: x * x, items)
+    assert out == [x * x for x in items]
+    assert parallel.active() is None
+    assert parallel.map(lambda x: -x, items) == [-x for x in items]
+
+
+def test_nested_map_on_one_worker_does_not_deadlock():
+    with parallel.threads(ThreadPoolExecutor(1)):
+        out = parallel.map(lambda i: sum(parallel.map(lambda j: i * j,
+                                                      range(5))), range(5))
+    assert out == [10 * i for i in range(5)]
+
+
+def test_call_keeps_order():
+    with parallel.threads(3):
+        assert parallel.call(lambda: 'a', lambda: 'b', lambda: 'c') == \
+            ['a', 'b', 'c']
+
+
+def test_worker_stages_record_under_caller():
+    def work(x):
+        with stage('leaf'):
+            return x
+    p = Profiler()
+    with p, stage('outer'), parallel.threads(2):
+        parallel.map(work, range(4))
+    assert 'outer/leaf' in p.summary()
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_threads_are_bit_identical(mode, make_series):
+    sessions, revenue = make_series(90)
+    kw  = dict(mode=mode, sample_rate=8000, duration=2.0,
+               anomalies=collapse(detect(sessions)))
+    ref = build_audio(sessions, revenue, **kw)
+    for n in (2, 4, ThreadPoolExecutor(1)):
+        np.testing.assert_array_equal(
+            build_audio(sessions, revenue, threads=n, **kw), ref)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from sonify.playback import NullBackend, Player
+
+
+def _audio(n=5000):
+    return np.random.default_rng(0).uniform(-1, 1, (n, 2)).astype(np.float32)
+
+
+def test_null_backend_captures_what_played():
+    backend = NullBackend(realtime=False, capture=True)
+    player  = Player(8000, backend=backend, blocksize=512)
+    audio   = _audio()
+    player.play(audio, gains=(1.0, 0.5))
+    assert player.wait(5)
+    out = backend.output()
+    assert len(out) == -(-len(audio) // 512) * 512        # whole blocks
+    np.testing.assert_array_equal(out[:len(audio)], audio * [1.0, 0.5])
+    assert not out[len(audio):].any()
+    assert player.position == len(audio) and player.progress == 1.0
+
+
+def test_stop_and_replay_restarts_from_top():
+    backend = NullBackend(realtime=True, capture=True)
+    player  = Player(8000, backend=backend, blocksize=256)
+    player.play(_audio(80000))
+    player.stop()
+    assert not player.active
+    backend.captured.clear()
+    backend.realtime = False
+    short = _audio(1000)
+    player.play(short)
+    assert player.wait(5)
+    np.testing.assert_array_equal(backend.output()[:1000], short)
@@ -0,0 +1,125 @@
+import asyncio
+import io
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from sonify import profile
+from sonify.profile import Profiler, stage
+
+
+def _work(seconds):
+    time.sleep(seconds)
+
+
+def test_nested_stages_attribute_time():
+    p = Profiler()
+    with p:
+        with stage('outer'):
+            _work(0.02)
+            with stage('inner'):
+                _work(0.03)
+            with stage('inner'):
+                _work(0.01)
+    s = p.summary()
+    assert list(s) == ['outer', 'outer/inner']
+    assert s['outer/inner']['calls'] == 2
+    assert s['outer/inner']['total_s'] >= 0.04
+    assert s['outer']['total_s'] >= s['outer/inner']['total_s'] + 0.02
+    assert p.totals()['inner'] == pytest.approx(s['outer/inner']['total_s'])
+    assert [r['depth'] for r in p.records] == [1, 1, 0]
+
+
+def test_inactive_stage_records_nothing():
+    p = Profiler()
+    with stage('outside'):
+        pass
+    assert profile.active() is None and p.records == []
+
+
+def test_profilers_isolated_across_threads():
+    profs, barrier = {}, threading.Barrier(2)
+
+    def render(name):
+        p = profs[name] = Profiler()
+        with p, stage(name):
+            barrier.wait()          # both stages open at once
+            with stage('synth'):
+                _work(0.01)
+
+    threads = [threading.Thread(target=render, args=(n,)) for n in 'ab']
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert list(profs['a'].summary()) == ['a', 'a/synth']
+    assert list(profs['b'].summary()) == ['b', 'b/synth']
+
+
+def test_plain_thread_does_not_inherit_profiler():
+    p, seen = Profiler(), []
+    with p:
+        t = threading.Thread(target=lambda: seen.append(profile.active()))
+        t.start()
+        t.join()
+        bound = profile.bind(profile.active)
+        t = threading.Thread(target=lambda: seen.append(bound()))
+        t.start()
+        t.join()
+    assert seen == [None, p]
+
+
+def test_profilers_isolated_across_tasks():
+    async def render(name):
+        p = Profiler()
+        with p, stage(name):
+            await asyncio.sleep(0.01)        # the other task runs here
+            with stage('synth'):
+                await asyncio.sleep(0)
+        return p
+
+    async def both():
+        return await asyncio.gather(render('a'), render('b'))
+
+    a, b = asyncio.run(both())
+    assert list(a.summary()) == ['a', 'a/synth']
+    assert list(b.summary()) == ['b', 'b/synth']
+
+
+def test_memory_mode_counts_allocations():
+    p = Profiler(memory=True)
+    with p:
+        with stage('alloc'):
+            keep = np.ones(1 << 20)
+        with stage('temp'):
+            np.ones(1 << 20).sum()
+    s = p.summary()
+    assert s['alloc']['bytes'] >= keep.nbytes
+    assert abs(s['temp']['bytes']) < keep.nbytes // 2
+    assert s['temp']['peak_bytes'] >= keep.nbytes
+
+
+def test_chrome_trace(tmp_path):
+    p = Profiler()
+    with p, stage('render'):
+        with stage('echo'):
+            _work(0.005)
+    path = tmp_path / 'trace.json'
+    p.write_chrome(str(path))
+    trace  = json.loads(path.read_text())
+    events = {e['cat']: e for e in trace['traceEvents']}
+    assert set(events) == {'render', 'render/echo'}
+    echo, outer = events['render/echo'], events['render']
+    assert echo['ph'] == 'X' and echo['name'] == 'echo'
+    assert echo['dur'] >= 5000                       # microseconds
+    assert outer['ts'] <= echo['ts']
+    assert echo['ts'] + echo['dur'] <= outer['ts'] + outer['dur'] + 1
+    assert echo['tid'] == threading.get_ident()
+
+    buf = io.StringIO()
+    p.write_jsonl(buf)
+    assert [json.loads(line)['path'] for line in buf.getvalue().splitlines()] \
+        == ['render/echo', 'render']
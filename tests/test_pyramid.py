@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from sonify.pyramid import Pyramid, audible, audible_points, lttb
+
+
+@pytest.fixture
+def series():
+    return np.cumsum(np.random.default_rng(0).normal(size=10007))
+
+
+@pytest.mark.parametrize('n_out', [3, 10, 500])
+def test_lttb_keeps_endpoints(series, n_out):
+    x, y = lttb(np.arange(len(series)), series, n_out)
+    assert len(x) == n_out
+    assert (x[0], y[0]) == (0, series[0])
+    assert (x[-1], y[-1]) == (len(series) - 1, series[-1])
+    assert np.all(np.diff(x) > 0)
+    np.testing.assert_array_equal(y, series[x.astype(int)])
+
+
+def test_lttb_keeps_a_spike(series):
+    series = series.copy()
+    series[4321] += 1000
+    _, y = lttb(np.arange(len(series)), series, 100)
+    assert series[4321] in y
+
+
+def test_short_series_unchanged():
+    x, y = lttb(np.arange(5), np.arange(5.0), 10)
+    np.testing.assert_array_equal(y, np.arange(5.0))
+    x, y = audible(np.arange(30.0), duration=10.0)
+    assert len(y) == 30 and audible_points(1000.0) > 30
+
+
+@pytest.mark.parametrize('n', [1000, 10007, 200003])
+def test_audible_reads_a_pyramid_level(n):
+    # Long series: decimate()'s line, from one aggregated level.
+    y    = np.cumsum(np.random.default_rng(1).normal(size=n))
+    x, k = audible(y, duration=6.0)
+    px, pk = Pyramid(y).decimate(audible_points(6.0))
+    np.testing.assert_array_equal(x, px)
+    np.testing.assert_allclose(k, pk, rtol=1e-12, atol=1e-9)
+    assert (x[0], k[0], x[-1], k[-1]) == (0, y[0], n - 1, y[-1])
+
+
+def test_levels_aggregate_the_series(series):
+    pyr = Pyramid(series)
+    for level in pyr.levels:
+        assert level.count.sum() == len(series)
+        assert level.sum.sum() == pytest.approx(series.sum())
+        assert level.min.min() == series.min()
+        assert level.max.max() == series.max()
+    assert len(pyr.levels[-1].sum) == 1
+
+
+@pytest.mark.parametrize('lo, hi', [(0, None), (123, 4567), (9000, 10007)])
+def test_window_covers_range_within_budget(series, lo, hi):
+    pyr = Pyramid(series)
+    w   = pyr.window(lo, hi, max_points=200)
+    hi  = len(series) if hi is None else hi
+    assert len(w.x) <= 200
+    assert w.x[0] - (w.width[0] - 1) / 2 <= lo
+    assert w.x[-1] + (w.width[-1] - 1) / 2 >= hi - 1
+    assert w.min.min() <= series[lo:hi].min()
+    assert w.max.max() >= series[lo:hi].max()
+
+
+@pytest.mark.parametrize('lo, hi', [(0, None), (10, 9001), (4321, 4330)])
+def test_decimate_keeps_endpoints(series, lo, hi):
+    x, y = Pyramid(series).decimate(100, lo, hi)
+    hi   = len(series) if hi is None else hi
+    assert len(x) == min(100, hi - lo)
+    assert (x[0], x[-1]) == (lo, hi - 1)
+    assert (y[0], y[-1]) == (series[lo], series[hi - 1])
+    assert np.all(np.diff(x) > 0)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from sonify import reverb
+from sonify.reverb import Convolver, PartitionedIR, convolve
+
+
+@pytest.fixture
+def signal():
+    return np.random.default_rng(0).normal(size=(2, 5000))
+
+
+@pytest.mark.parametrize('ir_len, partition', [(1, None), (37, None),
+                                               (300, 64), (1000, None)])
+def test_matches_np_convolve(signal, ir_len, partition):
+    ir  = np.random.default_rng(1).normal(size=ir_len) * np.exp(-np.arange(ir_len) / 50)
+    out = convolve(signal, PartitionedIR(ir, partition))
+    for ch, x in zip(out, signal):
+        np.testing.assert_allclose(ch, np.convolve(x, ir)[:len(x)], atol=1e-9)
+
+
+def test_streaming_in_uneven_blocks(signal):
+    ir   = reverb.resolve_ir('room', 8000, 'echo', 'continuous')
+    conv = Convolver(PartitionedIR(ir, 128))
+    cuts = [0, 1, 130, 131, 900, 2500, 5000]
+    out  = np.concatenate([conv.process(signal[:, a:b])
+                           for a, b in zip(cuts, cuts[1:])], axis=-1)
+    np.testing.assert_allclose(out, convolve(signal, ir), atol=1e-9)
+
+
+def test_no_room_passes_through(signal):
+    assert convolve(signal, None) is signal
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import pytest
+
+from sonify import service
+from sonify.service import BadRequest, parse_job
+
+
+def _status(reply):
+    return int(reply.split(b' ', 2)[1])
+
+
+@pytest.mark.parametrize('points', [
+    [{'x': 2}],
+    [{'t': '2024-01-01', 'v': 1}, {'t': '2024-01-02'}],
+    [{'t': '2024-01-01', 'v': 'high'}],
+    [{'t': '2024-01-01', 'v': float('nan')}],
+    [{'t': '2024-01-01', 'v': True}],
+    [{'t': ['2024'], 'v': 1}],
+    [{'v': 1}, 2],
+    [1, {'v': 2}],
+    [1, None, 3],
+    [1, float('inf')],
+])
+def test_malformed_points_rejected(points):
+    with pytest.raises(BadRequest):
+        parse_job('series', {'series': {'points': points}})
+
+
+@pytest.mark.parametrize('points', [
+    [{'t': '2024-01-01', 'v': 1}, {'t': '2024-01-02', 'v': 2.5}],
+    [{'t': 0, 'v': 1}, {'v': -3}],
+    [1, 2.5, -3],
+])
+def test_wellformed_points_accepted(points):
+    kind, params = parse_job('series', {'series': {'points': points}})
+    assert params['points'] == points
+
+
+def test_compare_checks_both_sides():
+    with pytest.raises(BadRequest, match=r'b\.points\[1\]'):
+        parse_job('compare', {'a': {'points': [1, 2]},
+                              'b': {'points': [{'v': 1}, {'v': None}]}})
+
+
+def test_malformed_point_is_a_400():
+    svc  = service.SonifyService(workers=1, executor='thread')
+    body = json.dumps({'series': {'points': [{'t': 'a', 'v': 1},
+                                             {'t': 'b', 'x': 2}]}}).encode()
+    reply = asyncio.run(service._route(svc, 'POST', '/api/sonify/series',
+                                       {}, body))
+    assert _status(reply) == 400
+    assert b'series.points[1]' in reply
+    assert svc.counts['renders'] == 0
+
+
+SERIES = {'series': {'points': [1, 2, 3]}}
+
+
+@pytest.mark.parametrize('kind, body', [
+    ('series', {**SERIES, 'render': [1]}),
+    ('series', {**SERIES, 'mapping': 'x'}),
+    ('series', {**SERIES, 'render': {'sample_rate': 'fast'}}),
+    ('series', {**SERIES, 'render': {'sample_rate': 100}}),
+    ('series', {**SERIES, 'mapping': {'speed': [2]}}),
+    ('series', {**SERIES, 'mapping': {'duration_ms': True}}),
+    ('series', {**SERIES, 'mapping': {'normalize': 'log'}}),
+    ('series', {**SERIES, 'mapping': {'normalize': ['minmax']}}),
+    ('compare', {'a': [1, 2], 'b': {'points': [1, 2]}}),
+    ('anomalies', {**SERIES, 'anomalies': [[1]]}),
+    ('anomalies', {**SERIES, 'anomalies': [{'x': 1}]}),
+    ('anomalies', {**SERIES, 'anomalies': {'t': 1}}),
+    ('anomalies', {**SERIES, 'mapping': {'normalize': 'rank'}}),
+])
+def test_malformed_options_rejected(kind, body):
+    with pytest.raises(BadRequest):
+        parse_job(kind, body)
+    svc   = service.SonifyService(workers=1, executor='thread')
+    reply = asyncio.run(service._route(svc, 'POST', f'/api/sonify/{kind}',
+                                       {}, json.dumps(body).encode()))
+    assert _status(reply) == 400
+
+
+def test_wellformed_options_accepted():
+    _, params = parse_job('anomalies', {
+        **SERIES, 'anomalies': [0, 'b', {'t': 2}],
+        'render': {'sample_rate': 16000},
+        'mapping': {'normalize': 'none', 'speed': 2, 'duration_ms': '900'}})
+    assert params['sample_rate'] == 16000 and params['speed'] == 2.0
+    assert params['duration_ms'] == 900.0
+    assert params['normalize_method'] == 'none'
+
+
+def test_invalid_json_is_a_400():
+    svc = service.SonifyService(workers=1, executor='thread')
+    for body in (b'{"series":', b'\xff\xfe'):
+        reply = asyncio.run(service._route(svc, 'POST', '/api/sonify/series',
+                                           {}, body))
+        assert _status(reply) == 400
+
+
+def test_render_failure_is_not_a_400(monkeypatch):
+    def broken(kind, params, profile=False):
+        raise ValueError("bug in the renderer")
+    monkeypatch.setattr(service, 'render_clip', broken)
+    svc = service.SonifyService(workers=1, executor='thread')
+    svc.start()
+    try:
+        with pytest.raises(ValueError, match='bug in the renderer'):
+            asyncio.run(service._route(svc, 'POST', '/api/sonify/series', {},
+                                       json.dumps(SERIES).encode()))
+    finally:
+        svc.close()
+    assert svc.counts['errors'] == 1
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_render_failure_is_a_logged_500(monkeypatch, caplog):
+    def broken(kind, params, profile=False):
+        raise ValueError("bug in the renderer")
+    monkeypatch.setattr(service, 'render_clip', broken)
+    body = json.dumps(SERIES).encode()
+
+    async def request():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'POST /api/sonify/series HTTP/1.1\r\n'
+                         b'Content-Length: %d\r\nConnection: close\r\n\r\n'
+                         % len(body) + body)
+        reader.feed_eof()
+        writer = _Writer()
+        await service._handle(svc, reader, writer)
+        return writer.data
+
+    svc = service.SonifyService(workers=1, executor='thread')
+    svc.start()
+    try:
+        reply = asyncio.run(request())
+    finally:
+        svc.close()
+    assert _status(reply) == 500
+    assert 'bug in the renderer' in caplog.text
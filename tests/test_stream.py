@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from sonify.render import build_audio
+from sonify.stream import render_blocks
+
+SR, SECONDS = 8000, 3.0
+
+
+@pytest.mark.parametrize('ticks', [True, False])
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_blocks_match_build_audio(mode, ticks, make_series):
+    sessions, revenue = make_series(90)
+    ref    = build_audio(sessions, revenue, lag_days=2, mode=mode, ticks=ticks,
+                         sample_rate=SR, duration=SECONDS)
+    blocks = list(render_blocks(sessions, revenue, SR, SECONDS, lag_days=2,
+                                mode=mode, ticks=ticks, block_size=1000))
+    assert [len(b) for b in blocks[:-1]] == [1000] * (len(blocks) - 1)
+    np.testing.assert_allclose(np.concatenate(blocks), ref, atol=1e-6)
+
+
+def test_any_series_length(make_series):
+    # Not a multiple of 30 days, and more buckets than audio blocks.
+    sessions, revenue = make_series(1000)
+    audio = np.concatenate(list(render_blocks(sessions, revenue, SR, 2.0,
+                                              block_size=512)))
+    assert audio.shape == (int(2.0 * SR), 2)
+    assert np.isfinite(audio).all() and np.abs(audio).max() <= 1.0
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_single_bucket_rejected(mode):
+    with pytest.raises(ValueError, match='at least 2 buckets'):
+        build_audio([5], [1.0], mode=mode, sample_rate=SR, duration=1.0)
+    with pytest.raises(ValueError, match='at least 2 buckets'):
+        next(render_blocks([5], [1.0], SR, 1.0, mode=mode))
+
+
+@pytest.mark.parametrize('mode', ['continuous', 'per-day'])
+def test_plain_lists_accepted(mode):
+    audio = build_audio([5, 9, 7], [1.0, 2.0, 3.0], mode=mode,
+                        sample_rate=SR, duration=1.0)
+    blocks = np.concatenate(list(render_blocks([5, 9, 7], [1.0, 2.0, 3.0],
+                                               SR, 1.0, mode=mode)))
+    np.testing.assert_allclose(blocks, audio, atol=1e-6)
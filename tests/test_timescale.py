@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sonify.cache import StemCache
+from sonify.timescale import SPEEDS, speed_variant, time_stretch
+
+SR = 8000
+
+
+def _sine(freq=440.0, seconds=1.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return 0.5 * np.sin(2 * np.pi * freq * t)
+
+
+def _pitch(x):
+    spec = np.abs(np.fft.rfft(x * np.hanning(len(x))))
+    return np.argmax(spec) * SR / len(x)
+
+
+def _rms(x):
+    edge = SR // 10                 # skip the padded ends
+    return np.sqrt(np.mean(x[edge:-edge] ** 2))
+
+
+@pytest.mark.parametrize('speed', SPEEDS)
+def test_length_scales_by_one_over_speed(speed):
+    x = _sine()
+    assert len(time_stretch(x, speed, SR)) == round(len(x) / speed)
+    stereo = time_stretch(np.stack([x, -x], axis=1), speed, SR)
+    assert stereo.shape == (round(len(x) / speed), 2)
+
+
+@pytest.mark.parametrize('speed', [0.5, 0.75, 1.5, 2.0])
+def test_pitch_and_level_kept(speed):
+    y = time_stretch(_sine(), speed, SR)
+    assert _pitch(y) == pytest.approx(440.0, abs=SR / len(y))
+    assert _rms(y) == pytest.approx(0.5 / np.sqrt(2), rel=0.02)
+
+
+@pytest.mark.parametrize('speed', [0.5, 0.75, 1.5, 2.0])
+def test_round_trip(speed):
+    # Phases are re-synthesised, so compare length, pitch and level.
+    x = _sine(330.0)
+    z = time_stretch(time_stretch(x, speed, SR), 1 / speed, SR)
+    assert len(z) == len(x)
+    assert _pitch(z) == pytest.approx(330.0, abs=SR / len(z))
+    assert _rms(z) == pytest.approx(_rms(x), rel=0.02)
+
+
+def test_unit_speed_and_range():
+    x = _sine()
+    assert time_stretch(x, 1.0, SR) is x
+    for speed in (0.25, 3.0):
+        with pytest.raises(ValueError, match='speed'):
+            time_stretch(x, speed, SR)
+
+
+def test_variants_are_cached():
+    cache, x = StemCache(), _sine()
+    a = speed_variant(x, 0.5, SR, cache=cache)
+    b = speed_variant(x, 0.5, SR, cache=cache)
+    np.testing.assert_array_equal(a, b)
+    assert (cache.misses, cache.hits) == (1, 1)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from sonify import dsp, wavetable
+
+SR = 8000
+
+
+def _spectrum(x):
+    mag = np.abs(np.fft.rfft(x * np.hanning(len(x))))
+    return np.fft.rfftfreq(len(x), 1 / SR), mag / mag.max()
+
+
+@pytest.mark.parametrize('name, ref', [('sine', np.sin), ('organ', dsp.organ),
+                                       ('bright', dsp.bright)])
+def test_matches_additive_reference(name, ref):
+    phase = np.cumsum(np.full(SR, 2 * np.pi * 220.0 / SR))
+    np.testing.assert_allclose(wavetable.get(name)(phase), ref(phase),
+                               atol=1e-4)
+
+
+def test_frequency_follows_phase():
+    phase = 2 * np.pi * 440.0 * np.arange(SR) / SR
+    freqs, mag = _spectrum(wavetable.get('sine')(phase))
+    assert freqs[np.argmax(mag)] == pytest.approx(440.0, abs=1.0)
+
+
+def test_band_limit_removes_aliases():
+    # bright at 3 kHz: its 2nd harmonic (6 kHz) would fold back to 2 kHz.
+    phase = 2 * np.pi * 3000.0 * np.arange(SR) / SR
+    osc   = wavetable.get('bright')
+    freqs, full = _spectrum(osc(phase))
+    _,     safe = _spectrum(osc(phase, max_freq=3000.0, sr=SR))
+    at_2k = np.argmin(np.abs(freqs - 2000.0))
+    assert full[at_2k] > 0.1
+    assert safe[at_2k] < 1e-3
+    assert freqs[np.argmax(safe)] == pytest.approx(3000.0, abs=1.0)
+
+
+def test_tiny_negative_phase_wraps():
+    out = wavetable.get('organ')(np.array([-1e-300, 0.0, 2 * np.pi]))
+    np.testing.assert_allclose(out, 0.0, atol=1e-6)